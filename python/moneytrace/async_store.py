@@ -0,0 +1,235 @@
+# async_store.py
+"""
+asyncio-facing event store.
+
+Writes are serialized on one dedicated writer thread that owns the
+only read-write connection. Reads run on a small pool of read-only
+connections, so many summaries can proceed while a write is in
+flight; WAL mode keeps readers and the writer from blocking each
+other.
+
+sqlite3 connections are bound to the thread that opened them, so
+every connection lives in a thread-local slot of its executor.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator
+
+import fx
+from db import EVENT_BATCH_SIZE, append_events, connect, insert_event
+from engine import LedgerEvent, LedgerSummary, compute_summary
+from event_log import iter_ledger
+from summary_cache import SummaryCache
+
+READER_THREADS = 4
+
+# Batches buffered between a streaming reader thread and its consumer.
+STREAM_QUEUE_SIZE = 4
+
+
+class AsyncEventStore:
+    def __init__(self, path: str, readers: int = READER_THREADS):
+        if path == ":memory:":
+            raise ValueError("AsyncEventStore needs a database file shared by its connections")
+
+        self.path = str(Path(path).resolve())
+
+        # Schema setup and WAL happen once, before any reader opens.
+        connect(self.path).close()
+
+        self._local = threading.local()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="moneytrace-writer",
+            initializer=self._open_writer,
+        )
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers,
+            thread_name_prefix="moneytrace-reader",
+            initializer=self._open_reader,
+        )
+        self._caches: list[SummaryCache] = []
+        # Every thread's connection, closed once the executors stop.
+        self._conns: list = []
+
+    # -- thread setup --------------------------------------------------------
+
+    def _open_writer(self) -> None:
+        self._local.conn = connect(self.path)
+        self._local.cache = SummaryCache(self._local.conn)
+        self._caches.append(self._local.cache)
+        self._conns.append(self._local.conn)
+
+    def _open_reader(self) -> None:
+        import sqlite3
+
+        # Only its own thread uses it; _shutdown closes it from another.
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._local.conn = conn
+        self._local.cache = SummaryCache(conn)
+        self._caches.append(self._local.cache)
+        self._conns.append(conn)
+
+    async def _run(self, executor, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, fn, *args)
+
+    # -- writes --------------------------------------------------------------
+
+    def _add(self, event: dict) -> str:
+        event_id = insert_event(self._local.conn, event)
+        self._local.cache.note_insert(event)
+        return event_id
+
+    def _add_many(self, events: list[dict]) -> list[str]:
+        conn = self._local.conn
+        try:
+            ids = append_events(conn, events)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            conn.friends.clear()
+            raise
+        self._local.cache.note_inserts(events)
+        return ids
+
+    async def add_event(self, event: dict) -> str:
+        return await self._run(self._writer, self._add, event)
+
+    async def add_events(self, events: list[dict]) -> list[str]:
+        """
+        Adds all events in one transaction, or none of them.
+        """
+        return await self._run(self._writer, self._add_many, events)
+
+    # -- reads ---------------------------------------------------------------
+
+    def _summary(self, base_budget_minor, month, year, rescan, currency):
+        conn = self._local.conn
+        if currency or fx.has_foreign(conn):
+            # The materialized totals are home currency only; they are
+            # also the answer when no rates exist and none was asked for.
+            try:
+                return fx.summarize(conn, base_budget_minor, month, year, currency)
+            except fx.MissingRate:
+                if currency:
+                    raise
+        if rescan:
+            return compute_summary(
+                iter_ledger(self._local.conn), base_budget_minor, month, year)
+        # Reader caches see writes through the ledger version.
+        return self._local.cache.summary(base_budget_minor, month, year)
+
+    async def summary(
+            self,
+            base_budget_minor: int = 0,
+            month: int | None = None,
+            year: int | None = None,
+            rescan: bool = False,
+            currency: str | None = None,
+    ) -> LedgerSummary:
+        """
+        Totals in `currency` (default: home). Ledgers holding other
+        currencies are rescanned with conversion (fx.summarize); without
+        the rates for that, and with no currency given, only home
+        currency events count.
+        """
+        return await self._run(
+            self._readers, self._summary, base_budget_minor, month, year, rescan, currency)
+
+    async def friend_balance(self, name: str) -> int:
+        return await self._run(
+            self._readers, lambda: self._local.cache.friend_balance(name))
+
+    def _month_budget(self, base_budget_minor, month, year, currency):
+        conn = self._local.conn
+        if currency or fx.has_foreign(conn):
+            try:
+                return fx.month_budget(conn, base_budget_minor, month, year, currency)
+            except fx.MissingRate:
+                if currency:
+                    raise
+        return self._local.cache.month_budget(base_budget_minor, month, year)
+
+    async def month_budget(
+            self,
+            base_budget_minor: int,
+            month: int,
+            year: int,
+            currency: str | None = None,
+    ) -> int:
+        """
+        snapshots.budget_for_month; runs on the writer because closed
+        months are persisted on first use. Converted like summary().
+        """
+        return await self._run(
+            self._writer, self._month_budget, base_budget_minor, month, year, currency)
+
+    async def stream_events(
+            self, batch_size: int = EVENT_BATCH_SIZE) -> AsyncIterator[LedgerEvent]:
+        """
+        Yields events from a reader thread, one fetchmany() batch
+        handed over at a time.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def produce():
+            batch = []
+            try:
+                for e in iter_ledger(self._local.conn, batch_size):
+                    batch.append(e)
+                    if len(batch) >= batch_size:
+                        asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                        batch = []
+                        if stop.is_set():
+                            return
+                if batch:
+                    asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop)
+
+        producer = loop.run_in_executor(self._readers, produce)
+
+        try:
+            while (batch := await queue.get()) is not None:
+                for e in batch:
+                    yield e
+        finally:
+            # Unblock a producer waiting on a full queue.
+            stop.set()
+            while not producer.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0)
+            await producer
+
+    def cache_stats(self) -> dict[str, int]:
+        totals = {"hits": 0, "misses": 0, "entries": 0}
+        for cache in list(self._caches):
+            for k, v in cache.stats().items():
+                totals[k] += v
+        return totals
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self) -> None:
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        for conn in self._conns:
+            conn.close()
+        self._conns.clear()
+
+    async def __aenter__(self) -> "AsyncEventStore":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
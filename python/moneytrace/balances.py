@@ -0,0 +1,272 @@
+# balances.py
+"""
+Materialized running balances.
+
+Aggregates per month, per friend and per category are updated in the
+same transaction as every event insert, so a summary is a handful of
+lookups instead of a full-ledger fold.
+
+The engine stays the source of truth: deltas are produced by
+engine.compute_summary, and verify() rebuilds everything from the raw
+events table and diffs it against the stored values. Like the
+engine's default, the aggregates cover home-currency events only.
+"""
+
+from datetime import date
+from functools import lru_cache
+from itertools import groupby
+
+from engine import LedgerEvent, LedgerSummary, compute_summary
+from event_log import bump_version, iter_ledger, stored_record
+
+
+@lru_cache(maxsize=4096)
+def _day_month(day: int) -> tuple[int, int]:
+    d = date.fromordinal(day)
+    return d.year, d.month
+
+
+def _month_key(e: LedgerEvent) -> tuple[int, int]:
+    return _day_month(e.day)
+
+
+def init_balances(conn) -> None:
+    """
+    Creates the aggregate tables.
+
+    When they are created on an existing ledger, they are backfilled
+    from the events table.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'balance_months'"
+    )
+    existed = cur.fetchone() is not None
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS balance_months (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        budget INTEGER NOT NULL DEFAULT 0,
+        spend INTEGER NOT NULL DEFAULT 0,
+        liabilities INTEGER NOT NULL DEFAULT 0,
+        receivables INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month)
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS balance_friends (
+        friend TEXT PRIMARY KEY,
+        balance INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS balance_categories (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        spend INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, category)
+    )
+    """)
+
+    if not existed:
+        _rebuild(cur)
+
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+def aggregate(events, ordered: bool = False) -> tuple[dict, dict, dict]:
+    """
+    Folds events into (months, friends, categories) deltas.
+
+    months     : (year, month) -> [budget, spend, liabilities, receivables]
+    friends    : name -> balance
+    categories : (year, month, category) -> spend
+
+    Events are grouped by month and each group is folded once.
+    Pass ordered=True for date-ordered input (e.g. a stream from
+    db.iter_events) to skip the in-memory sort.
+
+    Dicts being inserted are read the way they are stored
+    (event_log.stored_record), so the deltas match what verify()
+    recomputes from the events table.
+    """
+    events = (
+        r for r in (e if isinstance(e, LedgerEvent) else stored_record(e) for e in events)
+        if r is not None
+    )
+    if not ordered:
+        events = sorted(events, key=_month_key)
+
+    months: dict[tuple[int, int], list[int]] = {}
+    friends: dict[str, int] = {}
+    categories: dict[tuple[int, int, str], int] = {}
+
+    for (y, m), group in groupby(events, key=_month_key):
+        s = compute_summary(group, month=m, year=y)
+
+        months[(y, m)] = [s.budget, s.month_spend, s.liabilities, s.receivables]
+
+        for name, amt in s.friend_balances.items():
+            friends[name] = friends.get(name, 0) + amt
+
+        for cat, amt in s.category_spend.items():
+            key = (y, m, cat or "")
+            categories[key] = categories.get(key, 0) + amt
+
+    return months, friends, categories
+
+
+def apply_events(cur, events, ordered: bool = False) -> None:
+    """
+    Adds the impact of newly inserted events to the stored aggregates.
+
+    Must run on the cursor that inserted the events, before commit.
+    """
+    months, friends, categories = aggregate(events, ordered)
+
+    cur.executemany("""
+    INSERT INTO balance_months (year, month, budget, spend, liabilities, receivables)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (year, month) DO UPDATE SET
+        budget = budget + excluded.budget,
+        spend = spend + excluded.spend,
+        liabilities = liabilities + excluded.liabilities,
+        receivables = receivables + excluded.receivables
+    """, [(y, m, *v) for (y, m), v in months.items()])
+
+    cur.executemany("""
+    INSERT INTO balance_friends (friend, balance)
+    VALUES (?, ?)
+    ON CONFLICT (friend) DO UPDATE SET balance = balance + excluded.balance
+    """, list(friends.items()))
+
+    cur.executemany("""
+    INSERT INTO balance_categories (year, month, category, spend)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (year, month, category) DO UPDATE SET spend = spend + excluded.spend
+    """, [(y, m, c, v) for (y, m, c), v in categories.items()])
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def load_summary(
+        conn,
+        base_budget_minor: int = 0,
+        month: int | None = None,
+        year: int | None = None,
+) -> LedgerSummary:
+    """
+    Same result as engine.compute_summary over the whole ledger,
+    read from the stored aggregates.
+    """
+    cur = conn.cursor()
+
+    cur.execute("""
+    SELECT COALESCE(SUM(budget), 0),
+           COALESCE(SUM(liabilities), 0),
+           COALESCE(SUM(receivables), 0)
+    FROM balance_months
+    """)
+    budget, liabilities, receivables = cur.fetchone()
+
+    month_spend = 0
+    if month and year:
+        cur.execute(
+            "SELECT spend FROM balance_months WHERE year = ? AND month = ?",
+            (year, month),
+        )
+        row = cur.fetchone()
+        month_spend = row[0] if row else 0
+
+        cur.execute("""
+        SELECT category, spend FROM balance_categories
+        WHERE year = ? AND month = ?
+        """, (year, month))
+    else:
+        cur.execute("""
+        SELECT category, SUM(spend) FROM balance_categories
+        GROUP BY category
+        """)
+    category_spend = {(c or None): v for c, v in cur.fetchall()}
+
+    cur.execute("SELECT friend, balance FROM balance_friends")
+    friend_balances = dict(cur.fetchall())
+
+    return LedgerSummary(
+        budget=base_budget_minor + budget,
+        month_spend=month_spend,
+        liabilities=liabilities,
+        receivables=receivables,
+        friend_balances=friend_balances,
+        category_spend=category_spend,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Rebuild / Verify
+# ---------------------------------------------------------------------------
+
+def _stored(cur) -> tuple[dict, dict, dict]:
+    cur.execute("""
+    SELECT year, month, budget, spend, liabilities, receivables
+    FROM balance_months
+    """)
+    months = {(r[0], r[1]): list(r[2:]) for r in cur.fetchall()}
+
+    cur.execute("SELECT friend, balance FROM balance_friends")
+    friends = dict(cur.fetchall())
+
+    cur.execute("SELECT year, month, category, spend FROM balance_categories")
+    categories = {(r[0], r[1], r[2]): r[3] for r in cur.fetchall()}
+
+    return months, friends, categories
+
+
+def _rebuild(cur) -> None:
+    cur.execute("DELETE FROM balance_months")
+    cur.execute("DELETE FROM balance_friends")
+    cur.execute("DELETE FROM balance_categories")
+    apply_events(cur, iter_ledger(cur.connection, ordered=True), ordered=True)
+
+
+def rebuild(conn) -> None:
+    """
+    Recomputes all aggregates from the events table.
+    """
+    cur = conn.cursor()
+    _rebuild(cur)
+    bump_version(cur)
+    conn.commit()
+
+
+def verify(conn) -> list[str]:
+    """
+    Rebuilds the aggregates in memory from the raw events and diffs
+    them against the stored values.
+
+    Returns a list of human-readable mismatches (empty if consistent).
+    """
+    cur = conn.cursor()
+    expected = aggregate(iter_ledger(conn, ordered=True), ordered=True)
+    stored = _stored(cur)
+
+    problems = []
+    for table, exp, got in zip(
+            ("months", "friends", "categories"), expected, stored):
+        for key in sorted(set(exp) | set(got), key=repr):
+            if exp.get(key) != got.get(key):
+                problems.append(
+                    f"{table} {key}: expected {exp.get(key)}, stored {got.get(key)}"
+                )
+
+    return problems
@@ -0,0 +1,492 @@
+# bench.py
+"""
+Benchmark harness for the ledger engine.
+
+Generates deterministic synthetic ledgers and times the engine
+functions, events_for_budget_month, Money totalling, bulk inserts and
+the cli summary path at each requested size. Results are written as JSON so two
+commits can be compared:
+
+    python bench.py --sizes 1000 10000 100000 --out head.json
+    python bench.py compare base.json head.json
+
+Startup cases run cli.py in a fresh interpreter each time, since that
+is what scripted one-shot calls pay; --sizes with no values runs only
+those.
+
+Sizes up to 10^7 work, but the pure engine needs the ledger in memory
+(about 1 GB of dicts at 10^7) and the DB benchmarks insert every
+event; use --no-db to skip the latter.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import cli
+import engine
+import fx
+import validation
+from currency import CURRENCIES
+from db import add_split, append_event, append_events, connect, get_pool, transaction
+from importer import import_events
+from money import Money, MoneyBatch, MoneyTotals
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+DEFAULT_MIX = {
+    engine.EXPENSE: 55,
+    engine.LIABILITY_CREATED: 10,
+    engine.RECEIVABLE_CREATED: 15,
+    engine.PAYBACK_PAID: 7,
+    engine.PAYBACK_RECEIVED: 8,
+    engine.BUDGET_ADJUSTMENT: 5,
+}
+
+# Types that carry a friend; the rest are personal.
+_FRIEND_TYPES = {
+    engine.LIABILITY_CREATED,
+    engine.RECEIVABLE_CREATED,
+    engine.PAYBACK_PAID,
+    engine.PAYBACK_RECEIVED,
+}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic Ledgers
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LedgerSpec:
+    """
+    Shape of a synthetic ledger. Same spec, same events.
+    """
+    events: int = 10_000
+    seed: int = 42
+    mix: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    friends: int = 50
+    categories: int = 20
+    start: date = date(2023, 1, 1)
+    days: int = 3 * 365
+    currencies: dict[str, int] = field(default_factory=lambda: {engine.HOME_CURRENCY: 1})
+
+    @property
+    def last_month(self) -> tuple[int, int]:
+        """
+        (month, year) of the last day in the span.
+        """
+        d = self.start + timedelta(days=self.days - 1)
+        return d.month, d.year
+
+
+def generate_events(spec: LedgerSpec):
+    """
+    Yields engine event dicts for the spec.
+    """
+    rng = random.Random(spec.seed)
+    types = list(spec.mix)
+    weights = list(spec.mix.values())
+    friends = [f"Friend {i}" for i in range(spec.friends)]
+    categories = [f"Category {i}" for i in range(spec.categories)] or [None]
+    first = spec.start.toordinal()
+
+    # A separate stream, so single-currency ledgers stay identical.
+    crng = random.Random(spec.seed + 1)
+    codes = list(spec.currencies)
+    code_weights = list(spec.currencies.values())
+
+    remaining = spec.events
+    while remaining > 0:
+        n = min(remaining, 10_000)
+        remaining -= n
+
+        currencies = crng.choices(codes, code_weights, k=n) if len(codes) > 1 else codes * n
+        for etype, currency in zip(rng.choices(types, weights, k=n), currencies):
+            yield {
+                "type": etype,
+                "amount": rng.randint(100, 500_000),
+                "category": rng.choice(categories) if etype != engine.BUDGET_ADJUSTMENT else None,
+                "friend": rng.choice(friends) if etype in _FRIEND_TYPES and friends else None,
+                "description": None,
+                "event_date": date.fromordinal(first + rng.randrange(spec.days)),
+                "currency": currency,
+            }
+
+
+def generate_rates(spec: LedgerSpec) -> fx.FxTable:
+    """
+    A daily rate for every known currency over the spec's span.
+    """
+    from currency import CURRENCIES
+
+    rng = random.Random(spec.seed + 2)
+    table = fx.FxTable()
+    for code in CURRENCIES:
+        if code == table.base:
+            continue
+        rate = rng.randint(50, 120)
+        for day in range(spec.days):
+            rate *= 1 + rng.uniform(-0.005, 0.005)
+            table.set_rate(code, spec.start + timedelta(days=day), f"{rate:.4f}")
+    return table
+
+
+def write_jsonl(events, path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps({**e, "event_date": e["event_date"].isoformat()}))
+            f.write("\n")
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+def _time(fn, repeat: int) -> list[float]:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def _result(name: str, size: int, runs: list[float]) -> dict:
+    best = min(runs)
+    return {
+        "name": name,
+        "size": size,
+        "best": best,
+        "runs": runs,
+        "ns_per_event": best / size * 1e9 if size else None,
+    }
+
+
+def bench_engine(events: list[dict], spec: LedgerSpec, repeat: int, rates: fx.FxTable) -> list[dict]:
+    month, year = spec.last_month
+    base = cli.BASE_BUDGET
+    records = list(engine.as_records(events))
+
+    cases = {
+        "engine.compute_available_budget": lambda: engine.compute_available_budget(base, events),
+        "engine.compute_monthly_spend": lambda: engine.compute_monthly_spend(events, month, year),
+        "engine.compute_outstanding_liabilities": lambda: engine.compute_outstanding_liabilities(events),
+        "engine.compute_outstanding_receivables": lambda: engine.compute_outstanding_receivables(events),
+        "engine.compute_friend_balances": lambda: engine.compute_friend_balances(events),
+        "engine.compute_category_spend": lambda: engine.compute_category_spend(events, month, year),
+        "engine.compute_summary": lambda: engine.compute_summary(events, base, month, year),
+        # Same fold over prebuilt LedgerEvent records, and the conversion
+        # dicts no longer pay on the way in.
+        "engine.compute_summary records": lambda: engine.compute_summary(records, base, month, year),
+        "engine.as_records": lambda: list(engine.as_records(events)),
+        "engine.compute_summary_by_currency": lambda: engine.compute_summary_by_currency(
+            events, base, month, year),
+        "engine.compute_summary fx=USD": lambda: engine.compute_summary(
+            events, base, month, year, currency="USD", fx=rates),
+        "engine.events_for_budget_month": lambda: engine.events_for_budget_month(events, month, year),
+        "engine.compute_summary validate=True": lambda: engine.compute_summary(
+            events, base, month, year, validate=True),
+        "validation.validate_events": lambda: validation.validate_events(events),
+    }
+    return [_result(name, len(events), _time(fn, repeat)) for name, fn in cases.items()]
+
+
+def bench_money(events: list[dict], repeat: int) -> list[dict]:
+    """
+    Totalling every amount: a raw int loop as the floor, chained
+    Money additions (one object per step), and the int-backed paths.
+    """
+    amounts = [e["amount"] for e in events]
+    values = [Money(e["amount"], CURRENCIES[e.get("currency", engine.HOME_CURRENCY)]) for e in events]
+    home = [m for m in values if m.currency.code == engine.HOME_CURRENCY]
+
+    def int_loop():
+        total = 0
+        for amount in amounts:
+            total += amount
+        return total
+
+    def add_chain():
+        total = Money(0)
+        for m in home:
+            total = total + m
+        return total
+
+    def totals():
+        t = MoneyTotals()
+        t.update(values)
+        return t
+
+    cases = {
+        "money.int_loop": int_loop,
+        "money.add_chain": add_chain,
+        "money.Money.sum": lambda: Money.sum(home),
+        "money.MoneyTotals.update": totals,
+        "money.MoneyBatch.total": lambda: MoneyBatch(amounts).total(),
+    }
+    return [_result(name, len(events), _time(fn, repeat)) for name, fn in cases.items()]
+
+
+def bench_db(events: list[dict], spec: LedgerSpec, repeat: int, workdir: Path) -> list[dict]:
+    """
+    Bulk inserts (one run each, into fresh files) and the cli summary
+    path against the resulting ledger.
+    """
+    n = len(events)
+    month, year = spec.last_month
+    results = []
+
+    # append_event in one transaction, like seed.py.
+    ledger = str(workdir / f"append-{n}.db")
+    connect(ledger).close()
+
+    def append_all():
+        with transaction(ledger) as conn:
+            for e in events:
+                append_event(conn, e)
+
+    results.append(_result("db.append_event", n, _time(append_all, 1)))
+
+    source = workdir / f"events-{n}.jsonl"
+    write_jsonl(events, source)
+    imported = str(workdir / f"import-{n}.db")
+    conn = connect(imported)
+    try:
+        _, elapsed = import_events(conn, str(source), "jsonl")
+    finally:
+        conn.close()
+    results.append(_result("db.import_events", n, [elapsed]))
+
+    # Group bills: one committed add_split per bill vs every bill's
+    # events in a single append_events transaction.
+    bills = [
+        (e["amount"], [f"Friend {(i + k) % max(spec.friends, 1)}" for k in range(3)], e["event_date"])
+        for i, e in enumerate(events[:max(n // 10, 1)])
+    ]
+    split_db = str(workdir / f"split-{n}.db")
+    conn = connect(split_db)
+    try:
+        def split_each():
+            for total, friends, d in bills:
+                add_split(conn, total, friends, category="Bench", event_date=d)
+
+        results.append(_result("db.add_split", len(bills), _time(split_each, 1)))
+    finally:
+        conn.close()
+
+    batched_db = str(workdir / f"split-batched-{n}.db")
+    connect(batched_db).close()
+
+    def split_batched():
+        with transaction(batched_db) as conn:
+            append_events(conn, [
+                e for total, friends, d in bills
+                for e in engine.plan_split(total, friends, category="Bench", event_date=d)
+            ])
+
+    results.append(_result("db.splits_batched", len(bills), _time(split_batched, 1)))
+
+    # cli.summary prints; time it against the appended ledger.
+    saved = cli.DB_PATH
+    cli.DB_PATH = ledger
+    try:
+        for rescan in (False, True):
+            args = argparse.Namespace(
+                month=month, year=year, rescan=rescan, currency=None,
+                no_daemon=True, profile=False, profile_out=None,
+            )
+
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cli.summary(args)
+
+            name = "cli.summary --rescan" if rescan else "cli.summary"
+            results.append(_result(name, n, _time(run, repeat)))
+    finally:
+        cli.DB_PATH = saved
+        get_pool(ledger).close()
+
+    return results
+
+
+def bench_startup(workdir: Path, runs: int) -> list[dict]:
+    """
+    Cold start of one-shot cli.py calls, each in a fresh interpreter
+    against a scratch ledger. "startup.python" is the floor.
+    """
+    home = workdir / "startup"
+    home.mkdir()
+    script = str(Path(__file__).with_name("cli.py"))
+
+    def cli_call(*argv):
+        return [sys.executable, script, *argv]
+
+    # Create and migrate the ledger outside the timings.
+    subprocess.run(cli_call("add", "--type", "expense", "--amount", "1"),
+                   cwd=home, check=True, capture_output=True)
+
+    cases = {
+        "startup.python": [sys.executable, "-c", "pass"],
+        "startup.cli --help": cli_call("--help"),
+        "startup.cli add": cli_call("add", "--type", "expense", "--amount", "100", "--category", "Bench"),
+        "startup.cli summary": cli_call("summary", "--month", "1", "--year", "2025"),
+    }
+
+    results = []
+    for name, cmd in cases.items():
+        def call():
+            subprocess.run(cmd, cwd=home, check=True, stdout=subprocess.DEVNULL)
+
+        results.append(_result(name, 0, _time(call, runs)))
+    return results
+
+
+def run(
+        sizes: list[int],
+        spec: LedgerSpec,
+        repeat: int = 3,
+        db: bool = True,
+        startup_runs: int = 0,
+        progress=None,
+) -> dict:
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix="moneytrace-bench-"))
+    rates = generate_rates(spec)
+    try:
+        if startup_runs:
+            if progress:
+                progress("cli startup")
+            results += bench_startup(workdir, startup_runs)
+
+        for size in sizes:
+            events = list(generate_events(replace(spec, events=size)))
+            if progress:
+                progress(f"{size:,} events")
+
+            results += bench_engine(events, spec, repeat, rates)
+            results += bench_money(events, repeat)
+            if db:
+                results += bench_db(events, spec, repeat, workdir)
+            del events
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"meta": _meta(spec, sizes, repeat), "results": results}
+
+
+def _meta(spec: LedgerSpec, sizes: list[int], repeat: int) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "repeat": repeat,
+        "spec": {**asdict(spec), "events": None, "start": spec.start.isoformat()},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def compare(base: dict, head: dict, threshold: float = 0.10) -> list[str]:
+    """
+    Prints best times side by side; returns the regressions (head
+    slower than base by more than threshold).
+    """
+    before = {(r["name"], r["size"]): r["best"] for r in base["results"]}
+    regressions = []
+
+    print(f"{'benchmark':<42}{'size':>10}{'base':>11}{'head':>11}{'change':>9}")
+    for r in head["results"]:
+        key = (r["name"], r["size"])
+        if key not in before:
+            continue
+        old, new = before[key], r["best"]
+        change = new / old - 1 if old else 0.0
+        flag = " !" if change > threshold else ""
+        print(f"{r['name']:<42}{r['size']:>10,}{old * 1e3:>9.2f}ms{new * 1e3:>9.2f}ms{change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(f"{r['name']} @ {r['size']:,}: {change:+.1%}")
+
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the ledger engine")
+    sub = p.add_subparsers(dest="command")
+
+    c = sub.add_parser("compare", help="Compare two result files")
+    c.add_argument("base")
+    c.add_argument("head")
+    c.add_argument("--threshold", type=float, default=0.10,
+                   help="Slowdown that counts as a regression (default: 0.10)")
+
+    p.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=LedgerSpec.seed)
+    p.add_argument("--friends", type=int, default=LedgerSpec.friends)
+    p.add_argument("--categories", type=int, default=LedgerSpec.categories)
+    p.add_argument("--days", type=int, default=LedgerSpec.days)
+    p.add_argument("--mix", type=json.loads,
+                   help='Type weights as JSON, e.g. \'{"expense": 9, "budget_adjustment": 1}\'')
+    p.add_argument("--currencies", type=json.loads,
+                   help='Currency weights as JSON, e.g. \'{"INR": 8, "USD": 2}\'')
+    p.add_argument("--no-db", action="store_true", help="Skip insert and cli summary benchmarks")
+    p.add_argument("--startup-runs", type=int, default=20,
+                   help="Fresh-interpreter cli.py calls per startup case (0 to skip)")
+    p.add_argument("--out", help="Results file (default: stdout)")
+
+    args = p.parse_args()
+
+    if args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.head) as f:
+            head = json.load(f)
+        regressions = compare(base, head, args.threshold)
+        for r in regressions:
+            print("✗", r, file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+    spec = LedgerSpec(
+        seed=args.seed,
+        friends=args.friends,
+        categories=args.categories,
+        days=args.days,
+        mix=args.mix or dict(DEFAULT_MIX),
+        currencies=args.currencies or {engine.HOME_CURRENCY: 1},
+    )
+    report = run(args.sizes, spec, args.repeat, not args.no_db, args.startup_runs,
+                 progress=lambda msg: print(msg, file=sys.stderr))
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
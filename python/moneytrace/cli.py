@@ -1,73 +1,293 @@
 # cli.py
+#
+# One-shot commands are scripted in bulk, so only argparse is imported
+# up front; each command imports what it needs when it runs.
 import argparse
-from datetime import date
-from db import init_db
-from engine import (
-    compute_available_budget,
-    compute_monthly_spend,
-    compute_outstanding_liabilities,
-    compute_outstanding_receivables,
-)
+import sys
 
 DB_PATH = "moneytrace.db"
 BASE_BUDGET = 1_000_000  # ₹10,000 in paise
 
 
+def _daemon(args):
+    """
+    A client for a running `serve` daemon, or None to work locally.
+    """
+    if args.no_daemon or args.profile or args.profile_out:
+        return None
+
+    import daemon
+
+    return daemon.connect(args.socket)
+
+
 def add_event(args):
-    conn = init_db(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("""
-    INSERT INTO events (type, amount, category, friend, description, event_date)
-    VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        args.type,
-        args.amount,
-        args.category,
-        args.friend,
-        args.description,
-        args.date or date.today().isoformat(),
-    ))
-
-    conn.commit()
+    if (client := _daemon(args)) is not None:
+        from daemon import DaemonError
+
+        with client:
+            try:
+                client.call("add", event={
+                    "type": args.type,
+                    "amount": args.amount,
+                    "category": args.category,
+                    "friend": args.friend,
+                    "description": args.description,
+                    "event_date": args.date,
+                    "settles": args.settles,
+                    "currency": args.currency,
+                })
+            except DaemonError as e:
+                sys.exit(f"✗ {e}")
+        print("✓ Event added")
+        return
+
+    from datetime import date
+    from db import append_event, transaction
+
+    with transaction(DB_PATH) as conn:
+        append_event(conn, {
+            "type": args.type,
+            "amount": args.amount,
+            "category": args.category,
+            "friend": args.friend,
+            "description": args.description,
+            "event_date": date.fromisoformat(args.date) if args.date else date.today(),
+            "settles": args.settles,
+            "currency": args.currency,
+        })
+
     print("✓ Event added")
 
 
+def split(args):
+    options = {
+        "payer": args.payer,
+        "weights": args.weights,
+        "exact": args.exact,
+        "include_self": not args.no_self,
+        "category": args.category,
+        "description": args.description,
+    }
+
+    if (client := _daemon(args)) is not None:
+        from daemon import DaemonError
+
+        with client:
+            try:
+                ids = client.call("split", total=args.total, friends=args.friends,
+                                  event_date=args.date, **options)
+            except DaemonError as e:
+                sys.exit(f"✗ {e}")
+    else:
+        from datetime import date
+        from db import add_split, connection
+
+        with connection(DB_PATH) as conn:
+            ids = add_split(
+                conn, args.total, args.friends,
+                event_date=date.fromisoformat(args.date) if args.date else date.today(),
+                **options,
+            )
+
+    print(f"✓ Split recorded ({len(ids)} events)")
+
+
 def summary(args):
-    conn = init_db(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("SELECT type, amount, category, friend, description, event_date FROM events")
-    rows = cur.fetchall()
-
-    events = [
-        {
-            "type": r[0],
-            "amount": r[1],
-            "category": r[2],
-            "friend": r[3],
-            "description": r[4],
-            "event_date": date.fromisoformat(r[5]),
-        }
-        for r in rows
-    ]
-
-    budget = compute_available_budget(BASE_BUDGET, events)
-    spend = compute_monthly_spend(events, args.month, args.year)
-    owed = compute_outstanding_liabilities(events)
-    due = compute_outstanding_receivables(events)
+    if (client := _daemon(args)) is not None:
+        from daemon import DaemonError
 
-    def fmt(x): return f"₹{x / 100:.2f}"
+        with client:
+            try:
+                s = client.call(
+                    "summary", base=BASE_BUDGET, month=args.month, year=args.year,
+                    rescan=args.rescan, currency=args.currency)
+            except DaemonError as e:
+                sys.exit(f"✗ {e}")
+        print_summary(s["month_spend"], s["month_budget"], s["budget"],
+                      s["outstanding_liabilities"], s["outstanding_receivables"],
+                      args.currency)
+        return
+
+    import fx
+    import instrument
+    from balances import load_summary
+    from db import connection
+    from engine import compute_summary
+    from event_log import iter_ledger
+    from snapshots import budget_for_month
+
+    with connection(DB_PATH) as conn:
+        s = None
+        # The stored balances and snapshots are home currency only;
+        # they are also the answer when rates are missing and no
+        # currency was asked for.
+        if args.currency or fx.has_foreign(conn):
+            try:
+                with instrument.phase("summary.month_budget"):
+                    month_budget = fx.month_budget(
+                        conn, BASE_BUDGET, args.month, args.year, args.currency)
+                with instrument.phase("summary.totals"):
+                    s = fx.summarize(conn, BASE_BUDGET, args.month, args.year, args.currency)
+            except fx.MissingRate as e:
+                if args.currency:
+                    sys.exit(f"✗ {e}")
+
+        if s is None:
+            with instrument.phase("summary.month_budget"):
+                month_budget = budget_for_month(conn, BASE_BUDGET, args.month, args.year)
+            with instrument.phase("summary.totals"):
+                if args.rescan:
+                    s = compute_summary(iter_ledger(conn), BASE_BUDGET, args.month, args.year)
+                else:
+                    s = load_summary(conn, BASE_BUDGET, args.month, args.year)
+    print_summary(s.month_spend, month_budget, s.budget,
+                  s.outstanding_liabilities, s.outstanding_receivables, args.currency)
+
+
+def print_summary(spend, month_budget, budget, owed, due, currency=None):
+    from currency import CURRENCIES, INR
+
+    c = CURRENCIES.get(currency, INR)
+
+    def fmt(x): return f"{c.symbol}{x / c.minor_unit:.{len(str(c.minor_unit)) - 1}f}"
 
     print("=== SUMMARY ===")
     print("Month spend     :", fmt(spend))
+    print("Month budget    :", fmt(month_budget))
     print("Budget left     :", fmt(budget))
     print("You owe         :", fmt(owed))
     print("You will get    :", fmt(due))
 
 
+def fx_rates(args):
+    import fx
+    from datetime import date
+    from db import connection, transaction
+
+    if args.rate is not None:
+        with transaction(DB_PATH) as conn:
+            fx.set_rate(conn, args.code, date.fromisoformat(args.date) if args.date else date.today(),
+                        args.rate)
+        print("✓ Rate recorded")
+        return
+
+    with connection(DB_PATH) as conn:
+        for code, day, rate in fx.list_rates(conn, args.code):
+            print(f"{code}  {day}  {rate}")
+
+
+def verify_balances(args):
+    import open_items
+    from balances import rebuild, verify
+    from db import connection
+
+    with connection(DB_PATH) as conn:
+        problems = verify(conn) + open_items.verify(conn)
+        for p in problems:
+            print("✗", p)
+
+        if not problems:
+            print("✓ Balances match the event log")
+        elif args.fix:
+            rebuild(conn)
+            open_items.rebuild(conn)
+            print("✓ Balances rebuilt from the event log")
+
+
+def list_open(args):
+    import open_items
+    from datetime import date
+    from db import connection
+
+    def fmt(x): return f"₹{x / 100:.2f}"
+
+    kind = {"liability": "liability_created", "receivable": "receivable_created"}.get(args.kind)
+    today = date.today()
+
+    with connection(DB_PATH) as conn:
+        if args.aging:
+            labels = open_items.bucket_labels()
+            print(f"{'kind':<20}{'friend':<16}{'items':>6}"
+                  + "".join(f"{label:>13}" for label in labels) + f"{'open':>13}")
+            for row in open_items.aging(conn, today, kind=kind, friend=args.friend):
+                print(f"{row['kind']:<20}{row['friend'] or '-':<16}{row['items']:>6}"
+                      + "".join(f"{fmt(row[label]):>13}" for label in labels)
+                      + f"{fmt(row['open']):>13}")
+            return
+
+        for item in open_items.open_items(conn, kind, args.friend):
+            print(f"{item.id}  {item.event_date}  {item.age(today):>4}d  "
+                  f"{item.kind:<20}{item.friend or '-':<16}"
+                  f"{fmt(item.remaining):>12} of {fmt(item.amount)}")
+
+
+def import_file(args):
+    from db import connection
+    from importer import import_events
+
+    def progress(n, elapsed):
+        print(f"  {n:,} rows ({n / elapsed:,.0f} rows/s)" if elapsed else f"  {n:,} rows")
+
+    with connection(DB_PATH) as conn:
+        total, elapsed = import_events(conn, args.path, args.format, args.batch_size, progress)
+    rate = total / elapsed if elapsed else 0
+    print(f"✓ Imported {total:,} events in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+def partition(args):
+    from db import connection
+    from event_log import PartitionRouter
+    from partitions import archive_year, split_year
+
+    with connection(DB_PATH) as conn, PartitionRouter(conn) as router:
+        if args.year not in router.years():
+            moved = split_year(conn, args.year, print)
+            print(f"✓ Moved {moved:,} events from {args.year} into its own partition")
+        if args.archive:
+            path = archive_year(conn, args.year)
+            print(f"✓ Archived {args.year} to {path.name}")
+
+
+def serve(args):
+    import asyncio
+    from daemon import serve
+
+    print(f"Serving {DB_PATH} on {args.socket} (Ctrl-C to stop)", file=sys.stderr)
+    asyncio.run(serve(DB_PATH, args.socket))
+
+
+def batch(args):
+    import time
+    from batch_summary import find_ledgers, run_batch
+
+    ledgers = find_ledgers(args.paths)
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+
+    started = time.perf_counter()
+    try:
+        n = run_batch(
+            ledgers, out, args.format, args.base, args.month, args.year,
+            workers=args.workers, chunksize=args.chunksize,
+        )
+    finally:
+        if args.out:
+            out.close()
+
+    print(f"✓ Summarized {n} ledgers in {time.perf_counter() - started:.2f}s",
+          file=sys.stderr)
+
+
 def main():
     p = argparse.ArgumentParser()
+    p.add_argument("--socket", default="moneytrace.sock",
+                   help="Daemon socket used by serve and, when it is up, by add/summary")
+    p.add_argument("--no-daemon", action="store_true",
+                   help="Work on the ledger directly even if a daemon is running")
+    p.add_argument("--profile", action="store_true",
+                   help="Print a phase breakdown to stderr")
+    p.add_argument("--profile-out", metavar="FILE",
+                   help="Also dump cProfile stats to FILE (implies --profile)")
     sub = p.add_subparsers(dest="command", required=True)
 
     add = sub.add_parser("add", help="Add a financial event")
@@ -77,13 +297,76 @@ def main():
     add.add_argument("--friend")
     add.add_argument("--description")
     add.add_argument("--date")
+    add.add_argument("--settles", metavar="EVENT_ID",
+                     help="Liability/receivable this payback settles (default: oldest first)")
+    add.add_argument("--currency", type=str.upper, help="ISO code (default: INR)")
     add.set_defaults(func=add_event)
 
+    sp = sub.add_parser("split", help="Record a group bill and everyone's share")
+    sp.add_argument("total", type=int, help="Bill total in minor units")
+    sp.add_argument("--friends", nargs="+", required=True)
+    sp.add_argument("--payer", help="Friend who paid (default: you)")
+    sp.add_argument("--weights", type=int, nargs="+",
+                    help="Share weights: yours first (unless --no-self), then --friends order")
+    sp.add_argument("--exact", type=int, nargs="+",
+                    help="Exact shares in the same order; must sum to the total")
+    sp.add_argument("--no-self", action="store_true", help="You are not part of the split")
+    sp.add_argument("--category")
+    sp.add_argument("--description")
+    sp.add_argument("--date")
+    sp.set_defaults(func=split)
+
     s = sub.add_parser("summary", help="Show monthly summary")
     s.add_argument("--month", type=int, required=True)
     s.add_argument("--year", type=int, required=True)
+    s.add_argument("--rescan", action="store_true",
+                   help="Fold the full event log instead of stored balances")
+    s.add_argument("--currency", type=str.upper,
+                   help="Report in this currency, converting at each event's date (default: INR)")
     s.set_defaults(func=summary)
 
+    x = sub.add_parser("fx", help="Record or list exchange rates")
+    x.add_argument("code", type=str.upper, nargs="?", help="Currency, e.g. USD")
+    x.add_argument("rate", nargs="?", help="INR per unit of the currency, e.g. 83.25")
+    x.add_argument("--date", help="Effective from (default: today)")
+    x.set_defaults(func=fx_rates)
+
+    v = sub.add_parser("verify", help="Check stored balances against the event log")
+    v.add_argument("--fix", action="store_true", help="Rebuild balances on mismatch")
+    v.set_defaults(func=verify_balances)
+
+    op = sub.add_parser("open", help="List open liabilities and receivables")
+    op.add_argument("--kind", choices=["liability", "receivable"])
+    op.add_argument("--friend")
+    op.add_argument("--aging", action="store_true", help="Totals per friend by age bucket")
+    op.set_defaults(func=list_open)
+
+    imp = sub.add_parser("import", help="Bulk import events from CSV or JSONL")
+    imp.add_argument("path", help='File to import, or "-" to read JSONL from stdin')
+    imp.add_argument("--format", choices=["csv", "jsonl"])
+    imp.add_argument("--batch-size", type=int, default=50_000)
+    imp.set_defaults(func=import_file)
+
+    pt = sub.add_parser("partition", help="Move a closed year into its own file")
+    pt.add_argument("year", type=int)
+    pt.add_argument("--archive", action="store_true",
+                    help="Also compress it into the read-only archive tier")
+    pt.set_defaults(func=partition)
+
+    sv = sub.add_parser("serve", help="Keep the ledger warm behind a Unix socket")
+    sv.set_defaults(func=serve)
+
+    b = sub.add_parser("batch", help="Summarize many ledger files in parallel")
+    b.add_argument("paths", nargs="+", help="Ledger files or directories of *.db")
+    b.add_argument("--out", help="Report file (default: stdout)")
+    b.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    b.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    b.add_argument("--chunksize", type=int, default=4, help="Ledgers per scheduled task")
+    b.add_argument("--month", type=int)
+    b.add_argument("--year", type=int)
+    b.add_argument("--base", type=int, default=BASE_BUDGET)
+    b.set_defaults(func=batch)
+
     args = p.parse_args()
 
     # Safety guard (never hurts)
@@ -91,7 +374,35 @@ def main():
         p.print_help()
         return
 
-    args.func(args)
+    if args.profile or args.profile_out:
+        run_profiled(args)
+    else:
+        args.func(args)
+
+
+def run_profiled(args):
+    """
+    Runs the command with instrumentation on and prints the phase
+    breakdown to stderr; --profile-out also dumps cProfile stats.
+    """
+    import instrument
+
+    with instrument.profiling() as profile:
+        if args.profile_out:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.runcall(args.func, args)
+            profiler.dump_stats(args.profile_out)
+        else:
+            args.func(args)
+
+    print(file=sys.stderr)
+    for line in profile.report():
+        print(line, file=sys.stderr)
+    if args.profile_out:
+        print(f"\ncProfile stats written to {args.profile_out} "
+              f"(python -m pstats {args.profile_out})", file=sys.stderr)
 
 
 if __name__ == "__main__":
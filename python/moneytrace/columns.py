@@ -0,0 +1,105 @@
+# columns.py
+"""
+Columnar event batches.
+
+EventColumns stores a ledger as parallel typed arrays instead of one
+object per event: int64 amounts, int32 day numbers, int8 event codes,
+int32 category / friend codes and int16 currency codes into small
+lookup tables.
+
+Iterating a batch yields engine.LedgerEvent records, so every
+engine.compute_* function accepts it unchanged; vector_engine reads
+the arrays directly.
+"""
+
+from array import array
+from typing import Iterable, Iterator
+
+from engine import LedgerEvent, as_records
+
+NO_FRIEND = -1
+
+
+class EventColumns:
+    __slots__ = (
+        "codes", "amounts", "days",
+        "category_ids", "friend_ids", "currency_ids",
+        "categories", "friends", "currencies",
+        "_category_index", "_friend_index", "_currency_index",
+    )
+
+    def __init__(self):
+        self.codes = array("b")
+        self.amounts = array("q")
+        self.days = array("i")
+        self.category_ids = array("i")
+        self.friend_ids = array("i")
+        self.currency_ids = array("h")
+
+        # Code -> value tables; the index dicts map back.
+        self.categories: list[str | None] = []
+        self.friends: list[str] = []
+        self.currencies: list[str] = []
+        self._category_index: dict[str | None, int] = {}
+        self._friend_index: dict[str, int] = {}
+        self._currency_index: dict[str, int] = {}
+
+    @classmethod
+    def from_events(cls, events: Iterable) -> "EventColumns":
+        """
+        Builds a batch from engine dicts, LedgerEvent records or a
+        db.iter_events stream.
+        """
+        batch = cls()
+        batch.extend(events)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def extend(self, events: Iterable) -> None:
+        for r in as_records(events):
+            self.append(r)
+
+    def append(self, r: LedgerEvent) -> None:
+        cid = self._category_index.get(r.category)
+        if cid is None:
+            cid = self._category_index[r.category] = len(self.categories)
+            self.categories.append(r.category)
+
+        if r.friend:
+            fid = self._friend_index.get(r.friend)
+            if fid is None:
+                fid = self._friend_index[r.friend] = len(self.friends)
+                self.friends.append(r.friend)
+        else:
+            fid = NO_FRIEND
+
+        xid = self._currency_index.get(r.currency)
+        if xid is None:
+            xid = self._currency_index[r.currency] = len(self.currencies)
+            self.currencies.append(r.currency)
+
+        self.codes.append(r.code)
+        self.amounts.append(r.amount)
+        self.days.append(r.day)
+        self.category_ids.append(cid)
+        self.friend_ids.append(fid)
+        self.currency_ids.append(xid)
+
+    def __iter__(self) -> Iterator[LedgerEvent]:
+        categories = self.categories
+        friends = self.friends
+        currencies = self.currencies
+
+        for code, amount, day, cid, fid, xid in zip(
+                self.codes, self.amounts, self.days,
+                self.category_ids, self.friend_ids, self.currency_ids):
+            yield LedgerEvent(
+                code,
+                amount,
+                day,
+                categories[cid],
+                friends[fid] if fid != NO_FRIEND else None,
+                currencies[xid],
+            )
@@ -1,13 +1,57 @@
-from dataclasses import dataclass
+"""
+Currencies are interned: there is one Currency object per ISO code,
+so they compare (and hash) by identity. Constructing a known code
+again returns the registered instance.
+"""
+
+# Known currencies by ISO code.
+CURRENCIES: dict[str, "Currency"] = {}
 
 
-@dataclass(frozen=True)
 class Currency:
+    __slots__ = ("code", "symbol", "minor_unit", "name")
+
     code: str            # "INR", "USD"
     symbol: str          # "₹", "$"
     minor_unit: int      # 100 for paise/cents, 1 for JPY
     name: str            # "Indian Rupee"
 
+    def __new__(cls, code: str, symbol: str, minor_unit: int, name: str) -> "Currency":
+        existing = CURRENCIES.get(code)
+        if existing is not None:
+            if (existing.symbol, existing.minor_unit, existing.name) != (symbol, minor_unit, name):
+                raise ValueError(f"{code} is already registered with different details")
+            return existing
+
+        self = super().__new__(cls)
+        for attr, value in zip(cls.__slots__, (code, symbol, minor_unit, name)):
+            object.__setattr__(self, attr, value)
+        CURRENCIES[code] = self
+        return self
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("Currency is immutable")
+
+    def __delattr__(self, attr):
+        raise AttributeError("Currency is immutable")
+
+    def __reduce__(self):
+        # Unpickles to the interned instance.
+        return get, (self.code,)
+
+    def __repr__(self) -> str:
+        return f"Currency({self.code!r})"
+
+
+def get(code: str) -> Currency:
+    """
+    The interned Currency for an ISO code.
+    """
+    c = CURRENCIES.get(code)
+    if c is None:
+        raise ValueError(f"Unknown currency: {code}")
+    return c
+
 
 INR = Currency(
     code="INR",
@@ -21,4 +65,25 @@ USD = Currency(
     symbol="$",
     minor_unit=100,
     name="United States Dollar",
-)
\ No newline at end of file
+)
+
+EUR = Currency(
+    code="EUR",
+    symbol="€",
+    minor_unit=100,
+    name="Euro",
+)
+
+GBP = Currency(
+    code="GBP",
+    symbol="£",
+    minor_unit=100,
+    name="Pound Sterling",
+)
+
+JPY = Currency(
+    code="JPY",
+    symbol="¥",
+    minor_unit=1,
+    name="Japanese Yen",
+)
@@ -0,0 +1,209 @@
+# daemon.py
+"""
+Long-running ledger daemon on a Unix domain socket.
+
+`cli.py serve` keeps an AsyncEventStore open, so connections, the
+friend cache and the summary caches stay warm between calls. The
+protocol is newline-delimited JSON, one reply per request, in order:
+
+    -> {"op": "add", "event": {"type": "expense", "amount": 500, ...}}
+    <- {"ok": true, "result": "<event id>"}
+
+    -> {"op": "nope"}
+    <- {"ok": false, "error": "Unknown op: nope"}
+
+Ops:
+    ping                                  -> "pong"
+    add         event                     -> id
+    add_many    events                    -> [id, ...] (one transaction)
+    split       total, friends, ...       -> [id, ...] (engine.plan_split options)
+    summary     base, month, year, rescan,
+                currency                  -> summary fields + month_budget
+    friends                               -> {friend: balance}
+    friend      name                      -> balance
+
+Event dates are ISO strings (default: today). Amounts are minor units.
+
+The client half only needs socket and json, so the cli can probe for
+a running daemon without loading the ledger stack.
+"""
+
+import json
+import os
+import socket
+
+SOCKET_PATH = "moneytrace.sock"
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class DaemonError(Exception):
+    """
+    The daemon rejected a request.
+    """
+
+
+class DaemonClient:
+    """
+    One persistent connection to a running daemon.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH, timeout: float | None = 30.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self._reader = self.sock.makefile("rb")
+
+    def call(self, op: str, **params):
+        self.sock.sendall(json.dumps({"op": op, **params}).encode() + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+
+        reply = json.loads(line)
+        if not reply["ok"]:
+            raise DaemonError(reply["error"])
+        return reply["result"]
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def connect(path: str = SOCKET_PATH) -> DaemonClient | None:
+    """
+    A client if a daemon is listening on `path`, otherwise None.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        return DaemonClient(path)
+    except OSError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def _to_event(raw: dict) -> dict:
+    from datetime import date
+
+    d = raw.get("event_date")
+    return {
+        "type": raw["type"],
+        "amount": raw["amount"],
+        "category": raw.get("category"),
+        "friend": raw.get("friend"),
+        "description": raw.get("description"),
+        "settles": raw.get("settles"),
+        "currency": raw.get("currency"),
+        "event_date": date.fromisoformat(d) if d else date.today(),
+    }
+
+
+async def _dispatch(store, req: dict):
+    op = req.get("op")
+
+    if op == "ping":
+        return "pong"
+
+    if op == "add":
+        return await store.add_event(_to_event(req["event"]))
+
+    if op == "add_many":
+        return await store.add_events([_to_event(e) for e in req["events"]])
+
+    if op == "split":
+        from datetime import date
+        from engine import plan_split
+
+        d = req.pop("event_date", None)
+        del req["op"]
+        events = plan_split(**req, event_date=date.fromisoformat(d) if d else None)
+        return await store.add_events(events)
+
+    if op == "summary":
+        base = req.get("base", 0)
+        month, year, currency = req.get("month"), req.get("year"), req.get("currency")
+        s = await store.summary(base, month, year, bool(req.get("rescan")), currency)
+        result = {
+            "budget": s.budget,
+            "month_spend": s.month_spend,
+            "outstanding_liabilities": s.outstanding_liabilities,
+            "outstanding_receivables": s.outstanding_receivables,
+            "friend_balances": s.friend_balances,
+            "category_spend": s.category_spend,
+        }
+        if month and year:
+            result["month_budget"] = await store.month_budget(base, month, year, currency)
+        return result
+
+    if op == "friends":
+        return (await store.summary()).friend_balances
+
+    if op == "friend":
+        return await store.friend_balance(req["name"])
+
+    raise ValueError(f"Unknown op: {op}")
+
+
+async def _handle(store, reader, writer) -> None:
+    try:
+        while line := await reader.readline():
+            try:
+                reply = {"ok": True, "result": await _dispatch(store, json.loads(line))}
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(db_path: str, path: str = SOCKET_PATH, ready=None) -> None:
+    """
+    Serves until SIGINT/SIGTERM. Refuses to start if another daemon
+    is already listening; a stale socket file is replaced.
+    """
+    import asyncio
+    import signal
+    from async_store import AsyncEventStore
+
+    if os.path.exists(path):
+        if (client := connect(path)) is not None:
+            client.close()
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        os.unlink(path)
+
+    async with AsyncEventStore(db_path) as store:
+        server = await asyncio.start_unix_server(
+            lambda r, w: _handle(store, r, w), path=path)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        try:
+            async with server:
+                if ready:
+                    ready()
+                await stop.wait()
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
@@ -1,49 +1,288 @@
-def init_db(path="moneytrace.db"):
-    conn = sqlite3.connect(path)
-
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS friends (
-        id TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        phone TEXT,
-        is_contact INTEGER NOT NULL DEFAULT 0
-    )
-    """)
-
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS events (
-        id TEXT PRIMARY KEY,
-        type TEXT NOT NULL,
-        amount INTEGER NOT NULL,
-        category TEXT,
-        friend_id TEXT,
-        description TEXT,
-        event_date TEXT NOT NULL,
-        FOREIGN KEY(friend_id) REFERENCES friends(id)
+import sqlite3
+import threading
+from contextlib import contextmanager
+import os
+from queue import Empty, Queue
+from uuid import uuid4
+
+from balances import apply_events
+from currency import CURRENCIES
+from engine import HOME_CURRENCY, plan_split
+# EVENT_BATCH_SIZE and iter_events are re-exported; they predate event_log.
+from event_log import EVENT_BATCH_SIZE, bump_version, iter_events
+from friend_registry import FriendRegistry
+from migrations import migrate
+from open_items import apply_event as apply_open_item
+from open_items import apply_events as apply_open_items
+from snapshots import invalidate as invalidate_snapshots
+
+
+DB_PATH = "moneytrace.db"
+
+# Prepared statements kept per connection (sqlite3 default is 128).
+STATEMENT_CACHE_SIZE = 512
+
+POOL_SIZE = 4
+
+# Database files whose schema is known current in this process.
+_ready: set[str] = set()
+
+_pools: dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class LedgerConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that carries its own friend cache, and the
+    ledger version its latest append_event / append_events wrote
+    (summary_cache.SummaryCache.note_insert reads it).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.friends = FriendRegistry(self)
+        self.last_version: int | None = None
+
+
+def connect(path: str = DB_PATH, progress=None) -> LedgerConnection:
+    """
+    Opens a tuned connection.
+
+    Schema setup runs once per database file per process, and even
+    then costs a single PRAGMA user_version read on an up-to-date file.
+    """
+    conn = sqlite3.connect(
+        path,
+        factory=LedgerConnection,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
     )
-    """)
 
-    conn.commit()
+    key = path if path == ":memory:" else os.path.realpath(path)
+    if key == ":memory:" or key not in _ready:
+        if progress:
+            migrate(conn, progress)
+        else:
+            migrate(conn)
+        if key != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+            _ready.add(key)
+
     return conn
 
 
-def get_or_create_friend(conn, name: str, phone: str | None = None):
-    cur = conn.cursor()
+def init_db(path=DB_PATH):
+    return connect(path)
 
-    cur.execute(
-        "SELECT id FROM friends WHERE name = ? AND (phone = ? OR phone IS NULL)",
-        (name, phone),
-    )
-    row = cur.fetchone()
 
-    if row:
-        return row[0]
+class ConnectionPool:
+    """
+    A fixed-size pool of ready connections to one database file.
 
-    friend_id = str(uuid4())
-    cur.execute("""
-    INSERT INTO friends (id, name, phone, is_contact)
-    VALUES (?, ?, ?, ?)
-    """, (friend_id, name, phone, int(bool(phone))))
+    Connections are handed out exclusively, so the pool may be
+    shared between threads.
+    """
+
+    def __init__(self, path: str = DB_PATH, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle: Queue[LedgerConnection] = Queue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> LedgerConnection:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return connect(self.path)
+
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+                conn.friends.clear()
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        One transaction: committed on success, rolled back on error.
+        """
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                conn.friends.clear()
+                raise
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+
+def get_pool(path: str = DB_PATH) -> ConnectionPool:
+    """
+    The process-wide pool for a database file.
+    """
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
 
+
+@contextmanager
+def connection(path: str = DB_PATH):
+    with get_pool(path).connection() as conn:
+        yield conn
+
+
+@contextmanager
+def transaction(path: str = DB_PATH):
+    with get_pool(path).transaction() as conn:
+        yield conn
+
+
+def friend_registry(conn) -> FriendRegistry:
+    """
+    The connection's cached registry, or a throwaway one for plain
+    sqlite3 connections.
+    """
+    registry = getattr(conn, "friends", None)
+    return registry if registry is not None else FriendRegistry(conn)
+
+
+def get_or_create_friend(conn, name: str, phone: str | None = None):
+    friend_id = friend_registry(conn).get_or_create(name, phone)
     conn.commit()
     return friend_id
+
+
+def _currency(event: dict) -> str:
+    code = event.get("currency") or HOME_CURRENCY
+    if code not in CURRENCIES:
+        raise ValueError(f"Unknown currency: {code}")
+    return code
+
+
+def append_event(conn, event: dict) -> str:
+    """
+    Appends one event and its materialized balance deltas without
+    committing, for use inside transaction().
+    """
+    cur = conn.cursor()
+    event_id = str(uuid4())
+    friend = event.get("friend")
+    friend_id = friend_registry(conn).get_or_create(friend) if friend else None
+
+    cur.execute("""
+    INSERT INTO events (id, type, amount, category, friend, friend_id, description, event_date, settles, currency)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        event_id,
+        event["type"],
+        event["amount"],
+        event.get("category"),
+        friend,
+        friend_id,
+        event.get("description"),
+        event["event_date"].isoformat(),
+        event.get("settles"),
+        _currency(event),
+    ))
+    apply_events(cur, [event])
+    apply_open_item(cur, event_id, event)
+    invalidate_snapshots(cur, event["event_date"])
+    conn.last_version = bump_version(cur)
+
+    return event_id
+
+
+def append_events(conn, events: list[dict]) -> list[str]:
+    """
+    append_event for a batch: friends are resolved in one pass, rows
+    go in with one executemany and aggregates are updated once.
+    Does not commit.
+    """
+    cur = conn.cursor()
+    ids = [str(uuid4()) for _ in events]
+    friend_ids = friend_registry(conn).resolve_friends(e.get("friend") for e in events)
+
+    cur.executemany("""
+    INSERT INTO events (id, type, amount, category, friend, friend_id, description, event_date, settles, currency)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
+            event_id,
+            e["type"],
+            e["amount"],
+            e.get("category"),
+            e.get("friend"),
+            friend_ids.get(e.get("friend")),
+            e.get("description"),
+            e["event_date"].isoformat(),
+            e.get("settles"),
+            _currency(e),
+        )
+        for event_id, e in zip(ids, events)
+    ])
+    apply_events(cur, events)
+    apply_open_items(cur, ids, events)
+    if events:
+        invalidate_snapshots(cur, min(e["event_date"] for e in events))
+        conn.last_version = bump_version(cur)
+
+    return ids
+
+
+def add_split(conn, total: int, friends: list[str], **options) -> list[str]:
+    """
+    Records one group bill (engine.plan_split) atomically: the expense
+    and every receivable, or the liability, commit together.
+
+    For many bills, append_events() over several plans inside one
+    transaction() is the bulk path.
+    """
+    events = plan_split(total, friends, **options)
+    try:
+        ids = append_events(conn, events)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        friend_registry(conn).clear()
+        raise
+
+    return ids
+
+
+def insert_event(conn, event: dict) -> str:
+    """
+    Appends one event and updates the materialized balances
+    in the same transaction.
+    """
+    try:
+        event_id = append_event(conn, event)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        friend_registry(conn).clear()
+        raise
+
+    return event_id
@@ -5,15 +5,26 @@ Ledger engine — source of truth for all financial calculations.
 RULES (NON-NEGOTIABLE):
 - All amounts are integers in minor units (paise / cents)
 - Budget impact happens exactly once
-- Engine is currency-agnostic
+- Totals are kept per currency; currencies only mix through an
+  explicit FX table
 - Engine is pure: no DB, no IO, no formatting
 """
 
 
 from collections import defaultdict
-from typing import Iterable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from itertools import chain
+from typing import Iterable, NamedTuple
 from datetime import date, datetime
 
+# engine.py is imported both as a sibling module (the cli, tests) and
+# as moneytrace.engine (run.py).
+try:
+    from . import instrument
+except ImportError:
+    import instrument
+
 
 # Event types constants
 EXPENSE = "expense"
@@ -23,47 +34,455 @@ PAYBACK_PAID = "payback_paid"
 PAYBACK_RECEIVED = "payback_received"
 BUDGET_ADJUSTMENT = "budget_adjustment"
 
+# Currency of events that do not name one, and of base budgets.
+HOME_CURRENCY = "INR"
+
 
 # ---------------------------------------------------------------------------
-# Core Budget Computation
+# Compact Event Records
 # ---------------------------------------------------------------------------
 
-def compute_available_budget(
-        base_budget_minor: int,
-        events: Iterable[dict],
-) -> int:
+class EventCode(IntEnum):
+    EXPENSE = 0
+    LIABILITY_CREATED = 1
+    RECEIVABLE_CREATED = 2
+    PAYBACK_PAID = 3
+    PAYBACK_RECEIVED = 4
+    BUDGET_ADJUSTMENT = 5
+
+
+EVENT_CODES: dict[str, EventCode] = {
+    EXPENSE: EventCode.EXPENSE,
+    LIABILITY_CREATED: EventCode.LIABILITY_CREATED,
+    RECEIVABLE_CREATED: EventCode.RECEIVABLE_CREATED,
+    PAYBACK_PAID: EventCode.PAYBACK_PAID,
+    PAYBACK_RECEIVED: EventCode.PAYBACK_RECEIVED,
+    BUDGET_ADJUSTMENT: EventCode.BUDGET_ADJUSTMENT,
+}
+
+
+class LedgerEvent(NamedTuple):
     """
-    Computes remaining available budget.
+    Compact event record.
 
-    Formula : 
-        base_budget
-      + budget_adjustments
-      - expenses
-      - outstanding liabilities
-      + received settlements
+    code     : EventCode
+    day      : date.toordinal() of the event date (0 if unknown)
+    currency : ISO code the amount is in
+    """
+    code: int
+    amount: int
+    day: int = 0
+    category: str | None = None
+    friend: str | None = None
+    currency: str = HOME_CURRENCY
+
+
+# Impact matrix, indexed by EventCode.
+#                 EXP  LIAB  RECV  PAID  RCVD  ADJ
+BUDGET_SIGN =    (-1,  -1,    0,    0,   +1,   +1)
+LIABILITY_SIGN = ( 0,  +1,    0,   -1,    0,    0)
+RECEIVABLE_SIGN = (0,   0,   +1,    0,   -1,    0)
+FRIEND_SIGN =    ( 0,  -1,   +1,   +1,   -1,    0)
+CASH_OUT =       ( 1,   0,    0,    1,    0,    0)
+
+
+def to_record(e: dict) -> LedgerEvent | None:
     """
-    budget = base_budget_minor
+    Converts an engine dict to a LedgerEvent.
+
+    Returns None for unknown event types, which the engine ignores.
+    """
+    code = EVENT_CODES.get(e["type"])
+    if code is None:
+        return None
+
+    d = e.get("event_date")
+    return LedgerEvent(
+        code,
+        e["amount"],
+        d.toordinal() if d else 0,
+        e.get("category", "uncategorized"),
+        e.get("friend"),
+        e.get("currency") or HOME_CURRENCY,
+    )
+
+
+def as_records(events: Iterable) -> Iterable[LedgerEvent]:
+    """
+    Lazily normalizes an event stream to LedgerEvent records.
+
+    Streams that already yield LedgerEvent pass through untouched;
+    dict streams are converted one event at a time.
+    """
+    it = iter(events)
+    first = next(it, None)
+    if first is None:
+        return ()
+
+    stream = chain((first,), it)
+    if isinstance(first, LedgerEvent):
+        return stream
+
+    return (r for r in map(to_record, stream) if r is not None)
+
+
+def month_days(month: int, year: int) -> tuple[int, int]:
+    """
+    Half-open day-number range [start, end) covering one month.
+    """
+    start = date(year, month, 1).toordinal()
+    if month == 12:
+        end = date(year + 1, 1, 1).toordinal()
+    else:
+        end = date(year, month + 1, 1).toordinal()
+    return start, end
+
+
+# ---------------------------------------------------------------------------
+# Single-pass Summary
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LedgerSummary:
+    """
+    Every summary metric, produced by one pass over the events.
+
+    Outstanding totals are kept unclamped here; the public
+    accessors clamp them at zero like the compute_* functions do.
+    """
+    budget: int = 0
+    month_spend: int = 0
+    liabilities: int = 0
+    receivables: int = 0
+    friend_balances: dict[str, int] = field(default_factory=dict)
+    category_spend: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def outstanding_liabilities(self) -> int:
+        return max(self.liabilities, 0)
+
+    @property
+    def outstanding_receivables(self) -> int:
+        return max(self.receivables, 0)
 
+
+def _fold(records, start: int, end: int, in_month_filter: bool, factors=None) -> dict:
+    """
+    One pass over the records, with totals kept per currency:
+
+        currency -> [budget, month_spend, liabilities, receivables,
+                     friends, categories]
+
+    Locals are swapped only when the currency changes between
+    consecutive records, so single-currency runs fold at full speed.
+    With factors (currency -> {day: fixed-point factor}, see
+    fx.FxTable.factors) every amount is multiplied by its day's
+    factor on the way in; no per-event objects are built.
+    """
+    groups: dict[str, list] = {}
+    current = None
+    budget = month_spend = liabilities = receivables = 0
+    friends = categories = None
+    scale = None
+
+    for code, amount, day, category, friend, currency in records:
+        if currency != current:
+            if current is not None:
+                groups[current] = [budget, month_spend, liabilities, receivables, friends, categories]
+            budget, month_spend, liabilities, receivables, friends, categories = (
+                groups.get(currency) or (0, 0, 0, 0, defaultdict(int), defaultdict(int)))
+            if factors is not None:
+                scale = factors[currency]
+            current = currency
+
+        if scale is not None:
+            amount *= scale[day]
+
+        # Codes in EventCode order; plain int compares beat the sign
+        # table multiplies, which do work for every metric.
+        if code == 0:  # EXPENSE
+            budget -= amount
+            if start <= day < end:
+                month_spend += amount
+                categories[category] += amount
+            elif not in_month_filter:
+                categories[category] += amount
+        elif code == 1:  # LIABILITY_CREATED
+            budget -= amount
+            liabilities += amount
+            if friend:
+                friends[friend] -= amount
+        elif code == 2:  # RECEIVABLE_CREATED
+            receivables += amount
+            if friend:
+                friends[friend] += amount
+        elif code == 3:  # PAYBACK_PAID
+            liabilities -= amount
+            if start <= day < end:
+                month_spend += amount
+            if friend:
+                friends[friend] += amount
+        elif code == 4:  # PAYBACK_RECEIVED
+            budget += amount
+            receivables -= amount
+            if friend:
+                friends[friend] -= amount
+        elif code == 5:  # BUDGET_ADJUSTMENT
+            budget += amount
+
+    if current is not None:
+        groups[current] = [budget, month_spend, liabilities, receivables, friends, categories]
+    return groups
+
+
+def _fold_dicts(events, month, year, factors=None) -> dict:
+    """
+    _fold for engine dicts, branching on the type string directly.
+
+    Converting each dict to a LedgerEvent first costs more than the
+    fold itself, so dict streams (inserts, the importer) never build
+    records. Unknown types fall through every branch and are ignored.
+    """
+    groups: dict[str, list] = {}
+    current = None
+    budget = month_spend = liabilities = receivables = 0
+    friends = categories = None
+    scale = None
+
+    in_month_filter = bool(month and year)
+    in_month = False
+    home = HOME_CURRENCY
+
+    # Groups are swapped when the raw currency field changes; the
+    # identity test keeps a run of dicts without one (None) cheap.
+    raw = ()
     for e in events:
+        currency = e.get("currency")
+        if currency is not raw and currency != raw:
+            raw = currency
+            currency = currency or home
+            if currency != current:
+                if current is not None:
+                    groups[current] = [budget, month_spend, liabilities, receivables, friends, categories]
+                budget, month_spend, liabilities, receivables, friends, categories = (
+                    groups.get(currency) or (0, 0, 0, 0, defaultdict(int), defaultdict(int)))
+                if factors is not None:
+                    scale = factors[currency]
+                current = currency
+
         etype = e["type"]
         amount = e["amount"]
+        if scale is not None:
+            amount *= scale[e["event_date"].toordinal()]
+        if in_month_filter:
+            d = e["event_date"]
+            in_month = d.month == month and d.year == year
 
         if etype == EXPENSE:
             budget -= amount
+            if in_month:
+                month_spend += amount
+            if in_month or not in_month_filter:
+                categories[e.get("category", "uncategorized")] += amount
 
         elif etype == LIABILITY_CREATED:
             budget -= amount
-        
+            liabilities += amount
+            friend = e.get("friend")
+            if friend:
+                friends[friend] -= amount
+
+        elif etype == RECEIVABLE_CREATED:
+            receivables += amount
+            friend = e.get("friend")
+            if friend:
+                friends[friend] += amount
+
+        elif etype == PAYBACK_PAID:
+            liabilities -= amount
+            if in_month:
+                month_spend += amount
+            friend = e.get("friend")
+            if friend:
+                friends[friend] += amount
+
         elif etype == PAYBACK_RECEIVED:
             budget += amount
+            receivables -= amount
+            friend = e.get("friend")
+            if friend:
+                friends[friend] -= amount
 
         elif etype == BUDGET_ADJUSTMENT:
             budget += amount
-        
-        # RECEIVABLE_CREATED -> no budget impact
-        # PAYBACK_PAID -> already accounted in LIABILITY_CREATED
-    
-    return budget
+
+    if current is not None:
+        groups[current] = [budget, month_spend, liabilities, receivables, friends, categories]
+    return groups
+
+
+def _fold_events(events, month, year, factors=None) -> dict:
+    """
+    Folds dicts with _fold_dicts and LedgerEvent records (or an
+    EventColumns batch, which yields them) with _fold.
+    """
+    it = iter(events)
+    first = next(it, None)
+    if first is None:
+        return {}
+
+    stream = chain((first,), it)
+    if isinstance(first, dict):
+        return _fold_dicts(stream, month, year, factors)
+    start, end, in_month_filter = _month_filter(month, year)
+    return _fold(stream, start, end, in_month_filter, factors)
+
+
+def _unscale(value: int, scale: int) -> int:
+    """
+    value / scale rounded half to even, in exact integer arithmetic.
+    """
+    q, r = divmod(value, scale)
+    if 2 * r > scale or (2 * r == scale and q & 1):
+        q += 1
+    return q
+
+
+def _to_summary(group: list | None, base_budget_minor: int, scale: int = 1) -> LedgerSummary:
+    if group is None:
+        return LedgerSummary(budget=base_budget_minor)
+
+    budget, month_spend, liabilities, receivables, friends, categories = group
+    if scale != 1:
+        return LedgerSummary(
+            budget=base_budget_minor + _unscale(budget, scale),
+            month_spend=_unscale(month_spend, scale),
+            liabilities=_unscale(liabilities, scale),
+            receivables=_unscale(receivables, scale),
+            friend_balances={k: _unscale(v, scale) for k, v in friends.items()},
+            category_spend={k: _unscale(v, scale) for k, v in categories.items()},
+        )
+
+    return LedgerSummary(
+        budget=base_budget_minor + budget,
+        month_spend=month_spend,
+        liabilities=liabilities,
+        receivables=receivables,
+        friend_balances=dict(friends),
+        category_spend=dict(categories),
+    )
+
+
+def _merge(groups) -> list:
+    budget = month_spend = liabilities = receivables = 0
+    friends: dict[str, int] = defaultdict(int)
+    categories: dict[str, int] = defaultdict(int)
+
+    for b, s, l, r, f, c in groups:
+        budget += b
+        month_spend += s
+        liabilities += l
+        receivables += r
+        for k, v in f.items():
+            friends[k] += v
+        for k, v in c.items():
+            categories[k] += v
+
+    return [budget, month_spend, liabilities, receivables, friends, categories]
+
+
+def _month_filter(month, year) -> tuple[int, int, bool]:
+    if month and year:
+        return *month_days(month, year), True
+    return 0, 0, False
+
+
+def compute_summary(
+        events: Iterable[dict | LedgerEvent],
+        base_budget_minor: int = 0,
+        month: int | None = None,
+        year: int | None = None,
+        currency: str | None = None,
+        fx=None,
+        validate: bool = False,
+) -> LedgerSummary:
+    """
+    Folds the events once and returns every summary metric.
+
+    Accepts engine dicts or LedgerEvent records.
+    Month spend is only counted when month and year are given.
+    Category spend is limited to that month when given, otherwise
+    it covers the whole ledger.
+
+    Totals are in `currency` (default HOME_CURRENCY). Without an FX
+    table only events already in that currency count; with one
+    (fx.FxTable) every event is converted at its date's rate.
+    Conversion is exact until each total is rounded once at the end,
+    so a ledger entirely in `currency` gives the same numbers either
+    way. The base budget is taken to be in `currency`.
+
+    validate=True checks every event during the same pass
+    (validation.checked_records) and raises ValidationError for the
+    bad rows once the fold has seen them all.
+    """
+    currency = currency or HOME_CURRENCY
+    if validate:
+        events = _validation().checked_records(events)
+    events = instrument.counted("engine.events", events)
+
+    with instrument.phase("engine.fold"):
+        groups = _fold_events(events, month, year,
+                              fx.factors(currency) if fx is not None else None)
+
+    if fx is None:
+        return _to_summary(groups.get(currency), base_budget_minor)
+    return _to_summary(_merge(groups.values()), base_budget_minor, fx.scale)
+
+
+def compute_summary_by_currency(
+        events: Iterable[dict | LedgerEvent],
+        base_budget_minor: int = 0,
+        month: int | None = None,
+        year: int | None = None,
+) -> dict[str, LedgerSummary]:
+    """
+    compute_summary for every currency in the ledger, in one pass.
+
+    The base budget goes to HOME_CURRENCY, which is always present.
+    """
+    events = instrument.counted("engine.events", events)
+
+    with instrument.phase("engine.fold"):
+        groups = _fold_events(events, month, year)
+
+    groups.setdefault(HOME_CURRENCY, None)
+    return {
+        code: _to_summary(group, base_budget_minor if code == HOME_CURRENCY else 0)
+        for code, group in groups.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Core Budget Computation
+# ---------------------------------------------------------------------------
+
+def compute_available_budget(
+        base_budget_minor: int,
+        events: Iterable[dict | LedgerEvent],
+        currency: str | None = None,
+        fx=None,
+) -> int:
+    """
+    Computes remaining available budget.
+
+    Formula : 
+        base_budget
+      + budget_adjustments
+      - expenses
+      - outstanding liabilities
+      + received settlements
+    """
+    return compute_summary(events, base_budget_minor, currency=currency, fx=fx).budget
 
 
 # ---------------------------------------------------------------------------
@@ -71,9 +490,11 @@ def compute_available_budget(
 # ---------------------------------------------------------------------------
 
 def compute_monthly_spend(
-        events: Iterable[dict],
+        events: Iterable[dict | LedgerEvent],
         month: int,
         year: int,
+        currency: str | None = None,
+        fx=None,
 ) -> int:
     """
     Cash that actually left your wallet in a month.
@@ -87,17 +508,7 @@ def compute_monthly_spend(
     - Receivables
     """
 
-    spend = 0
-
-    for e in events:
-        d: date = e["event_date"]
-        if d.month != month or d.year != year:
-            continue
-
-        if e["type"] in (EXPENSE, PAYBACK_PAID):
-            spend += e["amount"]
-
-    return spend
+    return compute_summary(events, month=month, year=year, currency=currency, fx=fx).month_spend
 
 
 # ---------------------------------------------------------------------------
@@ -106,21 +517,15 @@ def compute_monthly_spend(
 
 
 def compute_outstanding_liabilities(
-        events: Iterable[dict],
+        events: Iterable[dict | LedgerEvent],
+        currency: str | None = None,
+        fx=None,
 ) -> int:
     """
     Total amount you owe to others.
     """
 
-    total = 0
-
-    for e in events:
-        if e["type"] == LIABILITY_CREATED:
-            total += e["amount"]
-        elif e["type"] == PAYBACK_PAID:
-            total -= e["amount"]
-
-    return max(total, 0)
+    return compute_summary(events, currency=currency, fx=fx).outstanding_liabilities
 
 
 # ---------------------------------------------------------------------------
@@ -128,20 +533,16 @@ def compute_outstanding_liabilities(
 # ---------------------------------------------------------------------------
 
 
-def compute_outstanding_receivables(events: Iterable[dict]) -> int:
+def compute_outstanding_receivables(
+        events: Iterable[dict | LedgerEvent],
+        currency: str | None = None,
+        fx=None,
+) -> int:
     """
     Total amount others owe you.
     """
 
-    total = 0
-
-    for e in events:
-        if e["type"] == RECEIVABLE_CREATED:
-            total += e["amount"]
-        elif e["type"] == PAYBACK_RECEIVED:
-            total -= e["amount"]
-
-    return max(total, 0)
+    return compute_summary(events, currency=currency, fx=fx).outstanding_receivables
 
 
 
@@ -149,7 +550,11 @@ def compute_outstanding_receivables(events: Iterable[dict]) -> int:
 # Per-Friend Balances
 # ---------------------------------------------------------------------------
 
-def compute_friend_balances(events: Iterable[dict]) -> dict[str, int]:
+def compute_friend_balances(
+        events: Iterable[dict | LedgerEvent],
+        currency: str | None = None,
+        fx=None,
+) -> dict[str, int]:
     """
     Net balance per friend.
 
@@ -157,29 +562,7 @@ def compute_friend_balances(events: Iterable[dict]) -> dict[str, int]:
     Negative  -> you owe friend
     """
 
-    balances: dict[str, int] = defaultdict(int)
-
-    for e in events:
-        friend = e.get("friend")
-        if not friend:
-            continue
-
-        amt = e["amount"]
-        etype = e["type"]
-
-        if etype == RECEIVABLE_CREATED:
-            balances[friend] += amt
-
-        elif etype == LIABILITY_CREATED:
-            balances[friend] -= amt
-
-        elif etype == PAYBACK_RECEIVED:
-            balances[friend] -= amt
-
-        elif etype == PAYBACK_PAID:
-            balances[friend] += amt
-
-    return dict(balances)
+    return compute_summary(events, currency=currency, fx=fx).friend_balances
 
 
 
@@ -188,9 +571,11 @@ def compute_friend_balances(events: Iterable[dict]) -> dict[str, int]:
 # ---------------------------------------------------------------------------
 
 def compute_category_spend(
-    events: Iterable[dict],
+    events: Iterable[dict | LedgerEvent],
     month: int | None = None,
     year: int | None = None,
+    currency: str | None = None,
+    fx=None,
 ) -> dict[str, int]:
     """
     Category-wise cash spend.
@@ -198,43 +583,28 @@ def compute_category_spend(
     Only EXPENSE events count.
     """
 
-    totals: dict[str, int] = defaultdict(int)
-
-    for e in events:
-        if e["type"] != EXPENSE:
-            continue
-
-        d: date = e["event_date"]
-        if month and year:
-            if d.month != month or d.year != year:
-                continue
-
-        category = e.get("category", "uncategorized")
-        totals[category] += e["amount"]
-
-    return dict(totals)
+    return compute_summary(events, month=month, year=year, currency=currency, fx=fx).category_spend
 
 
 # ---------------------------------------------------------------------------
-# Invariant Checks (Debug / Tests)
+# Invariant Checks
 # ---------------------------------------------------------------------------
 
+def _validation():
+    # Imported on first use (validation imports this module).
+    try:
+        from . import validation
+    except ImportError:
+        import validation
+    return validation
+
+
 def validate_invariants(events: Iterable[dict]) -> None:
     """
-    Raises AssertionError if ledger invariants are violated.
+    Raises validation.ValidationError (an AssertionError) listing
+    every event that violates a ledger invariant.
     """
-
-    for e in events:
-        assert e["amount"] >= 0, "Amount must be positive minor units"
-        assert isinstance(e["amount"], int), "Amount must be int"
-        assert e["type"] in {
-            EXPENSE,
-            LIABILITY_CREATED,
-            RECEIVABLE_CREATED,
-            PAYBACK_PAID,
-            PAYBACK_RECEIVED,
-            BUDGET_ADJUSTMENT,
-        }, f"Unknown event type: {e['type']}"
+    _validation().validate_events(events)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -242,7 +612,7 @@ def validate_invariants(events: Iterable[dict]) -> None:
 def events_for_budget_month(events, month, year):
     """
     Include:
-    - all liabilities / receivables (carry forward)
+    - liabilities / receivables up to the end of the month (carry forward)
     - only expenses & settlements from the given month
     """
     filtered = []
@@ -252,9 +622,183 @@ def events_for_budget_month(events, month, year):
         d = e["event_date"]
 
         if etype in ("liability_created", "receivable_created"):
-            filtered.append(e)
+            if (d.year, d.month) <= (year, month):
+                filtered.append(e)
         else:
             if d.month == month and d.year == year:
                 filtered.append(e)
 
     return filtered
+
+
+# ---------------------------------------------------------------------------
+# Month Snapshots (Carry Forward)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MonthSnapshot:
+    """
+    Carried-forward state at the end of a month.
+
+    All totals are cumulative from the start of the ledger.
+    *_created are gross amounts (what budget-month carry forward
+    uses); liabilities / receivables are net of paybacks.
+    """
+    liabilities_created: int = 0
+    receivables_created: int = 0
+    liabilities: int = 0
+    receivables: int = 0
+    friend_balances: dict[str, int] = field(default_factory=dict)
+
+
+def roll_forward(
+        snapshot: MonthSnapshot | None,
+        events: Iterable[dict | LedgerEvent],
+        currency: str = HOME_CURRENCY,
+) -> MonthSnapshot:
+    """
+    Folds one month's events onto the previous month's snapshot.
+
+    Snapshots are per currency; events in other currencies are skipped.
+    """
+    prev = snapshot or MonthSnapshot()
+
+    liabilities_created = prev.liabilities_created
+    receivables_created = prev.receivables_created
+    liabilities = prev.liabilities
+    receivables = prev.receivables
+    friends = defaultdict(int, prev.friend_balances)
+
+    for code, amount, day, category, friend, cur in as_records(events):
+        if cur != currency:
+            continue
+        if code == EventCode.LIABILITY_CREATED:
+            liabilities_created += amount
+        elif code == EventCode.RECEIVABLE_CREATED:
+            receivables_created += amount
+
+        liabilities += LIABILITY_SIGN[code] * amount
+        receivables += RECEIVABLE_SIGN[code] * amount
+
+        if friend:
+            sign = FRIEND_SIGN[code]
+            if sign:
+                friends[friend] += sign * amount
+
+    return MonthSnapshot(
+        liabilities_created=liabilities_created,
+        receivables_created=receivables_created,
+        liabilities=liabilities,
+        receivables=receivables,
+        friend_balances=dict(friends),
+    )
+
+
+def compute_budget_for_month(
+        base_budget_minor: int,
+        previous: MonthSnapshot | None,
+        month_events: Iterable[dict | LedgerEvent],
+) -> int:
+    """
+    Budget for one month from the previous month's snapshot and
+    only that month's events.
+
+    Same result as compute_available_budget over
+    events_for_budget_month(...).
+    """
+    carried = previous.liabilities_created if previous else 0
+    return compute_available_budget(base_budget_minor - carried, month_events)
+
+
+# ---------------------------------------------------------------------------
+# Group Splits
+# ---------------------------------------------------------------------------
+
+def split_amount(total: int, weights: list[int]) -> list[int]:
+    """
+    Splits total minor units in proportion to integer weights.
+
+    Shares always sum to total. Leftover units go to the largest
+    fractional remainders, ties to the earliest position (largest
+    remainder method).
+    """
+    if total < 0:
+        raise ValueError("Split total must be non-negative")
+    if not weights or any(w < 0 for w in weights) or not sum(weights):
+        raise ValueError("Split weights must be non-negative with a positive sum")
+
+    whole = sum(weights)
+    shares = [total * w // whole for w in weights]
+    leftover = total - sum(shares)
+
+    order = sorted(range(len(weights)), key=lambda i: (-(total * weights[i] % whole), i))
+    for i in order[:leftover]:
+        shares[i] += 1
+    return shares
+
+
+def plan_split(
+        total: int,
+        friends: list[str],
+        payer: str | None = None,
+        weights: list[int] | None = None,
+        exact: list[int] | None = None,
+        include_self: bool = True,
+        category: str | None = None,
+        description: str | None = None,
+        event_date: date | None = None,
+) -> list[dict]:
+    """
+    Events for one group bill.
+
+    Participants are you (first, when include_self) then `friends`;
+    weights or exact amounts follow that order (default: equal).
+    Leftover units follow split_amount: the largest fractional
+    remainders get them, ties the earliest participant. With equal
+    weights every remainder ties, so you come first, which keeps the
+    accounting conservative: smaller receivables, larger liabilities.
+    Uneven weights can give the extra unit to a friend.
+
+    payer None  -> you paid: an expense for the total plus a
+                   receivable per friend share
+    payer name  -> that friend paid: a liability for your share
+    """
+    people = ([None] if include_self else []) + list(friends)
+    if not people:
+        raise ValueError("A split needs at least one participant")
+    if len(set(friends)) != len(friends) or any(not f for f in friends):
+        raise ValueError("Split friends must be distinct names")
+
+    if exact is not None:
+        if weights is not None:
+            raise ValueError("Give weights or exact shares, not both")
+        if len(exact) != len(people) or any(s < 0 for s in exact) or sum(exact) != total:
+            raise ValueError(f"Exact shares must be {len(people)} non-negative amounts summing to {total}")
+        shares = list(exact)
+    else:
+        if weights is not None and len(weights) != len(people):
+            raise ValueError(f"Expected {len(people)} weights, got {len(weights)}")
+        shares = split_amount(total, weights or [1] * len(people))
+
+    event_date = event_date or date.today()
+
+    def event(etype, amount, friend):
+        return {
+            "type": etype,
+            "amount": amount,
+            "category": category,
+            "friend": friend,
+            "description": description,
+            "event_date": event_date,
+        }
+
+    if payer is None:
+        return [event(EXPENSE, total, None)] + [
+            event(RECEIVABLE_CREATED, share, friend)
+            for friend, share in zip(people, shares)
+            if friend is not None and share
+        ]
+
+    if not include_self:
+        raise ValueError("A split paid by a friend must include you")
+    return [event(LIABILITY_CREATED, shares[0], payer)] if shares[0] else []
@@ -0,0 +1,292 @@
+# event_log.py
+"""
+Reading the event log, partitions included.
+
+db.iter_events streams one file's events table; PartitionRouter and
+iter_ledger extend that over the yearly partitions split out by
+partitions.py (archived ones are decompressed on first use, to a
+cached copy next to the archive).
+
+ledger_version is the main file's change counter: every write to the
+events or to the aggregates derived from them calls bump_version, so
+caches on any connection can tell when to drop what they hold.
+
+This module sits below db, balances, snapshots and open_items, which
+all read the log through it; it imports nothing from them.
+"""
+
+import heapq
+import sqlite3
+from itertools import chain
+from pathlib import Path
+
+import instrument
+from engine import EVENT_CODES, HOME_CURRENCY, LedgerEvent
+
+# Rows pulled per fetchmany() when streaming events.
+EVENT_BATCH_SIZE = 5_000
+
+# event_date as a date.toordinal() day number, computed in SQLite.
+_DAY_SQL = "CAST(julianday(event_date) - 1721424.5 AS INTEGER)"
+
+# Archived partitions resolved in this process: archive path -> unpacked file.
+_unpacked: dict[str, Path] = {}
+
+
+def _year_bounds(year: int) -> tuple[str, str]:
+    return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+
+
+def _main_file(conn) -> Path:
+    for _, name, file in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            if not file:
+                raise ValueError("Partitions need a file-backed ledger")
+            return Path(file)
+    raise ValueError("No main database attached")
+
+
+def _has_catalog(conn) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'partitions'"
+    ).fetchone() is not None
+
+
+def _open_readonly(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(path.resolve().as_uri() + "?mode=ro", uri=True)
+
+
+# ---------------------------------------------------------------------------
+# Single File
+# ---------------------------------------------------------------------------
+
+def iter_events(
+        conn,
+        batch_size: int = EVENT_BATCH_SIZE,
+        ordered: bool = False,
+        start: str | None = None,
+        end: str | None = None,
+):
+    """
+    Streams events as compact engine.LedgerEvent records in
+    fetchmany() batches.
+
+    Peak memory is one batch, not the whole ledger. The day number is
+    computed by SQLite, so no per-row date parsing happens in Python.
+    With ordered=True events come back by event_date; start / end
+    (ISO dates, half-open) restrict to a date range. Both are served
+    by idx_events_date_type.
+    """
+    where, params = [], []
+    if start:
+        where.append("event_date >= ?")
+        params.append(start)
+    if end:
+        where.append("event_date < ?")
+        params.append(end)
+
+    cur = conn.cursor()
+    with instrument.phase("db.query"):
+        cur.execute(f"""
+        SELECT type, amount, {_DAY_SQL}, category, friend, currency FROM events
+        {"WHERE " + " AND ".join(where) if where else ""}
+        {"ORDER BY event_date" if ordered else ""}
+        """, params)
+
+    codes = EVENT_CODES
+    while True:
+        with instrument.phase("db.fetch"):
+            rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        instrument.count("db.rows", len(rows))
+
+        for etype, amount, day, category, friend, currency in rows:
+            code = codes.get(etype)
+            if code is not None:
+                yield LedgerEvent(code, amount, day, category, friend, currency)
+
+
+def stored_record(e: dict) -> LedgerEvent | None:
+    """
+    An engine dict as iter_events reads it back once db.append_event
+    has stored it: a missing category stays NULL (None) rather than
+    engine.to_record's "uncategorized". None for unknown types.
+    """
+    code = EVENT_CODES.get(e["type"])
+    if code is None:
+        return None
+    return LedgerEvent(
+        code,
+        e["amount"],
+        e["event_date"].toordinal(),
+        e.get("category"),
+        e.get("friend"),
+        e.get("currency") or HOME_CURRENCY,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+class PartitionRouter:
+    """
+    Sends date-bounded reads to the partitions that can hold them.
+
+    Opened partition connections stay open until close(); use it as a
+    context manager.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._catalog = (
+            {y: (f, bool(a)) for y, f, a in conn.execute(
+                "SELECT year, file, archived FROM partitions ORDER BY year")}
+            if _has_catalog(conn) else {}
+        )
+        self._open: dict[int, sqlite3.Connection] = {}
+
+    def years(self) -> list[int]:
+        return list(self._catalog)
+
+    def _partition(self, year: int) -> sqlite3.Connection:
+        conn = self._open.get(year)
+        if conn is None:
+            file, archived = self._catalog[year]
+            path = _main_file(self.conn).with_name(file)
+            if archived:
+                path = _unpack(path)
+            conn = self._open[year] = _open_readonly(path)
+            legacy_view(conn)
+        return conn
+
+    def sources(self, start: str | None = None, end: str | None = None) -> list:
+        """
+        Connections whose data may overlap [start, end), oldest first;
+        the main file is always last.
+        """
+        out = []
+        for year in self._catalog:
+            lo, hi = _year_bounds(year)
+            if (end is None or lo < end) and (start is None or hi > start):
+                out.append(self._partition(year))
+        out.append(self.conn)
+        return out
+
+    def iter_events(self, batch_size=EVENT_BATCH_SIZE, ordered=False, start=None, end=None):
+        streams = [
+            iter_events(c, batch_size, ordered, start, end)
+            for c in self.sources(start, end)
+        ]
+        if ordered and len(streams) > 1:
+            return heapq.merge(*streams, key=lambda e: e.day)
+        return chain.from_iterable(streams)
+
+    def first_event_date(self) -> str | None:
+        dates = [
+            c.execute("SELECT MIN(event_date) FROM events").fetchone()[0]
+            for c in self.sources()
+        ]
+        dates = [d for d in dates if d]
+        return min(dates) if dates else None
+
+    def close(self) -> None:
+        for c in self._open.values():
+            c.close()
+        self._open.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def legacy_view(conn) -> None:
+    """
+    Lets a read-only connection to an older file be read like a
+    current one. Partitions are immutable, so files split before
+    events.settles or events.currency existed keep their old schema.
+    A temp view (temp names shadow main ones) adds the missing
+    columns with the values those events had; rowid is passed
+    through for open_items' replay order.
+    """
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(events)")}
+    missing = {"settles": "NULL", "currency": f"'{HOME_CURRENCY}'"}
+    extra = [f"{value} AS {name}" for name, value in missing.items() if name not in cols]
+    if extra:
+        conn.execute(
+            f"CREATE TEMP VIEW events AS SELECT rowid AS rowid, *, {', '.join(extra)} FROM main.events")
+
+
+def _unpack(archive: Path) -> Path:
+    """
+    The decompressed copy of an archived partition.
+
+    Kept next to the archive (moneytrace.2024.db.xz ->
+    moneytrace.2024.db.unpacked) and reused by later processes while
+    it is newer than the archive. If that directory is read-only the
+    copy goes to a temp file removed at exit.
+    """
+    import atexit
+    import lzma
+    import os
+    import shutil
+    import tempfile
+
+    key = str(archive.resolve())
+    path = _unpacked.get(key)
+    if path is not None:
+        return path
+
+    path = archive.with_suffix(".unpacked")
+    try:
+        fresh = path.stat().st_mtime >= archive.stat().st_mtime
+    except FileNotFoundError:
+        fresh = False
+
+    if not fresh:
+        try:
+            fd, tmp = tempfile.mkstemp(dir=archive.parent, prefix=path.name + ".")
+        except OSError:
+            fd, tmp = tempfile.mkstemp(suffix=".db", prefix=archive.stem + ".")
+            path = Path(tmp)
+            atexit.register(path.unlink, missing_ok=True)
+        try:
+            with lzma.open(archive, "rb") as src, open(fd, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            if tmp != str(path):
+                os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    _unpacked[key] = path
+    return path
+
+
+def iter_ledger(conn, batch_size=EVENT_BATCH_SIZE, ordered=False, start=None, end=None):
+    """
+    db.iter_events over the whole ledger, partitions included. The
+    partition connections close when the stream ends.
+    """
+    with PartitionRouter(conn) as router:
+        yield from router.iter_events(batch_size, ordered, start, end)
+
+
+# ---------------------------------------------------------------------------
+# Change Counter
+# ---------------------------------------------------------------------------
+
+def ledger_version(conn) -> int:
+    return conn.execute("SELECT version FROM ledger_version").fetchone()[0]
+
+
+def bump_version(cur) -> int:
+    """
+    Marks the ledger changed, in the caller's transaction, and
+    returns the new version.
+    """
+    return cur.execute(
+        "UPDATE ledger_version SET version = version + 1 RETURNING version").fetchone()[0]
@@ -0,0 +1,116 @@
+# friend_registry.py
+"""
+Friend resolution with an in-process cache.
+
+Lookups are keyed by (name, phone) and kept in a bounded LRU, so
+repeated references to the same friend never touch the database.
+resolve_friends() resolves a whole batch of names with one IN (...)
+query and one executemany() insert for the missing ones.
+
+Nothing here commits: callers decide the transaction boundary.
+"""
+
+from collections import OrderedDict
+from typing import Iterable
+from uuid import uuid4
+
+FRIEND_CACHE_SIZE = 4096
+
+# Bound parameters per IN (...) query; below SQLite's variable limit.
+_IN_CHUNK = 500
+
+
+class FriendRegistry:
+    def __init__(self, conn, maxsize: int = FRIEND_CACHE_SIZE):
+        self.conn = conn
+        self.maxsize = maxsize
+        self._cache: OrderedDict[tuple[str, str | None], str] = OrderedDict()
+
+    # -- cache ---------------------------------------------------------------
+
+    def _get(self, key):
+        friend_id = self._cache.get(key)
+        if friend_id is not None:
+            self._cache.move_to_end(key)
+        return friend_id
+
+    def _put(self, key, friend_id: str) -> None:
+        self._cache[key] = friend_id
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drops cached ids, e.g. after a rollback discarded new friends.
+        """
+        self._cache.clear()
+
+    # -- lookups -------------------------------------------------------------
+
+    def get_or_create(self, name: str, phone: str | None = None) -> str:
+        """
+        Same matching rule as before: a friend with this name and
+        either the same phone or no phone at all.
+        """
+        key = (name, phone)
+        friend_id = self._get(key)
+        if friend_id is not None:
+            return friend_id
+
+        row = self.conn.execute(
+            "SELECT id FROM friends WHERE name = ? AND (phone = ? OR phone IS NULL)",
+            (name, phone),
+        ).fetchone()
+
+        if row:
+            friend_id = row[0]
+        else:
+            friend_id = str(uuid4())
+            self.conn.execute("""
+            INSERT INTO friends (id, name, phone, is_contact)
+            VALUES (?, ?, ?, ?)
+            """, (friend_id, name, phone, int(bool(phone))))
+
+        self._put(key, friend_id)
+        return friend_id
+
+    def resolve_friends(self, names: Iterable[str | None]) -> dict[str, str]:
+        """
+        Maps every (phone-less) friend name to its id, creating the
+        missing ones. Empty names are skipped.
+        """
+        resolved: dict[str, str] = {}
+        missing: list[str] = []
+
+        for name in dict.fromkeys(n for n in names if n):
+            friend_id = self._get((name, None))
+            if friend_id is None:
+                missing.append(name)
+            else:
+                resolved[name] = friend_id
+
+        if not missing:
+            return resolved
+
+        found: dict[str, str] = {}
+        for i in range(0, len(missing), _IN_CHUNK):
+            chunk = missing[i:i + _IN_CHUNK]
+            found.update(self.conn.execute(f"""
+            SELECT name, id FROM friends
+            WHERE phone IS NULL AND name IN ({", ".join("?" * len(chunk))})
+            """, chunk).fetchall())
+
+        new = [(str(uuid4()), name) for name in missing if name not in found]
+        if new:
+            self.conn.executemany(
+                "INSERT INTO friends (id, name, phone, is_contact) VALUES (?, ?, NULL, 0)",
+                new,
+            )
+            found.update((name, fid) for fid, name in new)
+
+        for name in missing:
+            self._put((name, None), found[name])
+            resolved[name] = found[name]
+
+        return resolved
@@ -0,0 +1,297 @@
+# fx.py
+"""
+Exchange rates and currency conversion.
+
+Rates live in the fx_rates table, one row per currency and effective
+date, quoted as home-currency units per unit of that currency
+(USD 83.25 on 2025-01-01 -> 1 USD = ₹83.25 from that day until the
+next USD rate). A date before a currency's first rate has no rate.
+
+FxTable turns rates into fixed-point conversion factors between minor
+units. Factors are cached per (from, to, day), so a fold looks each
+one up in a dict instead of re-deriving it per event, and amounts
+stay exact integers until the final totals are rounded.
+
+The materialized balances, snapshots and open items are kept in the
+home currency only; summarize() and month_budget() rescan the log
+with conversion when a ledger holds other currencies. Callers that
+did not ask for a currency fall back to those home-only totals when
+a rate is missing (MissingRate).
+"""
+
+from bisect import bisect_right
+from datetime import date
+from fractions import Fraction
+
+from currency import CURRENCIES
+from engine import (
+    HOME_CURRENCY,
+    LIABILITY_CREATED,
+    RECEIVABLE_CREATED,
+    EVENT_CODES,
+    LedgerSummary,
+    compute_available_budget,
+    compute_summary,
+    month_days,
+)
+from event_log import iter_ledger
+
+# Factors carry 12 decimal places.
+FX_SCALE = 10 ** 12
+
+
+def _minor_unit(code: str) -> int:
+    c = CURRENCIES.get(code)
+    if c is None:
+        raise ValueError(f"Unknown currency: {code}")
+    return c.minor_unit
+
+
+class MissingRate(ValueError):
+    """
+    A conversion needs a rate for a date before the currency's first.
+    """
+
+
+def parse_rate(rate) -> Fraction:
+    """
+    An exact positive rate from a decimal or "n/d" string, Decimal,
+    int or Fraction.
+    """
+    try:
+        value = Fraction(rate)
+    except (ValueError, TypeError, ZeroDivisionError):
+        raise ValueError(f"Invalid rate: {rate!r}") from None
+    if value <= 0:
+        raise ValueError(f"Rate must be positive: {rate!r}")
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Rate Table
+# ---------------------------------------------------------------------------
+
+class _DayFactors(dict):
+    """
+    day -> factor for one currency pair, filled on first lookup.
+    """
+    __slots__ = ("table", "source", "target")
+
+    def __init__(self, table: "FxTable", source: str, target: str):
+        super().__init__()
+        self.table = table
+        self.source = source
+        self.target = target
+
+    def __missing__(self, day: int) -> int:
+        factor = self[day] = self.table.factor(self.source, self.target, day)
+        return factor
+
+
+class _Factors(dict):
+    """
+    currency -> _DayFactors into one target currency.
+    """
+    __slots__ = ("table", "target")
+
+    def __init__(self, table: "FxTable", target: str):
+        super().__init__()
+        self.table = table
+        self.target = target
+
+    def __missing__(self, source: str) -> _DayFactors:
+        factors = self[source] = _DayFactors(self.table, source, self.target)
+        return factors
+
+
+class FxTable:
+    """
+    Date-indexed rates into one base currency.
+
+    Days are date.toordinal() numbers, like LedgerEvent.day.
+    """
+
+    scale = FX_SCALE
+
+    def __init__(self, base: str = HOME_CURRENCY):
+        _minor_unit(base)
+        self.base = base
+        self._days: dict[str, list[int]] = {}
+        self._rates: dict[str, list[Fraction]] = {}
+        self._factors: dict[str, _Factors] = {}
+
+    def set_rate(self, code: str, day: date | int, rate) -> None:
+        """
+        Rate in effect from `day` until the currency's next rate.
+        """
+        _minor_unit(code)
+        if code == self.base:
+            raise ValueError(f"{code} is the base currency")
+        if isinstance(day, date):
+            day = day.toordinal()
+        rate = parse_rate(rate)
+
+        days = self._days.setdefault(code, [])
+        rates = self._rates.setdefault(code, [])
+        i = bisect_right(days, day)
+        if i and days[i - 1] == day:
+            rates[i - 1] = rate
+        else:
+            days.insert(i, day)
+            rates.insert(i, rate)
+        self._factors.clear()
+
+    def currencies(self) -> list[str]:
+        return sorted(self._days)
+
+    def rate(self, code: str, day: int) -> Fraction:
+        """
+        Base units per unit of `code` on `day`.
+        """
+        if code == self.base:
+            return Fraction(1)
+
+        days = self._days.get(code)
+        i = bisect_right(days, day) - 1 if days else -1
+        if i < 0:
+            if code not in CURRENCIES:
+                raise ValueError(f"Unknown currency: {code}")
+            raise MissingRate(f"No {code} rate on or before {date.fromordinal(day)}")
+        return self._rates[code][i]
+
+    def factor(self, source: str, target: str, day: int) -> int:
+        """
+        Minor units of `target` per minor unit of `source` on `day`,
+        times scale.
+        """
+        if source == target:
+            return self.scale
+
+        exact = (
+            self.rate(source, day) / self.rate(target, day)
+            * _minor_unit(target) / _minor_unit(source)
+        )
+        return round(exact * self.scale)
+
+    def factors(self, target: str) -> _Factors:
+        """
+        Cached source -> {day: factor} lookups into `target`, the form
+        engine.compute_summary folds with.
+        """
+        factors = self._factors.get(target)
+        if factors is None:
+            _minor_unit(target)
+            factors = self._factors[target] = _Factors(self, target)
+        return factors
+
+    def periods(self, source: str, target: str) -> list[int]:
+        """
+        Sorted days on which the source -> target factor can change;
+        it is constant from each one to the next.
+        """
+        if source == target:
+            return []
+        return sorted(set(self._days.get(source, ())) | set(self._days.get(target, ())))
+
+    def convert(self, amount: int, source: str, target: str, day: int) -> int:
+        """
+        One amount in minor units, rounded half to even.
+        """
+        q, r = divmod(amount * self.factor(source, target, day), self.scale)
+        if 2 * r > self.scale or (2 * r == self.scale and q & 1):
+            q += 1
+        return q
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+def load_rates(conn) -> FxTable:
+    table = FxTable()
+    for code, day, rate in conn.execute("SELECT currency, day, rate FROM fx_rates"):
+        table.set_rate(code, date.fromisoformat(day), rate)
+    return table
+
+
+def set_rate(conn, code: str, day: date, rate) -> None:
+    """
+    Records (or replaces) a rate. Does not commit.
+    """
+    # Validates the code and rate before anything is written.
+    FxTable().set_rate(code, day, rate)
+    conn.execute(
+        "INSERT OR REPLACE INTO fx_rates (currency, day, rate) VALUES (?, ?, ?)",
+        (code, day.isoformat(), str(rate).strip()),
+    )
+
+
+def list_rates(conn, code: str | None = None) -> list[tuple[str, str, str]]:
+    if code:
+        return conn.execute(
+            "SELECT currency, day, rate FROM fx_rates WHERE currency = ? ORDER BY day",
+            (code,)).fetchall()
+    return conn.execute("SELECT currency, day, rate FROM fx_rates ORDER BY currency, day").fetchall()
+
+
+def has_foreign(conn) -> bool:
+    """
+    True if any event, partitions included, is not in the home
+    currency. Served by idx_events_foreign and the catalog.
+    """
+    return conn.execute(f"""
+    SELECT EXISTS (SELECT 1 FROM events WHERE currency != '{HOME_CURRENCY}')
+        OR EXISTS (SELECT 1 FROM partitions WHERE foreign_events > 0)
+    """).fetchone()[0] == 1
+
+
+# ---------------------------------------------------------------------------
+# Converted Summaries
+# ---------------------------------------------------------------------------
+
+def _base(table: FxTable, base_budget_minor: int, month, year, currency) -> int:
+    # Converted at the month's first day, or today without a month.
+    day = month_days(month, year)[0] if month and year else date.today().toordinal()
+    return table.convert(base_budget_minor, HOME_CURRENCY, currency or HOME_CURRENCY, day)
+
+
+def summarize(
+        conn,
+        base_budget_minor: int = 0,
+        month: int | None = None,
+        year: int | None = None,
+        currency: str | None = None,
+) -> LedgerSummary:
+    """
+    engine.compute_summary over the whole ledger, every event
+    converted into `currency` (default: home) at its date's rate.
+    The base budget is in the home currency.
+    """
+    table = load_rates(conn)
+    return compute_summary(
+        iter_ledger(conn), _base(table, base_budget_minor, month, year, currency), month, year,
+        currency=currency, fx=table)
+
+
+def month_budget(
+        conn,
+        base_budget_minor: int,
+        month: int,
+        year: int,
+        currency: str | None = None,
+) -> int:
+    """
+    snapshots.budget_for_month with conversion: liabilities and
+    receivables up to the month's end plus the month's other events.
+    The base budget is in the home currency.
+    """
+    table = load_rates(conn)
+    start, end = month_days(month, year)
+    carried = (EVENT_CODES[LIABILITY_CREATED], EVENT_CODES[RECEIVABLE_CREATED])
+    records = (
+        r for r in iter_ledger(conn, end=date.fromordinal(end).isoformat())
+        if r.day >= start or r.code in carried
+    )
+    return compute_available_budget(
+        _base(table, base_budget_minor, month, year, currency), records,
+        currency=currency, fx=table)
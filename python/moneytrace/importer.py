@@ -0,0 +1,175 @@
+# importer.py
+"""
+Bulk event import from CSV or JSONL.
+
+Rows are streamed from the file, parsed and validated a batch at a
+time (one validation.ValidationError per batch, with 0-based row
+numbers in the file), and written with db.append_events (one
+executemany() per batch) inside a single transaction, together with
+the materialized balance deltas. Friends are resolved per batch
+through the connection's FriendRegistry.
+
+Expected fields: type, amount, category, friend, description,
+date (or event_date, ISO-8601), currency. Missing date means today;
+missing currency means the home currency.
+"""
+
+import csv
+import json
+import re
+import sys
+import time
+from datetime import date
+from itertools import islice
+
+from db import append_events, friend_registry
+from validation import ValidationError, validate_events
+
+IMPORT_BATCH_SIZE = 50_000
+
+
+def tune_for_bulk(conn) -> None:
+    """
+    WAL lets readers continue during the import; synchronous=NORMAL
+    only fsyncs at checkpoints, and a 64 MiB page cache keeps the
+    index B-trees in memory.
+    """
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -65536")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+# ---------------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------------
+
+def _read_rows(path: str, fmt: str | None):
+    """
+    Rows from a file, or from stdin when path is "-" (JSONL unless
+    fmt says otherwise): dicts for CSV, undecoded lines for JSONL, so
+    that decode errors are reported against their row (_parse_batch).
+    """
+    if path == "-":
+        fmt = fmt or "jsonl"
+    else:
+        fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    with (open(sys.stdin.fileno(), newline="", encoding="utf-8", closefd=False)
+          if path == "-" else open(path, newline="", encoding="utf-8")) as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield line
+        else:
+            raise ValueError(f"Unknown import format: {fmt}")
+
+
+_INTEGER = re.compile(r"[+-]?[0-9]+")
+
+
+def _amount(value) -> int:
+    """
+    Minor units, never rounded: JSON integers pass through, strings
+    (CSV) must be plain digits. Floats, bools and "12.5" are rejected.
+    """
+    if value.__class__ is int:
+        return value
+    if isinstance(value, str) and _INTEGER.fullmatch(value.strip()):
+        return int(value)
+    raise ValueError(f"Amount must be an integer in minor units: {value!r}")
+
+
+def _to_event(row: dict) -> dict:
+    raw_date = row.get("event_date") or row.get("date")
+    return {
+        "type": row["type"],
+        "amount": _amount(row["amount"]),
+        "category": row.get("category") or None,
+        "friend": row.get("friend") or None,
+        "description": row.get("description") or None,
+        "settles": row.get("settles") or None,
+        "currency": row.get("currency") or None,
+        "event_date": date.fromisoformat(raw_date) if raw_date else date.today(),
+    }
+
+
+def _parse_batch(rows: list, offset: int) -> list[dict]:
+    """
+    Converts and validates one batch. Parse failures and rule
+    violations are raised together as one ValidationError, numbered
+    by data row in the file (from 0, blank lines skipped).
+    """
+    events, where, errors = [], [], []
+    for i, row in enumerate(rows, offset):
+        try:
+            if isinstance(row, str):
+                row = json.loads(row)
+                if not isinstance(row, dict):
+                    raise ValueError("Row is not a JSON object")
+            events.append(_to_event(row))
+            where.append(i)
+        except KeyError as e:
+            errors.append((i, f"Missing field: {e.args[0]}"))
+        except (ValueError, TypeError) as e:
+            errors.append((i, str(e)))
+
+    try:
+        validate_events(events)
+    except ValidationError as e:
+        errors += [(where[i], message) for i, message in e.errors]
+        errors.sort()
+
+    if errors:
+        raise ValidationError(errors)
+    return events
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def import_events(
+        conn,
+        path: str,
+        fmt: str | None = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        progress=None,
+) -> tuple[int, float]:
+    """
+    Imports every event in the file.
+
+    Each batch is validated and committed as one transaction, so a
+    bad row rejects its batch and leaves earlier batches in place.
+    Returns (rows imported, elapsed seconds).
+    """
+    tune_for_bulk(conn)
+    registry = friend_registry(conn)
+
+    rows = _read_rows(path, fmt)
+    total = 0
+    started = time.perf_counter()
+
+    while True:
+        raw = list(islice(rows, batch_size))
+        if not raw:
+            break
+
+        batch = _parse_batch(raw, total)
+
+        try:
+            append_events(conn, batch)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # Drop ids cached for friends that were rolled back.
+            registry.clear()
+            raise
+
+        total += len(batch)
+        if progress:
+            progress(total, time.perf_counter() - started)
+
+    return total, time.perf_counter() - started
@@ -0,0 +1,164 @@
+# instrument.py
+"""
+Phase timers and counters for the hot paths.
+
+The engine and db layers report into this module; nothing listens
+by default. A hook is any object with:
+
+    enter(name)            a phase starts
+    exit(name, seconds)    it ends (wall time, inclusive)
+    count(name, n)         a counter moves by n
+
+While no hook is installed, phase() hands back a shared no-op
+context and count() returns at once; call sites report per batch or
+per call, never per event, so the disabled cost is negligible.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# True while at least one hook is installed. Read it as
+# instrument.enabled (not a from-import) to see changes.
+enabled = False
+
+_hooks: list = []
+_NOOP = nullcontext()
+
+
+def add_hook(hook) -> None:
+    global enabled
+    _hooks.append(hook)
+    enabled = True
+
+
+def remove_hook(hook) -> None:
+    global enabled
+    _hooks.remove(hook)
+    enabled = bool(_hooks)
+
+
+class _Phase:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        for hook in _hooks:
+            hook.enter(self.name)
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        for hook in _hooks:
+            hook.exit(self.name, elapsed)
+
+
+def phase(name: str):
+    """
+    Times the enclosed block as `name`.
+    """
+    return _Phase(name) if enabled else _NOOP
+
+
+def count(name: str, n: int = 1) -> None:
+    if enabled:
+        for hook in _hooks:
+            hook.count(name, n)
+
+
+def counted(name: str, iterable):
+    """
+    Passes `iterable` through, reporting how many items it yielded.
+    Returns it untouched while disabled.
+    """
+    if not enabled:
+        return iterable
+
+    def gen():
+        n = 0
+        try:
+            for item in iterable:
+                n += 1
+                yield item
+        finally:
+            count(name, n)
+
+    return gen()
+
+
+# ---------------------------------------------------------------------------
+# Profile
+# ---------------------------------------------------------------------------
+
+class Profile:
+    """
+    Hook that aggregates phases into a call tree plus counters.
+
+    Phases are keyed by their nesting path ("summary/engine.fold"),
+    tracked per thread.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, list] = {}  # path -> [calls, seconds]
+        self.counters: dict[str, int] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> list[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, name: str) -> None:
+        self._stack().append(name)
+
+    def exit(self, name: str, seconds: float) -> None:
+        stack = self._stack()
+        path = "/".join(stack)
+        stack.pop()
+        with self._lock:
+            entry = self.phases.setdefault(path, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def count(self, name: str, n: int) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> list[str]:
+        """
+        Phase tree (total and self time) followed by the counters.
+        """
+        lines = [f"{'phase':<44}{'calls':>8}{'total':>11}{'self':>11}"]
+        for path in sorted(self.phases):
+            calls, total = self.phases[path]
+            children = sum(
+                s for p, (_, s) in self.phases.items()
+                if p.startswith(path + "/") and "/" not in p[len(path) + 1:]
+            )
+            depth = path.count("/")
+            label = "  " * depth + path.rsplit("/", 1)[-1]
+            lines.append(
+                f"{label:<44}{calls:>8}{total * 1e3:>9.2f}ms{(total - children) * 1e3:>9.2f}ms")
+
+        if self.counters:
+            lines.append("")
+            for name in sorted(self.counters):
+                lines.append(f"{name:<44}{self.counters[name]:>8,}")
+        return lines
+
+
+@contextmanager
+def profiling():
+    """
+    Collects a Profile for the enclosed block.
+    """
+    profile = Profile()
+    add_hook(profile)
+    try:
+        yield profile
+    finally:
+        remove_hook(profile)
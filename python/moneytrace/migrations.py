@@ -0,0 +1,366 @@
+# migrations.py
+"""
+Versioned schema migrations.
+
+Every step has a version number and runs once. Applied steps are
+recorded in the schema_migrations table, and PRAGMA user_version
+mirrors the highest one, so an up-to-date database costs a single
+pragma read.
+
+Long-running steps commit in chunks and are written to be re-run:
+if a step is interrupted, the next run resumes where it stopped.
+"""
+
+from datetime import datetime
+
+from balances import init_balances
+from engine import HOME_CURRENCY
+from friend_registry import FriendRegistry
+from open_items import init_open_items
+
+# Rows per chunk for data backfills.
+MIGRATION_CHUNK_SIZE = 50_000
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+# ---------------------------------------------------------------------------
+# Steps
+# ---------------------------------------------------------------------------
+
+def create_base_tables(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS friends (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        phone TEXT,
+        is_contact INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS events (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        category TEXT,
+        friend TEXT,
+        friend_id TEXT,
+        description TEXT,
+        event_date TEXT NOT NULL,
+        settles TEXT,
+        currency TEXT NOT NULL DEFAULT '{HOME_CURRENCY}',
+        FOREIGN KEY(friend_id) REFERENCES friends(id)
+    )
+    """)
+
+    # Steps that replay the log (v5, v7) read these through
+    # db.iter_events, so older tables get them before any step runs.
+    cols = _columns(conn, "events")
+    if "settles" not in cols:
+        conn.execute("ALTER TABLE events ADD COLUMN settles TEXT")
+    if "currency" not in cols:
+        conn.execute(f"ALTER TABLE events ADD COLUMN currency TEXT NOT NULL DEFAULT '{HOME_CURRENCY}'")
+
+    conn.commit()
+
+
+def _v1_event_indexes(conn, progress):
+    # Pre-migration ledgers may still lack these columns.
+    cols = _columns(conn, "events")
+    if "friend" not in cols:
+        conn.execute("ALTER TABLE events ADD COLUMN friend TEXT")
+    if "friend_id" not in cols:
+        conn.execute("ALTER TABLE events ADD COLUMN friend_id TEXT")
+
+    # Dates are canonical ISO-8601 text (YYYY-MM-DD), which sorts
+    # chronologically, so month filters become index range scans.
+    conn.execute("""
+    UPDATE events
+    SET event_date = date(event_date)
+    WHERE date(event_date) IS NOT NULL AND event_date != date(event_date)
+    """)
+
+    create_event_indexes(conn)
+
+
+EVENT_INDEXES = (
+    "idx_events_date_type",
+    "idx_events_friend_id_type",
+    "idx_events_friend_type",
+    "idx_events_category_date",
+)
+
+
+def create_event_indexes(conn):
+    # Trailing amount, type and currency columns make the aggregate
+    # queries in sql_engine answerable from the index alone.
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_date_type
+    ON events (event_date, type, amount, currency)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_friend_id_type
+    ON events (friend_id, type, amount, currency)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_friend_type
+    ON events (friend, type, amount, currency)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_category_date
+    ON events (category, event_date, type, amount, currency)
+    """)
+
+
+def _v2_unique_friends(conn, progress):
+    # Collapse duplicate friends onto the oldest row, then make the
+    # lookup key unique so the registry can never fork a friend.
+    conn.execute("""
+    CREATE TEMP TABLE friend_dupes AS
+    SELECT f.id AS old_id, k.id AS keep_id
+    FROM friends f
+    JOIN friends k ON k.rowid = (
+        SELECT MIN(rowid) FROM friends
+        WHERE name = f.name AND IFNULL(phone, '') = IFNULL(f.phone, '')
+    )
+    WHERE k.rowid != f.rowid
+    """)
+    conn.execute("""
+    UPDATE events SET friend_id = (
+        SELECT keep_id FROM friend_dupes WHERE old_id = events.friend_id
+    )
+    WHERE friend_id IN (SELECT old_id FROM friend_dupes)
+    """)
+    conn.execute("DELETE FROM friends WHERE id IN (SELECT old_id FROM friend_dupes)")
+    conn.execute("DROP TABLE friend_dupes")
+
+    conn.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_friends_lookup
+    ON friends (name, IFNULL(phone, ''))
+    """)
+
+
+def _v3_backfill_friend_ids(conn, progress):
+    """
+    Points legacy events (friend name only) at their friends row.
+
+    One set-based UPDATE ... FROM per rowid chunk, committed as it
+    goes; rows already backfilled are skipped on resume.
+    """
+    names = [r[0] for r in conn.execute("""
+    SELECT DISTINCT friend FROM events
+    WHERE friend IS NOT NULL AND friend != '' AND friend_id IS NULL
+    """)]
+    FriendRegistry(conn).resolve_friends(names)
+    conn.commit()
+    progress(f"  {len(names)} friend names resolved")
+
+    low, high = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM events").fetchone()
+    if low is None:
+        return
+
+    done = 0
+    for start in range(low - 1, high, MIGRATION_CHUNK_SIZE):
+        cur = conn.execute("""
+        UPDATE events SET friend_id = f.id
+        FROM friends f
+        WHERE f.name = events.friend AND f.phone IS NULL
+          AND events.friend_id IS NULL
+          AND events.rowid > ? AND events.rowid <= ?
+        """, (start, start + MIGRATION_CHUNK_SIZE))
+        conn.commit()
+
+        done += cur.rowcount
+        scanned = min(start + MIGRATION_CHUNK_SIZE, high) - low + 1
+        progress(f"  {scanned:,}/{high - low + 1:,} rows scanned, {done:,} backfilled")
+
+
+def _v4_month_snapshots(conn, progress):
+    # ym = year * 12 + (month - 1), so months order as integers.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS month_snapshots (
+        ym INTEGER PRIMARY KEY,
+        liabilities_created INTEGER NOT NULL,
+        receivables_created INTEGER NOT NULL,
+        liabilities INTEGER NOT NULL,
+        receivables INTEGER NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS snapshot_friends (
+        ym INTEGER NOT NULL,
+        friend TEXT NOT NULL,
+        balance INTEGER NOT NULL,
+        PRIMARY KEY (ym, friend)
+    )
+    """)
+
+
+def _v5_materialized_balances(conn, progress):
+    # Backfills from the events table when the tables are new.
+    init_balances(conn)
+
+
+def _v6_partition_catalog(conn, progress):
+    # Closed years moved out to their own files (see partitions.py).
+    # Totals are frozen at split time so cross-partition carry
+    # forward never has to open an archived year.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS partitions (
+        year INTEGER PRIMARY KEY,
+        file TEXT NOT NULL,
+        archived INTEGER NOT NULL DEFAULT 0,
+        events INTEGER NOT NULL,
+        budget INTEGER NOT NULL,
+        liabilities INTEGER NOT NULL,
+        receivables INTEGER NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS partition_friends (
+        year INTEGER NOT NULL,
+        friend TEXT NOT NULL,
+        balance INTEGER NOT NULL,
+        PRIMARY KEY (year, friend)
+    )
+    """)
+
+
+def _v7_open_items(conn, progress):
+    # events.settles links a payback to the item it settles.
+    if "settles" not in _columns(conn, "events"):
+        conn.execute("ALTER TABLE events ADD COLUMN settles TEXT")
+    # Backfills by replaying the log when the tables are new.
+    init_open_items(conn)
+
+
+def _v8_currencies(conn, progress):
+    # Existing events are all in the home currency, which the column
+    # default covers without rewriting rows.
+    if "currency" not in _columns(conn, "events"):
+        conn.execute(f"ALTER TABLE events ADD COLUMN currency TEXT NOT NULL DEFAULT '{HOME_CURRENCY}'")
+    if "foreign_events" not in _columns(conn, "partitions"):
+        conn.execute("ALTER TABLE partitions ADD COLUMN foreign_events INTEGER NOT NULL DEFAULT 0")
+
+    # Only foreign-currency rows are indexed, so "any foreign events?"
+    # is one probe however large the ledger.
+    conn.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_events_foreign
+    ON events (currency) WHERE currency != '{HOME_CURRENCY}'
+    """)
+
+    # Home-currency units per unit of `currency`, from `day` on.
+    # Rates are exact decimal strings.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS fx_rates (
+        currency TEXT NOT NULL,
+        day TEXT NOT NULL,
+        rate TEXT NOT NULL,
+        PRIMARY KEY (currency, day)
+    ) WITHOUT ROWID
+    """)
+
+
+def _v9_currency_in_indexes(conn, progress):
+    # sql_engine filters on currency; rebuild indexes created before
+    # it became a trailing column so the aggregates stay covered.
+    for name in EVENT_INDEXES:
+        if "currency" not in [r[2] for r in conn.execute(f"PRAGMA index_info({name})")]:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    create_event_indexes(conn)
+
+
+def _v10_ledger_version(conn, progress):
+    # One row, bumped by every write to the events or the aggregates
+    # built from them (event_log.bump_version); caches key on it.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS ledger_version (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        version INTEGER NOT NULL
+    )
+    """)
+    conn.execute("INSERT OR IGNORE INTO ledger_version (id, version) VALUES (0, 0)")
+
+
+MIGRATIONS = [
+    (1, "event indexes", _v1_event_indexes),
+    (2, "unique friends", _v2_unique_friends),
+    (3, "backfill events.friend_id", _v3_backfill_friend_ids),
+    (4, "month snapshots", _v4_month_snapshots),
+    (5, "materialized balances", _v5_materialized_balances),
+    (6, "partition catalog", _v6_partition_catalog),
+    (7, "open items", _v7_open_items),
+    (8, "currencies", _v8_currencies),
+    (9, "currency in event indexes", _v9_currency_in_indexes),
+    (10, "ledger version", _v10_ledger_version),
+]
+
+LATEST = MIGRATIONS[-1][0]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _quiet(message: str) -> None:
+    pass
+
+
+def applied_versions(conn) -> set[int]:
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL
+    )
+    """)
+    applied = {r[0] for r in conn.execute("SELECT version FROM schema_migrations")}
+
+    # Databases migrated before this table existed only have user_version.
+    legacy = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, name, _ in MIGRATIONS:
+        if version <= legacy and version not in applied:
+            _record(conn, version, name)
+            applied.add(version)
+
+    return applied
+
+
+def _record(conn, version: int, name: str) -> None:
+    conn.execute(
+        "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+        (version, name, datetime.now().isoformat(timespec="seconds")),
+    )
+
+
+def migrate(conn, progress=_quiet) -> list[int]:
+    """
+    Applies every pending step in order and returns their versions.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= LATEST:
+        return []
+
+    create_base_tables(conn)
+    applied = applied_versions(conn)
+    conn.commit()
+
+    ran = []
+    for version, name, step in MIGRATIONS:
+        if version in applied:
+            continue
+
+        progress(f"Applying migration {version}: {name}")
+        try:
+            step(conn, progress)
+            _record(conn, version, name)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        ran.append(version)
+
+    return ran
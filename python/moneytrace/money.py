@@ -1,21 +1,188 @@
-from dataclasses import dataclass
-from moneytrace.currency import Currency, INR
+"""
+Money values and the allocation-free ways to total them.
+
+Money is an immutable (amount, currency) pair; every + or - builds a
+new one. Loops over many amounts should total plain ints instead:
+
+    Money.sum(values)            one currency, one Money at the end
+    MoneyTotals                  running int per currency
+    MoneyBatch(amounts, USD)     one array('q') instead of n objects
+
+Currencies are interned (see currency.py), so the same-currency check
+is an identity test.
+"""
+
+from array import array
+
+try:
+    from .currency import INR, Currency
+except ImportError:
+    from currency import INR, Currency
 
 
-@dataclass(frozen=True)
 class Money:
+    __slots__ = ("amount", "currency")
+
     amount: int          # amount in minor units (paise)
-    currency: Currency = INR   # instance of Currency class
+    currency: Currency   # interned Currency instance
+
+    def __init__(self, amount: int, currency: Currency = INR):
+        _set_amount(self, amount)
+        _set_currency(self, currency)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("Money is immutable")
+
+    def __delattr__(self, attr):
+        raise AttributeError("Money is immutable")
 
     def __add__(self, other: "Money") -> "Money":
         self._assert_same_currency(other)
-        return Money(amount=self.amount + other.amount, currency=self.currency)
-    
+        return Money(self.amount + other.amount, self.currency)
+
     def __sub__(self, other: "Money") -> "Money":
         self._assert_same_currency(other)
-        return Money(amount=self.amount - other.amount, currency=self.currency)
-    
+        return Money(self.amount - other.amount, self.currency)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.amount, self.currency)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.amount == other.amount and self.currency is other.currency
+
+    def __hash__(self) -> int:
+        return hash((self.amount, self.currency))
+
+    def __repr__(self) -> str:
+        return f"Money({self.amount}, {self.currency.code})"
+
     def _assert_same_currency(self, other: "Money"):
-        if self.currency.code != other.currency.code:
+        if self.currency is not other.currency:
             raise ValueError("Currency mismatch in Money operations")
-        
\ No newline at end of file
+
+    @classmethod
+    def sum(cls, values, currency: Currency | None = None) -> "Money":
+        """
+        Total of Money values in one currency, added as plain ints.
+        An empty iterable gives zero in `currency` (default: INR).
+        """
+        total = 0
+        for m in values:
+            if m.currency is not currency:
+                if currency is not None:
+                    raise ValueError("Currency mismatch in Money operations")
+                currency = m.currency
+            total += m.amount
+        return cls(total, currency or INR)
+
+
+# Slot setters, bypassing the immutable __setattr__.
+_set_amount = Money.amount.__set__
+_set_currency = Money.currency.__set__
+
+
+# ---------------------------------------------------------------------------
+# Accumulators
+# ---------------------------------------------------------------------------
+
+def _int_total(amounts) -> int:
+    # ndarray.sum() stays in C; sum() handles lists and arrays.
+    total = getattr(amounts, "sum", None)
+    return int(total()) if total is not None else sum(amounts)
+
+
+class MoneyTotals:
+    """
+    Running totals keyed by currency, kept as plain ints. Money
+    objects are only built when a total is read.
+    """
+
+    __slots__ = ("totals",)
+
+    def __init__(self):
+        self.totals: dict[Currency, int] = {}
+
+    def add(self, amount: int, currency: Currency = INR) -> None:
+        totals = self.totals
+        totals[currency] = totals.get(currency, 0) + amount
+
+    def add_money(self, m: Money) -> None:
+        self.add(m.amount, m.currency)
+
+    def add_amounts(self, amounts, currency: Currency = INR) -> None:
+        """
+        Adds a list, array or ndarray of minor units in one step.
+        """
+        self.add(_int_total(amounts), currency)
+
+    def add_batch(self, batch: "MoneyBatch") -> None:
+        self.add_amounts(batch.amounts, batch.currency)
+
+    def update(self, values) -> None:
+        """
+        Adds Money values of any mix of currencies.
+        """
+        totals = self.totals
+        get = totals.get
+        for m in values:
+            c = m.currency
+            totals[c] = get(c, 0) + m.amount
+
+    def __getitem__(self, currency: Currency) -> Money:
+        return Money(self.totals.get(currency, 0), currency)
+
+    def __iter__(self):
+        for currency, amount in self.totals.items():
+            yield Money(amount, currency)
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+
+# ---------------------------------------------------------------------------
+# Batches
+# ---------------------------------------------------------------------------
+
+def _int64_array(amounts) -> array:
+    if isinstance(amounts, array) and amounts.typecode == "q":
+        return amounts
+    try:
+        view = memoryview(amounts)
+    except TypeError:
+        return array("q", amounts)
+
+    if view.ndim == 1 and view.itemsize == 8 and view.format in ("q", "l") and view.c_contiguous:
+        out = array("q")
+        out.frombytes(view.cast("B"))
+        return out
+    return array("q", view.tolist())
+
+
+class MoneyBatch:
+    """
+    Many amounts in one currency, held as one array('q') of minor
+    units. Built from a list, array or int64 ndarray; an array('q')
+    is shared, not copied.
+    """
+
+    __slots__ = ("amounts", "currency")
+
+    def __init__(self, amounts, currency: Currency = INR):
+        self.amounts = _int64_array(amounts)
+        self.currency = currency
+
+    def total(self) -> Money:
+        return Money(sum(self.amounts), self.currency)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, i: int) -> Money:
+        return Money(self.amounts[i], self.currency)
+
+    def __iter__(self):
+        currency = self.currency
+        for amount in self.amounts:
+            yield Money(amount, currency)
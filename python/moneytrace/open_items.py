@@ -0,0 +1,471 @@
+# open_items.py
+"""
+Open-item ledger for liabilities and receivables.
+
+Every liability_created / receivable_created event is an open item
+with a remaining balance. A payback settles items of the matching
+kind for the same friend: the item it links to (events.settles)
+first, then that friend's oldest open items (by event date, then
+recording order). Anything left over is kept as a credit for the
+friend and absorbed by the next item of that kind. Per kind,
+
+    SUM(remaining) - SUM(credit) == created - settled
+
+so the totals agree with engine.compute_outstanding_* and, per
+friend, with compute_friend_balances.
+
+The tables are kept current in the same transaction as every insert,
+so "what is open, for whom, how old" only reads open rows. Items are
+kept in the home currency; events in other currencies are not open
+items and do not settle any.
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import date
+
+from engine import (
+    HOME_CURRENCY,
+    LIABILITY_CREATED,
+    PAYBACK_PAID,
+    PAYBACK_RECEIVED,
+    RECEIVABLE_CREATED,
+)
+from event_log import PartitionRouter, bump_version
+
+# Payback type -> the item kind it settles.
+SETTLES = {
+    PAYBACK_PAID: LIABILITY_CREATED,
+    PAYBACK_RECEIVED: RECEIVABLE_CREATED,
+}
+
+# Upper bounds (days) of the aging buckets; the last bucket is open.
+AGING_BUCKETS = (30, 60, 90)
+
+
+@dataclass
+class OpenItem:
+    id: str
+    kind: str
+    friend: str
+    event_date: date
+    amount: int
+    remaining: int
+
+    def age(self, today: date) -> int:
+        return (today - self.event_date).days
+
+
+def settle(items, amount: int) -> tuple[list[tuple[str, int]], int]:
+    """
+    Applies `amount` to items in the given order, reducing their
+    remaining balances.
+
+    Returns the (item id, applied) pairs and the unapplied rest.
+    """
+    applied = []
+    for item in items:
+        if amount <= 0:
+            break
+        take = min(item.remaining, amount)
+        if take:
+            item.remaining -= take
+            amount -= take
+            applied.append((item.id, take))
+    return applied, amount
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def init_open_items(conn) -> None:
+    """
+    Creates the open-item tables, backfilling them when they are new
+    on an existing ledger.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'open_items'"
+    )
+    existed = cur.fetchone() is not None
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS open_items (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        friend TEXT NOT NULL,
+        event_date TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        remaining INTEGER NOT NULL
+    )
+    """)
+
+    # Only open items are indexed; it covers FIFO lookups and aging.
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_open_items_open
+    ON open_items(kind, friend, event_date, remaining)
+    WHERE remaining > 0
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS open_credits (
+        kind TEXT NOT NULL,
+        friend TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        PRIMARY KEY (kind, friend)
+    )
+    """)
+
+    # payback_id NULL: absorbed from an earlier credit.
+    # item_id NULL: nothing was open, kept as credit.
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS settlements (
+        payback_id TEXT,
+        item_id TEXT,
+        amount INTEGER NOT NULL
+    )
+    """)
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_settlements_item ON settlements(item_id)")
+
+    if not existed:
+        _rebuild(cur)
+
+
+# ---------------------------------------------------------------------------
+# Incremental Updates
+# ---------------------------------------------------------------------------
+
+def _take_credit(cur, kind: str, friend: str, amount: int) -> int:
+    row = cur.execute(
+        "SELECT amount FROM open_credits WHERE kind = ? AND friend = ?", (kind, friend)
+    ).fetchone()
+    if not row:
+        return 0
+
+    take = min(row[0], amount)
+    if take == row[0]:
+        cur.execute("DELETE FROM open_credits WHERE kind = ? AND friend = ?", (kind, friend))
+    else:
+        cur.execute(
+            "UPDATE open_credits SET amount = amount - ? WHERE kind = ? AND friend = ?",
+            (take, kind, friend))
+    return take
+
+
+def _oldest_open(cur, kind: str, friend: str, amount: int, skip=None) -> list[OpenItem]:
+    """
+    The fewest oldest open items (other than `skip`) that cover `amount`.
+    """
+    rows = cur.execute("""
+    SELECT id, kind, friend, event_date, amount, remaining FROM open_items
+    WHERE kind = ? AND friend = ? AND remaining > 0
+    ORDER BY event_date, rowid
+    """, (kind, friend))
+
+    # Row by row: usually the first item covers the payback.
+    items, covered = [], 0
+    for r in rows:
+        if r[0] == skip:
+            continue
+        items.append(OpenItem(r[0], r[1], r[2], date.fromisoformat(r[3]), r[4], r[5]))
+        covered += r[5]
+        if covered >= amount:
+            break
+    return items
+
+
+def apply_event(cur, event_id: str, event: dict) -> None:
+    """
+    Updates the open items for one inserted event. Does not commit.
+
+    Raises ValueError for a settles link that does not name an item
+    of the right kind for the same friend.
+    """
+    if (event.get("currency") or HOME_CURRENCY) != HOME_CURRENCY:
+        return
+
+    etype = event["type"]
+    amount = event["amount"]
+    friend = event.get("friend") or ""
+
+    if etype in (LIABILITY_CREATED, RECEIVABLE_CREATED):
+        absorbed = _take_credit(cur, etype, friend, amount)
+        cur.execute("""
+        INSERT INTO open_items (id, kind, friend, event_date, amount, remaining)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, (event_id, etype, friend, event["event_date"].isoformat(), amount, amount - absorbed))
+        if absorbed:
+            cur.execute(
+                "INSERT INTO settlements (payback_id, item_id, amount) VALUES (NULL, ?, ?)",
+                (event_id, absorbed))
+        return
+
+    kind = SETTLES.get(etype)
+    if kind is None:
+        return
+
+    items = []
+    link = event.get("settles")
+    if link:
+        r = cur.execute(
+            "SELECT id, kind, friend, event_date, amount, remaining FROM open_items WHERE id = ?",
+            (link,)).fetchone()
+        if r is None or r[1] != kind or r[2] != friend:
+            raise ValueError(f"{etype} cannot settle {link}: no such {kind} for {friend or 'no friend'}")
+        items.append(OpenItem(r[0], r[1], r[2], date.fromisoformat(r[3]), r[4], r[5]))
+
+    rest = amount - (items[0].remaining if items else 0)
+    if rest > 0:
+        items += _oldest_open(cur, kind, friend, rest, skip=link)
+
+    applied, left = settle(items, amount)
+    cur.executemany(
+        "UPDATE open_items SET remaining = remaining - ? WHERE id = ?",
+        [(take, item_id) for item_id, take in applied])
+    if left:
+        applied.append((None, left))
+        cur.execute("""
+        INSERT INTO open_credits (kind, friend, amount) VALUES (?, ?, ?)
+        ON CONFLICT (kind, friend) DO UPDATE SET amount = amount + excluded.amount
+        """, (kind, friend, left))
+    cur.executemany(
+        "INSERT INTO settlements (payback_id, item_id, amount) VALUES (?, ?, ?)",
+        [(event_id, item_id, take) for item_id, take in applied])
+
+
+def apply_events(cur, event_ids, events) -> None:
+    for event_id, event in zip(event_ids, events):
+        apply_event(cur, event_id, event)
+
+
+# ---------------------------------------------------------------------------
+# Rebuild / Verify
+# ---------------------------------------------------------------------------
+
+def _replay_rows(conn):
+    """
+    (rowid, id, type, amount, friend, event_date, settles) for every
+    home-currency item and payback in recording order. Partitions keep
+    their main rowids, so the files merge back into one sequence.
+    """
+    types = (LIABILITY_CREATED, RECEIVABLE_CREATED, *SETTLES)
+    with PartitionRouter(conn) as router:
+        streams = [
+            source.execute("""
+            SELECT rowid, id, type, amount, friend, event_date, settles FROM events
+            WHERE type IN (?, ?, ?, ?) AND currency = ?
+            ORDER BY rowid
+            """, (*types, HOME_CURRENCY))
+            for source in router.sources()
+        ]
+        yield from heapq.merge(*streams)
+
+
+def _replay(conn):
+    """
+    Folds the event log in memory; returns (items in creation order,
+    credits, settlements).
+    """
+    items: list[OpenItem] = []
+    by_id: dict[str, OpenItem] = {}
+    queues: dict[tuple[str, str], list] = {}
+    credits: dict[tuple[str, str], int] = {}
+    settlements = []
+
+    for _, event_id, etype, amount, friend, event_date, link in _replay_rows(conn):
+        friend = friend or ""
+
+        if etype in (LIABILITY_CREATED, RECEIVABLE_CREATED):
+            key = (etype, friend)
+            absorbed = min(credits.get(key, 0), amount)
+            if absorbed:
+                credits[key] -= absorbed
+                settlements.append((None, event_id, absorbed))
+
+            item = OpenItem(
+                event_id, etype, friend, date.fromisoformat(event_date), amount, amount - absorbed)
+            items.append(item)
+            by_id[event_id] = item
+            heapq.heappush(queues.setdefault(key, []), (event_date, len(items), item))
+            continue
+
+        kind = SETTLES[etype]
+        key = (kind, friend)
+        queue = queues.get(key, [])
+        left = amount
+
+        linked = by_id.get(link) if link else None
+        if linked is not None and linked.kind == kind and linked.friend == friend:
+            applied, left = settle([linked], left)
+            settlements += [(event_id, i, take) for i, take in applied]
+
+        while left and queue:
+            item = queue[0][2]
+            if not item.remaining:
+                heapq.heappop(queue)
+                continue
+            applied, left = settle([item], left)
+            settlements += [(event_id, i, take) for i, take in applied]
+
+        if left:
+            credits[key] = credits.get(key, 0) + left
+            settlements.append((event_id, None, left))
+
+    return items, {k: v for k, v in credits.items() if v}, settlements
+
+
+def _rebuild(cur) -> None:
+    items, credits, settlements = _replay(cur.connection)
+
+    cur.execute("DELETE FROM open_items")
+    cur.execute("DELETE FROM open_credits")
+    cur.execute("DELETE FROM settlements")
+    cur.executemany("""
+    INSERT INTO open_items (id, kind, friend, event_date, amount, remaining)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, [
+        (i.id, i.kind, i.friend, i.event_date.isoformat(), i.amount, i.remaining)
+        for i in items
+    ])
+    cur.executemany(
+        "INSERT INTO open_credits (kind, friend, amount) VALUES (?, ?, ?)",
+        [(kind, friend, amount) for (kind, friend), amount in credits.items()])
+    cur.executemany(
+        "INSERT INTO settlements (payback_id, item_id, amount) VALUES (?, ?, ?)",
+        settlements)
+
+
+def rebuild(conn) -> None:
+    """
+    Recomputes the open items from the event log.
+    """
+    cur = conn.cursor()
+    _rebuild(cur)
+    bump_version(cur)
+    conn.commit()
+
+
+def verify(conn) -> list[str]:
+    """
+    Replays the event log and diffs remaining balances and credits
+    against the stored ones. Returns human-readable mismatches.
+    """
+    items, credits, _ = _replay(conn)
+    expected = {i.id: i.remaining for i in items}
+    stored = dict(conn.execute("SELECT id, remaining FROM open_items"))
+
+    problems = []
+    for item_id in sorted(set(expected) | set(stored)):
+        if expected.get(item_id) != stored.get(item_id):
+            problems.append(
+                f"open item {item_id}: stored remaining={stored.get(item_id)}, "
+                f"expected={expected.get(item_id)}")
+
+    stored_credits = {
+        (kind, friend): amount
+        for kind, friend, amount in conn.execute("SELECT kind, friend, amount FROM open_credits")
+    }
+    for key in sorted(set(credits) | set(stored_credits)):
+        if credits.get(key) != stored_credits.get(key):
+            problems.append(
+                f"credit {key}: stored={stored_credits.get(key)}, expected={credits.get(key)}")
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def open_items(conn, kind: str | None = None, friend: str | None = None) -> list[OpenItem]:
+    """
+    Items with a remaining balance, oldest first.
+    """
+    where, params = ["remaining > 0"], []
+    if kind:
+        where.append("kind = ?")
+        params.append(kind)
+    if friend is not None:
+        where.append("friend = ?")
+        params.append(friend)
+
+    return [
+        OpenItem(r[0], r[1], r[2], date.fromisoformat(r[3]), r[4], r[5])
+        for r in conn.execute(f"""
+        SELECT id, kind, friend, event_date, amount, remaining FROM open_items
+        WHERE {" AND ".join(where)}
+        ORDER BY event_date, rowid
+        """, params)
+    ]
+
+
+def settlement_history(conn, item_id: str) -> list[tuple[str | None, int]]:
+    """
+    (payback id, amount) applied to one item, in order; a None id is
+    credit carried over from an earlier overpayment.
+    """
+    return conn.execute(
+        "SELECT payback_id, amount FROM settlements WHERE item_id = ? ORDER BY rowid",
+        (item_id,)).fetchall()
+
+
+def bucket_labels(buckets=AGING_BUCKETS) -> list[str]:
+    bounds = (0, *buckets)
+    labels = [f"{lo}-{hi - 1}" for lo, hi in zip(bounds, buckets)]
+    return labels + [f"{buckets[-1]}+"]
+
+
+def aging(
+        conn,
+        today: date | None = None,
+        buckets=AGING_BUCKETS,
+        kind: str | None = None,
+        friend: str | None = None,
+) -> list[dict]:
+    """
+    Open balances per kind and friend, split into age buckets (days).
+
+    Reads only open items, through idx_open_items_open.
+    """
+    today = today or date.today()
+    labels = bucket_labels(buckets)
+
+    where, params = ["remaining > 0"], [today.isoformat()]
+    if kind:
+        where.append("kind = ?")
+        params.append(kind)
+    if friend is not None:
+        where.append("friend = ?")
+        params.append(friend)
+
+    bounds = (None, *buckets)
+    cases = []
+    for lo, hi in zip(bounds, (*buckets, None)):
+        cond = " AND ".join(
+            c for c in (f"age >= {lo}" if lo else "", f"age < {hi}" if hi else "") if c)
+        cases.append(f"SUM(CASE WHEN {cond} THEN remaining ELSE 0 END)")
+
+    rows = conn.execute(f"""
+    SELECT kind, friend, COUNT(*), SUM(remaining), MIN(event_date), {", ".join(cases)}
+    FROM (
+        SELECT kind, friend, event_date, remaining,
+               CAST(julianday(?) - julianday(event_date) AS INTEGER) AS age
+        FROM open_items
+        WHERE {" AND ".join(where)}
+    )
+    GROUP BY kind, friend
+    ORDER BY kind, friend
+    """, params)
+
+    return [
+        {
+            "kind": kind,
+            "friend": friend,
+            "items": n,
+            "open": total,
+            "oldest": oldest,
+            **dict(zip(labels, amounts)),
+        }
+        for kind, friend, n, total, oldest, *amounts in rows
+    ]
@@ -0,0 +1,146 @@
+# partitions.py
+"""
+Yearly partitions with an archive tier.
+
+A closed year can be split out of the main ledger into its own file
+next to it (moneytrace.db -> moneytrace.2024.db). The main file keeps
+a catalog row per partition with the year's totals frozen at split
+time: a record of what moved, which the year's file can be checked
+against.
+
+Partitioned years are immutable: a back-dated event for such a year
+stays in the main file, and the router reads both. That keeps the
+frozen totals exact.
+
+Archived partitions are lzma-compressed and read-only; they are
+decompressed the first time a query needs them, into a copy cached
+next to the archive. Reads across partitions go through
+event_log.PartitionRouter / iter_ledger.
+
+The materialized balances and snapshots in the main file already
+cover moved events, so summaries are unaffected by splitting.
+"""
+
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from engine import HOME_CURRENCY, compute_summary
+from event_log import EVENT_BATCH_SIZE, _main_file, _year_bounds, bump_version, iter_events
+from migrations import create_base_tables, create_event_indexes
+
+_EVENT_COLUMNS = "id, type, amount, category, friend, friend_id, description, event_date, settles, currency"
+
+
+# ---------------------------------------------------------------------------
+# Split / Archive
+# ---------------------------------------------------------------------------
+
+def split_year(conn, year: int, progress=None) -> int:
+    """
+    Moves every event dated in `year` into its own partition file.
+
+    The main file's write lock is held from the copy to the delete,
+    so an event back-dated into the year by another connection either
+    lands before the copy (and moves) or waits until the split is
+    done. The partition file is committed first; the main file then
+    deletes the rows and records the catalog entry in the same
+    transaction. A crash in between leaves an uncatalogued file that
+    the router ignores and the next split overwrites.
+    Returns the number of events moved.
+    """
+    if year >= date.today().year:
+        raise ValueError(f"{year} is not closed yet")
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        moved = _split_locked(conn, year, progress)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return moved
+
+
+def _split_locked(conn, year: int, progress) -> int:
+    if conn.execute("SELECT 1 FROM partitions WHERE year = ?", (year,)).fetchone():
+        raise ValueError(f"{year} is already partitioned")
+
+    main = _main_file(conn)
+    target = main.with_name(f"{main.stem}.{year}{main.suffix}")
+    target.unlink(missing_ok=True)
+
+    start, end = _year_bounds(year)
+
+    # 1. Copy the year into the partition file.
+    part = sqlite3.connect(target)
+    try:
+        create_base_tables(part)
+        create_event_indexes(part)
+
+        # rowids are kept, so recording order stays comparable across files.
+        cur = conn.execute(f"""
+        SELECT rowid, {_EVENT_COLUMNS} FROM events
+        WHERE event_date >= ? AND event_date < ?
+        """, (start, end))
+
+        moved = 0
+        while rows := cur.fetchmany(EVENT_BATCH_SIZE):
+            part.executemany(
+                f"INSERT INTO events (rowid, {_EVENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            moved += len(rows)
+            if progress:
+                progress(f"  {moved:,} events copied")
+        part.commit()
+    finally:
+        part.close()
+
+    # 2. Freeze the year's (home currency) totals and drop it from the main file.
+    s = compute_summary(iter_events(conn, start=start, end=end))
+    foreign = conn.execute(f"""
+    SELECT COUNT(*) FROM events
+    WHERE currency != '{HOME_CURRENCY}' AND event_date >= ? AND event_date < ?
+    """, (start, end)).fetchone()[0]
+    conn.execute("""
+    INSERT INTO partitions (year, file, archived, events, budget, liabilities, receivables, foreign_events)
+    VALUES (?, ?, 0, ?, ?, ?, ?, ?)
+    """, (year, target.name, moved, s.budget, s.liabilities, s.receivables, foreign))
+    conn.executemany(
+        "INSERT INTO partition_friends (year, friend, balance) VALUES (?, ?, ?)",
+        [(year, f, b) for f, b in s.friend_balances.items()],
+    )
+    conn.execute(
+        "DELETE FROM events WHERE event_date >= ? AND event_date < ?", (start, end))
+    bump_version(conn)
+    return moved
+
+
+def archive_year(conn, year: int) -> Path:
+    """
+    Compresses a partition into the read-only archive tier.
+    """
+    row = conn.execute(
+        "SELECT file, archived FROM partitions WHERE year = ?", (year,)
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"{year} is not partitioned")
+    if row[1]:
+        return _main_file(conn).with_name(row[0])
+
+    import lzma
+    import shutil
+
+    source = _main_file(conn).with_name(row[0])
+    target = source.with_name(source.name + ".xz")
+
+    with open(source, "rb") as src, lzma.open(target, "wb", preset=6) as dst:
+        shutil.copyfileobj(src, dst)
+
+    conn.execute(
+        "UPDATE partitions SET file = ?, archived = 1 WHERE year = ?", (target.name, year))
+    conn.commit()
+    source.unlink()
+    target.with_suffix(".unpacked").unlink(missing_ok=True)
+    return target
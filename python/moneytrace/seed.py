@@ -1,12 +1,8 @@
-from datetime import datetime, date
-from moneytrace.db import init_db
-from events import EventType
+from datetime import date
+from db import append_event, transaction
 
 
-conn = init_db()
-cur = conn.cursor()
-
-today = date.today().isoformat()
+today = date.today()
 
 events = [
     # Case 1: you paid 4000, split 4
@@ -22,9 +18,13 @@ events = [
     ("expense", 1000, "Eating Out", None, "Solo dinner", today),
 ]
 
-cur.executemany("""
-INSERT INTO events (type, amount, category, friend, description, event_date)
-VALUES (?, ?, ?, ?, ?, ?)
-""", events)
-
-conn.commit()
\ No newline at end of file
+with transaction() as conn:
+    for etype, amount, category, friend, description, event_date in events:
+        append_event(conn, {
+            "type": etype,
+            "amount": amount,
+            "category": category,
+            "friend": friend,
+            "description": description,
+            "event_date": event_date,
+        })
@@ -0,0 +1,145 @@
+# snapshots.py
+"""
+Month-end snapshot checkpoints.
+
+For every closed month (any month before the current one) the
+carried-forward liability / receivable totals and per-friend
+balances are persisted. A budget-month query for month N loads the
+snapshot for N-1 and folds only month N's events, instead of
+rescanning the whole history.
+
+Snapshots are invalidated from the month of any back-dated event
+onwards, in the same transaction as the insert.
+"""
+
+from datetime import date
+
+import instrument
+from engine import MonthSnapshot, compute_budget_for_month, roll_forward
+from event_log import PartitionRouter
+
+
+def to_ym(year: int, month: int) -> int:
+    return year * 12 + (month - 1)
+
+
+def from_ym(ym: int) -> tuple[int, int]:
+    return ym // 12, ym % 12 + 1
+
+
+def _month_range(ym: int) -> tuple[str, str]:
+    y, m = from_ym(ym)
+    ny, nm = from_ym(ym + 1)
+    return f"{y:04d}-{m:02d}-01", f"{ny:04d}-{nm:02d}-01"
+
+
+def _current_ym() -> int:
+    today = date.today()
+    return to_ym(today.year, today.month)
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+def _load(conn, ym: int) -> MonthSnapshot:
+    row = conn.execute("""
+    SELECT liabilities_created, receivables_created, liabilities, receivables
+    FROM month_snapshots WHERE ym = ?
+    """, (ym,)).fetchone()
+
+    friends = dict(conn.execute(
+        "SELECT friend, balance FROM snapshot_friends WHERE ym = ?", (ym,)
+    ).fetchall())
+
+    return MonthSnapshot(*row, friend_balances=friends)
+
+
+def _save(conn, ym: int, s: MonthSnapshot) -> None:
+    conn.execute("""
+    INSERT OR REPLACE INTO month_snapshots
+        (ym, liabilities_created, receivables_created, liabilities, receivables)
+    VALUES (?, ?, ?, ?, ?)
+    """, (ym, s.liabilities_created, s.receivables_created, s.liabilities, s.receivables))
+    conn.executemany(
+        "INSERT OR REPLACE INTO snapshot_friends (ym, friend, balance) VALUES (?, ?, ?)",
+        [(ym, f, b) for f, b in s.friend_balances.items()],
+    )
+
+
+def invalidate(cur, event_date: date) -> None:
+    """
+    Drops every snapshot from the event's month onwards.
+
+    Run on the inserting cursor, before commit.
+    """
+    ym = to_ym(event_date.year, event_date.month)
+    cur.execute("DELETE FROM month_snapshots WHERE ym >= ?", (ym,))
+    cur.execute("DELETE FROM snapshot_friends WHERE ym >= ?", (ym,))
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def snapshot_at(conn, year: int, month: int) -> MonthSnapshot:
+    """
+    Carried-forward state at the end of the given month.
+
+    Starts from the latest stored snapshot at or before it and folds
+    the months in between, persisting those that are closed. The
+    writes go in a savepoint of their own: outside a transaction they
+    are committed on release, inside the caller's they join it and
+    commit or roll back with it.
+    """
+    conn.execute("SAVEPOINT snapshot_at")
+    try:
+        snapshot = _snapshot_at(conn, to_ym(year, month))
+    except BaseException:
+        conn.execute("ROLLBACK TO snapshot_at")
+        conn.execute("RELEASE snapshot_at")
+        raise
+    conn.execute("RELEASE snapshot_at")
+    return snapshot
+
+
+def _snapshot_at(conn, target: int) -> MonthSnapshot:
+    row = conn.execute(
+        "SELECT MAX(ym) FROM month_snapshots WHERE ym <= ?", (target,)
+    ).fetchone()
+    with PartitionRouter(conn) as router:
+        if row[0] is not None:
+            ym = row[0]
+            snapshot = _load(conn, ym)
+        else:
+            first = router.first_event_date()
+            if first is None:
+                return MonthSnapshot()
+            d = date.fromisoformat(first)
+            ym = to_ym(d.year, d.month) - 1
+            snapshot = MonthSnapshot()
+
+        closed = _current_ym()
+        while ym < target:
+            ym += 1
+            start, end = _month_range(ym)
+            with instrument.phase("snapshots.roll_forward"):
+                snapshot = roll_forward(snapshot, router.iter_events(start=start, end=end))
+            instrument.count("snapshots.folded")
+            if ym < closed:
+                _save(conn, ym, snapshot)
+
+    return snapshot
+
+
+def budget_for_month(conn, base_budget_minor: int, month: int, year: int) -> int:
+    """
+    Same as compute_available_budget(base, events_for_budget_month(...))
+    but reads only the previous snapshot and this month's events.
+    """
+    py, pm = from_ym(to_ym(year, month) - 1)
+    previous = snapshot_at(conn, py, pm)
+    start, end = _month_range(to_ym(year, month))
+    with PartitionRouter(conn) as router:
+        return compute_budget_for_month(
+            base_budget_minor, previous, router.iter_events(start=start, end=end))
@@ -0,0 +1,164 @@
+# sql_engine.py
+"""
+SQL push-down backend for the ledger engine.
+
+Each compute_* function mirrors the one in engine.py, but runs as a
+single aggregate query against the events table, so events are never
+materialized in Python.
+
+engine.py stays the source of truth: any change to the impact matrix
+there must be reflected here (test_sql_engine.py checks parity).
+Like the engine without an FX table, every query totals one currency
+(default HOME_CURRENCY); conversion only happens in engine.py.
+
+Queries read the connection's own events table only. Years split
+out by partitions.py are not included; event_log.iter_ledger reads
+across partitions.
+"""
+
+from engine import (
+    EXPENSE,
+    LIABILITY_CREATED,
+    RECEIVABLE_CREATED,
+    PAYBACK_PAID,
+    PAYBACK_RECEIVED,
+    BUDGET_ADJUSTMENT,
+    HOME_CURRENCY,
+    LedgerSummary,
+)
+
+
+def month_bounds(month: int, year: int) -> tuple[str, str]:
+    """
+    Half-open ISO date range [start, end) covering one month.
+    """
+    start = f"{year:04d}-{month:02d}-01"
+    if month == 12:
+        end = f"{year + 1:04d}-01-01"
+    else:
+        end = f"{year:04d}-{month + 1:02d}-01"
+    return start, end
+
+
+# ---------------------------------------------------------------------------
+# Core Budget Computation
+# ---------------------------------------------------------------------------
+
+def compute_available_budget(conn, base_budget_minor: int, currency: str | None = None) -> int:
+    row = conn.execute("""
+    SELECT COALESCE(SUM(CASE
+        WHEN type IN (?, ?) THEN -amount
+        WHEN type IN (?, ?) THEN amount
+        ELSE 0
+    END), 0)
+    FROM events
+    WHERE currency = ?
+    """, (EXPENSE, LIABILITY_CREATED, PAYBACK_RECEIVED, BUDGET_ADJUSTMENT,
+          currency or HOME_CURRENCY)).fetchone()
+    return base_budget_minor + row[0]
+
+
+# ---------------------------------------------------------------------------
+# Monthly Spend (Cash Out Only)
+# ---------------------------------------------------------------------------
+
+def compute_monthly_spend(conn, month: int, year: int, currency: str | None = None) -> int:
+    if not (month and year):
+        return 0
+
+    start, end = month_bounds(month, year)
+    row = conn.execute("""
+    SELECT COALESCE(SUM(amount), 0)
+    FROM events
+    WHERE event_date >= ? AND event_date < ? AND type IN (?, ?) AND currency = ?
+    """, (start, end, EXPENSE, PAYBACK_PAID, currency or HOME_CURRENCY)).fetchone()
+    return row[0]
+
+
+# ---------------------------------------------------------------------------
+# Outstanding Liabilities / Receivables
+# ---------------------------------------------------------------------------
+
+def _outstanding(conn, created: str, settled: str, currency: str | None = None) -> int:
+    row = conn.execute("""
+    SELECT COALESCE(SUM(CASE WHEN type = ? THEN amount ELSE -amount END), 0)
+    FROM events
+    WHERE type IN (?, ?) AND currency = ?
+    """, (created, created, settled, currency or HOME_CURRENCY)).fetchone()
+    return row[0]
+
+
+def compute_outstanding_liabilities(conn, currency: str | None = None) -> int:
+    return max(_outstanding(conn, LIABILITY_CREATED, PAYBACK_PAID, currency), 0)
+
+
+def compute_outstanding_receivables(conn, currency: str | None = None) -> int:
+    return max(_outstanding(conn, RECEIVABLE_CREATED, PAYBACK_RECEIVED, currency), 0)
+
+
+# ---------------------------------------------------------------------------
+# Per-Friend Balances
+# ---------------------------------------------------------------------------
+
+def compute_friend_balances(conn, currency: str | None = None) -> dict[str, int]:
+    rows = conn.execute("""
+    SELECT friend, SUM(CASE WHEN type IN (?, ?) THEN amount ELSE -amount END)
+    FROM events
+    WHERE friend IS NOT NULL AND friend != '' AND type IN (?, ?, ?, ?) AND currency = ?
+    GROUP BY friend
+    """, (
+        RECEIVABLE_CREATED, PAYBACK_PAID,
+        RECEIVABLE_CREATED, PAYBACK_PAID, LIABILITY_CREATED, PAYBACK_RECEIVED,
+        currency or HOME_CURRENCY,
+    )).fetchall()
+    return dict(rows)
+
+
+# ---------------------------------------------------------------------------
+# Category-wise Spend
+# ---------------------------------------------------------------------------
+
+def compute_category_spend(
+    conn,
+    month: int | None = None,
+    year: int | None = None,
+    currency: str | None = None,
+) -> dict[str, int]:
+    currency = currency or HOME_CURRENCY
+    if month and year:
+        start, end = month_bounds(month, year)
+        rows = conn.execute("""
+        SELECT category, SUM(amount)
+        FROM events
+        WHERE type = ? AND event_date >= ? AND event_date < ? AND currency = ?
+        GROUP BY category
+        """, (EXPENSE, start, end, currency)).fetchall()
+    else:
+        rows = conn.execute("""
+        SELECT category, SUM(amount)
+        FROM events
+        WHERE type = ? AND currency = ?
+        GROUP BY category
+        """, (EXPENSE, currency)).fetchall()
+    return dict(rows)
+
+
+# ---------------------------------------------------------------------------
+# Summary
+# ---------------------------------------------------------------------------
+
+def compute_summary(
+        conn,
+        base_budget_minor: int = 0,
+        month: int | None = None,
+        year: int | None = None,
+        currency: str | None = None,
+) -> LedgerSummary:
+    return LedgerSummary(
+        budget=compute_available_budget(conn, base_budget_minor, currency),
+        month_spend=compute_monthly_spend(conn, month, year, currency),
+        liabilities=_outstanding(conn, LIABILITY_CREATED, PAYBACK_PAID, currency),
+        receivables=_outstanding(conn, RECEIVABLE_CREATED, PAYBACK_RECEIVED, currency),
+        friend_balances=compute_friend_balances(conn, currency),
+        category_spend=compute_category_spend(conn, month, year, currency),
+    )
@@ -0,0 +1,182 @@
+# summary_cache.py
+"""
+Memoized summaries at the engine/db boundary.
+
+A summary is assembled from cached parts:
+
+- ("month", year, month)  month spend + category spend for one month
+- ("ledger",)             budget delta, outstanding totals, friend balances
+- ("friend", name)        one friend's balance
+- ("budget", year, month) budget for one month (snapshots.budget_for_month)
+
+The base budget is applied when a summary is assembled, so it never
+fragments the cache. Every part is tagged with the ledger version
+(event_log.ledger_version, a counter every write bumps); a write from
+another connection, a rebuild or a partition split moves it and
+clears the cache. Local inserts reported through note_insert() only
+drop the month and budget parts they touch and patch the ledger-wide
+totals in place, as long as the version the insert wrote
+(LedgerConnection.last_version) is the next one after the cache's.
+"""
+
+from collections import OrderedDict
+
+import instrument
+from balances import aggregate, load_summary
+from engine import LedgerSummary
+from event_log import ledger_version
+from snapshots import budget_for_month
+
+SUMMARY_CACHE_SIZE = 256
+
+
+class SummaryCache:
+    def __init__(self, conn, maxsize: int = SUMMARY_CACHE_SIZE):
+        self.conn = conn
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._parts: OrderedDict[tuple, object] = OrderedDict()
+        self._version = self._ledger_version()
+
+    # -- bookkeeping ---------------------------------------------------------
+
+    def _ledger_version(self) -> int:
+        return ledger_version(self.conn)
+
+    def _check_version(self) -> None:
+        version = self._ledger_version()
+        if version != self._version:
+            self._parts.clear()
+            self._version = version
+
+    def _get(self, key):
+        value = self._parts.get(key)
+        if value is None:
+            self.misses += 1
+            instrument.count("cache.miss")
+        else:
+            self.hits += 1
+            instrument.count("cache.hit")
+            self._parts.move_to_end(key)
+        return value
+
+    def _put(self, key, value) -> None:
+        self._parts[key] = value
+        self._parts.move_to_end(key)
+        while len(self._parts) > self.maxsize:
+            self._parts.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._parts)}
+
+    def clear(self) -> None:
+        self._parts.clear()
+        self._version = self._ledger_version()
+
+    # -- invalidation --------------------------------------------------------
+
+    def note_insert(self, event: dict) -> None:
+        """
+        Call after inserting an event through this cache's connection.
+        """
+        self.note_inserts([event])
+
+    def note_inserts(self, events: list[dict]) -> None:
+        """
+        Call once after an append_events batch through this cache's
+        connection.
+        """
+        version = getattr(self.conn, "last_version", None)
+        if version is None or version != self._version + 1:
+            # Someone else wrote too; their changes are not in hand.
+            self.clear()
+            return
+        self._version = version
+
+        months, friends, _ = aggregate(events)
+        for y, m in months:
+            self._parts.pop(("month", y, m), None)
+        self._parts.pop(("month", None, None), None)
+        for name in friends:
+            self._parts.pop(("friend", name), None)
+        # Liabilities carry forward, so later months move too.
+        if months:
+            first = min(months)
+            for key in [k for k in self._parts
+                        if k[0] == "budget" and (k[1], k[2]) >= first]:
+                del self._parts[key]
+
+        ledger = self._parts.get(("ledger",))
+        if ledger is not None:
+            budget, liabilities, receivables, balances = ledger
+            balances = dict(balances)
+            for name, amt in friends.items():
+                balances[name] = balances.get(name, 0) + amt
+            for b, _, l, r in months.values():
+                budget, liabilities, receivables = budget + b, liabilities + l, receivables + r
+            self._parts[("ledger",)] = (budget, liabilities, receivables, balances)
+
+    # -- reads ---------------------------------------------------------------
+
+    def summary(
+            self,
+            base_budget_minor: int = 0,
+            month: int | None = None,
+            year: int | None = None,
+    ) -> LedgerSummary:
+        self._check_version()
+
+        if not (month and year):
+            month = year = None
+
+        month_key = ("month", year, month)
+        month_part = self._get(month_key)
+        ledger_part = self._get(("ledger",))
+
+        if month_part is None or ledger_part is None:
+            s = load_summary(self.conn, 0, month, year)
+            month_part = (s.month_spend, s.category_spend)
+            ledger_part = (s.budget, s.liabilities, s.receivables, s.friend_balances)
+            self._put(month_key, month_part)
+            self._put(("ledger",), ledger_part)
+
+        budget, liabilities, receivables, friends = ledger_part
+        month_spend, categories = month_part
+
+        # Copies, so callers cannot mutate cached parts.
+        return LedgerSummary(
+            budget=base_budget_minor + budget,
+            month_spend=month_spend,
+            liabilities=liabilities,
+            receivables=receivables,
+            friend_balances=dict(friends),
+            category_spend=dict(categories),
+        )
+
+    def friend_balance(self, name: str) -> int:
+        self._check_version()
+
+        key = ("friend", name)
+        balance = self._get(key)
+        if balance is None:
+            row = self.conn.execute(
+                "SELECT balance FROM balance_friends WHERE friend = ?", (name,)
+            ).fetchone()
+            balance = row[0] if row else 0
+            self._put(key, balance)
+        return balance
+
+    def month_budget(self, base_budget_minor: int, month: int, year: int) -> int:
+        """
+        Needs a writable connection: closed months are snapshotted on
+        first use.
+        """
+        self._check_version()
+
+        key = ("budget", year, month)
+        budget = self._get(key)
+        if budget is None:
+            budget = budget_for_month(self.conn, 0, month, year)
+            self._put(key, budget)
+        return base_budget_minor + budget
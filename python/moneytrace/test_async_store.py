@@ -0,0 +1,82 @@
+# test_async_store.py
+import asyncio
+import sqlite3
+from datetime import date
+
+import engine
+from async_store import AsyncEventStore
+
+D = date(2025, 5, 1)
+
+
+def _expense(amount, friend=None, currency=None):
+    return {"type": engine.EXPENSE, "amount": amount, "event_date": D,
+            "friend": friend, "category": "Food", "currency": currency}
+
+
+def test_readers_writer_streams_and_rollback(tmp_path):
+    asyncio.run(_exercise(str(tmp_path / "ledger.db")))
+
+
+async def _exercise(path):
+    store = AsyncEventStore(path, readers=2)
+
+    # Readers run while batches commit; each batch of ten shows up whole.
+    async def write():
+        for _ in range(20):
+            await store.add_events([_expense(1) for _ in range(10)])
+
+    async def read():
+        seen = []
+        for _ in range(40):
+            seen.append((await store.summary()).budget)
+            await asyncio.sleep(0)
+        return seen
+
+    _, *reads = await asyncio.gather(write(), read(), read())
+    for seen in reads:
+        assert all(b % 10 == 0 for b in seen), seen
+    assert (await store.summary()).budget == -200
+
+    # A bad row rolls the whole batch back, friends included.
+    try:
+        await store.add_events([_expense(5, "Nova"), _expense(5, currency="XXX")])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("bad batch accepted")
+    assert (await store.summary()).budget == -200
+    assert await asyncio.to_thread(_friend_rows, path) == []
+    await store.add_event(_expense(1, "Nova"))
+    assert len(await asyncio.to_thread(_friend_rows, path)) == 1
+
+    # Leaving a stream early stops its producer and frees the reader:
+    # two full streams then need both reader threads.
+    stream = store.stream_events(batch_size=7)
+    taken = 0
+    async for _ in stream:
+        taken += 1
+        if taken == 10:
+            break
+    await stream.aclose()
+
+    async def drain():
+        return [e async for e in store.stream_events(batch_size=7)]
+
+    first, second = await asyncio.wait_for(asyncio.gather(drain(), drain()), timeout=10)
+    assert len(first) == len(second) == 201
+
+    conns = list(store._conns)
+    await store.close()
+    for conn in conns:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            pass
+        else:
+            raise AssertionError("connection left open")
+
+
+def _friend_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT id FROM friends WHERE name = 'Nova'").fetchall()
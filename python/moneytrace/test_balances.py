@@ -0,0 +1,36 @@
+# test_balances.py
+from datetime import date
+
+import engine
+from balances import load_summary, verify
+from db import append_events, connect, insert_event
+from event_log import iter_ledger
+
+
+def test_written_ledger_verifies_clean(tmp_path):
+    conn = connect(str(tmp_path / "ledger.db"))
+    d = date(2025, 3, 4)
+
+    # Optional fields present, missing and empty, on both insert paths.
+    insert_event(conn, {"type": engine.EXPENSE, "amount": 100, "event_date": d})
+    insert_event(conn, {"type": engine.EXPENSE, "amount": 200, "event_date": d, "category": "Food"})
+    insert_event(conn, {"type": engine.LIABILITY_CREATED, "amount": 300, "event_date": d, "friend": "Asha"})
+    insert_event(conn, {"type": engine.EXPENSE, "amount": 50, "event_date": d, "currency": "USD"})
+    append_events(conn, [
+        {"type": engine.EXPENSE, "amount": 7, "event_date": date(2025, 4, 1), "category": None, "friend": ""},
+        {"type": engine.RECEIVABLE_CREATED, "amount": 40, "event_date": d, "friend": "Ravi", "currency": "INR"},
+        {"type": engine.PAYBACK_PAID, "amount": 30, "event_date": date(2025, 4, 2), "friend": "Asha",
+         "category": "Food", "currency": "EUR"},
+        {"type": engine.BUDGET_ADJUSTMENT, "amount": 500, "event_date": d},
+    ])
+    conn.commit()
+
+    assert verify(conn) == []
+    assert load_summary(conn, 1_000, 3, 2025) == engine.compute_summary(iter_ledger(conn), 1_000, 3, 2025)
+
+    conn.execute("UPDATE balance_categories SET spend = spend + 1 WHERE category = 'Food'")
+    conn.execute("UPDATE balance_friends SET balance = 0 WHERE friend = 'Asha'")
+    assert verify(conn) == [
+        "friends Asha: expected -300, stored 0",
+        "categories (2025, 3, 'Food'): expected 200, stored 201",
+    ]
@@ -0,0 +1,63 @@
+# test_batch_summary.py
+import csv
+import io
+import json
+import sqlite3
+from datetime import date
+
+import engine
+from batch_summary import find_ledgers, run_batch
+from db import append_events, connect
+from test_migrations import BASELINE_EVENTS
+
+EVENTS = [
+    {"type": engine.EXPENSE, "amount": 500, "event_date": date(2025, 1, 3), "category": "Food"},
+    {"type": engine.RECEIVABLE_CREATED, "amount": 300, "event_date": date(2025, 1, 4), "friend": "Asha"},
+    {"type": engine.LIABILITY_CREATED, "amount": 200, "event_date": date(2025, 2, 1), "friend": "Ravi"},
+]
+
+
+def test_good_legacy_and_corrupt_ledgers(tmp_path):
+    good = tmp_path / "a_good.db"
+    conn = connect(str(good))
+    append_events(conn, EVENTS)
+    conn.commit()
+    conn.close()
+
+    legacy = tmp_path / "b_legacy.db"
+    conn = sqlite3.connect(legacy)
+    conn.execute(BASELINE_EVENTS)
+    conn.executemany(
+        "INSERT INTO events (id, type, amount, category, friend, description, event_date) "
+        "VALUES (?, ?, ?, ?, ?, NULL, ?)",
+        [(str(i), e["type"], e["amount"], e.get("category"), e.get("friend"), e["event_date"].isoformat())
+         for i, e in enumerate(EVENTS)],
+    )
+    conn.commit()
+    conn.close()
+
+    (tmp_path / "c_corrupt.db").write_bytes(b"not a ledger" * 100)
+
+    ledgers = find_ledgers([str(tmp_path)])
+    assert [p.rsplit("/", 1)[-1] for p in ledgers] == ["a_good.db", "b_legacy.db", "c_corrupt.db"]
+
+    out = io.StringIO()
+    assert run_batch(ledgers, out, "jsonl", 10_000, 1, 2025, workers=2, chunksize=1) == 3
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    s = engine.compute_summary(EVENTS, 10_000, 1, 2025)
+    expected = {"events": 3, "budget": s.budget, "month_spend": s.month_spend,
+                "owed": s.outstanding_liabilities, "due": s.outstanding_receivables, "error": None}
+    for row in rows[:2]:
+        assert {k: row[k] for k in expected} == expected, row
+    assert rows[2]["error"] == "DatabaseError: file is not a database"
+    assert [r["ledger"] for r in rows] == ledgers
+
+    # Ledgers are read as they are, never migrated.
+    with sqlite3.connect(legacy) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+
+    out = io.StringIO()
+    run_batch(ledgers, out, "csv", 10_000, 1, 2025, workers=1)
+    assert [r["error"] for r in csv.DictReader(io.StringIO(out.getvalue()))] == \
+        ["", "", "DatabaseError: file is not a database"]
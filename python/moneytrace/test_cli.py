@@ -0,0 +1,29 @@
+# test_cli.py
+import subprocess
+import sys
+from pathlib import Path
+
+CLI = str(Path(__file__).with_name("cli.py"))
+
+# Modules one-shot add / summary have no use for; importing any of
+# them shows up straight away in cold start.
+HEAVY = {
+    "numpy", "columns", "vector_engine", "validation", "sql_engine",
+    "daemon", "asyncio", "batch_summary", "concurrent.futures", "multiprocessing",
+    "importer", "csv", "cProfile",
+}
+
+
+def _imported(cwd, *args) -> set[str]:
+    run = subprocess.run([sys.executable, "-X", "importtime", CLI, "--no-daemon", *args],
+                         cwd=cwd, capture_output=True, text=True, check=True)
+    return {line.rsplit("|", 1)[-1].strip() for line in run.stderr.splitlines()
+            if line.startswith("import time:")}
+
+
+def test_one_shot_commands_import_only_what_they_use(tmp_path):
+    added = _imported(tmp_path, "add", "--type", "expense", "--amount", "500", "--date", "2025-01-03")
+    summary = _imported(tmp_path, "summary", "--month", "1", "--year", "2025")
+
+    assert "engine" in summary and "db" in summary
+    assert not (added | summary) & HEAVY, (added | summary) & HEAVY
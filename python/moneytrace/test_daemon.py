@@ -0,0 +1,92 @@
+# test_daemon.py
+import os
+import signal
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import engine
+from daemon import DaemonClient, DaemonError
+from db import connect
+from snapshots import budget_for_month
+
+D = date(2025, 1, 10)
+
+# serve() stops on SIGTERM through loop signal handlers, which need a
+# main thread, so the daemon gets a process of its own.
+SERVE = """
+import asyncio, sys
+import daemon
+asyncio.run(daemon.serve(sys.argv[1], sys.argv[2], ready=lambda: print("ready", flush=True)))
+"""
+
+
+def _event(etype, amount, friend=None):
+    return {"type": etype, "amount": amount, "friend": friend, "category": "Food", "event_date": D}
+
+
+def _wire(e):
+    return {**e, "event_date": e["event_date"].isoformat()}
+
+
+def test_daemon_replies(tmp_path):
+    db_path = str(tmp_path / "ledger.db")
+    sock = str(tmp_path / "d.sock")
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SERVE, db_path, sock],
+        cwd=Path(__file__).parent, stdout=subprocess.PIPE, text=True)
+    try:
+        assert proc.stdout.readline() == "ready\n"
+
+        added = _event(engine.EXPENSE, 500)
+        many = [_event(engine.RECEIVABLE_CREATED, 300, "C"), _event(engine.EXPENSE, 100)]
+        split = engine.plan_split(900, ["A", "B"], category="Food", event_date=D)
+        expected = engine.compute_summary([added, *many, *split], 10_000, 1, 2025)
+
+        with DaemonClient(sock, timeout=10) as client:
+            assert client.call("ping") == "pong"
+            assert isinstance(client.call("add", event=_wire(added)), str)
+            assert len(client.call("add_many", events=[_wire(e) for e in many])) == 2
+            assert len(client.call(
+                "split", total=900, friends=["A", "B"], category="Food", event_date=D.isoformat())) == 3
+
+            s = client.call("summary", base=10_000, month=1, year=2025)
+            assert s["budget"] == expected.budget
+            assert s["month_spend"] == expected.month_spend
+            assert s["outstanding_receivables"] == expected.outstanding_receivables
+            assert s["category_spend"] == expected.category_spend
+            assert s["month_budget"] == budget_for_month(connect(db_path), 10_000, 1, 2025)
+            assert client.call("friends") == expected.friend_balances
+            assert client.call("friend", name="A") == 300
+
+            for op, params, error in (
+                    ("nope", {}, "ValueError: Unknown op: nope"),
+                    ("add", {"event": {**_wire(added), "currency": "XXX"}}, "ValueError: Unknown currency: XXX"),
+                    ("add", {"event": {"amount": 1}}, "KeyError: 'type'"),
+                    ("split", {"total": 10, "friends": ["A", "A"]}, "ValueError: Split friends must be distinct names"),
+            ):
+                try:
+                    client.call(op, **params)
+                except DaemonError as e:
+                    assert str(e) == error
+                else:
+                    raise AssertionError(f"{op} {params} accepted")
+
+            # Rejected requests leave the ledger and the connection as they were.
+            assert client.call("summary", base=10_000)["budget"] == expected.budget
+
+        # The CLI reports them on one line instead of a traceback.
+        for command in (["add", "--type", "expense", "--amount", "5", "--date", "nope"],
+                        ["split", "10", "--friends", "A", "--date", "nope"]):
+            run = subprocess.run(
+                [sys.executable, "cli.py", "--socket", sock, *command],
+                cwd=Path(__file__).parent, capture_output=True, text=True)
+            assert run.returncode == 1
+            assert run.stderr.startswith("✗ ValueError: Invalid isoformat string"), run.stderr
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+        proc.stdout.close()
+
+    assert not os.path.exists(sock)
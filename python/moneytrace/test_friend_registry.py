@@ -0,0 +1,53 @@
+# test_friend_registry.py
+from datetime import date
+
+import engine
+from db import ConnectionPool, append_event, connect
+from friend_registry import FriendRegistry
+
+
+def _friend_ids(conn):
+    return dict(conn.execute("SELECT name, id FROM friends").fetchall())
+
+
+def test_lru_and_batch_resolve_match_the_table(tmp_path):
+    conn = connect(str(tmp_path / "ledger.db"))
+    registry = FriendRegistry(conn, maxsize=2)
+
+    a = registry.get_or_create("A")
+    b = registry.get_or_create("B")
+    assert registry.get_or_create("A") == a
+    registry.get_or_create("C")
+    # B was least recently used; A stayed cached.
+    assert list(registry._cache) == [("A", None), ("C", None)]
+
+    # Evicted names come back from the table, not as new rows.
+    assert registry.get_or_create("B") == b
+    assert FriendRegistry(conn).get_or_create("A") == a
+
+    resolved = FriendRegistry(conn).resolve_friends(["B", "D", "", None, "D", "A"])
+    ids = _friend_ids(conn)
+    assert len(ids) == 4
+    assert resolved == {name: ids[name] for name in ("B", "D", "A")}
+    assert registry.resolve_friends(["D"]) == {"D": ids["D"]}
+
+    # A phone-less friend matches any phone; a friend with a phone does not.
+    assert registry.get_or_create("A", "555") == a
+    e = FriendRegistry(conn).get_or_create("E", "555")
+    assert FriendRegistry(conn).resolve_friends(["E"])["E"] != e
+
+
+def test_pool_rollback_forgets_new_friends(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "ledger.db"), size=1)
+    event = {"type": engine.LIABILITY_CREATED, "amount": 100, "event_date": date(2025, 1, 2), "friend": "Asha"}
+
+    with pool.connection() as conn:
+        append_event(conn, event)
+    with pool.connection() as conn:
+        append_event(conn, event)
+        conn.commit()
+        rows = conn.execute("""
+        SELECT f.name FROM events e LEFT JOIN friends f ON f.id = e.friend_id
+        """).fetchall()
+    pool.close()
+    assert rows == [("Asha",)]
@@ -0,0 +1,109 @@
+# test_fx.py
+import random
+from datetime import date, timedelta
+from fractions import Fraction
+
+import engine
+import fx
+import vector_engine
+from columns import EventColumns
+from db import append_events, init_db
+from test_sql_engine import random_ledger
+
+START = date(2024, 1, 1)
+
+
+def rate_table(rng: random.Random) -> fx.FxTable:
+    table = fx.FxTable()
+    for code, base in (("USD", 83), ("EUR", 90), ("JPY", Fraction(55, 100))):
+        for day in range(0, 400, rng.randint(1, 40)):
+            table.set_rate(code, START + timedelta(days=day),
+                           base * Fraction(rng.randint(900, 1100), 1000))
+    return table
+
+
+def exact_summary(events, table, currency, month, year) -> engine.LedgerSummary:
+    """
+    Per-event Fraction conversion, each total rounded once.
+    """
+    budget = month_spend = liabilities = receivables = 0
+    friends, categories = {}, {}
+    for e in events:
+        day = e["event_date"].toordinal()
+        code = engine.EVENT_CODES[e["type"]]
+        amount = e["amount"] * (
+            table.rate(e["currency"], day) / table.rate(currency, day)
+            * fx._minor_unit(currency) / fx._minor_unit(e["currency"]))
+
+        budget += engine.BUDGET_SIGN[code] * amount
+        liabilities += engine.LIABILITY_SIGN[code] * amount
+        receivables += engine.RECEIVABLE_SIGN[code] * amount
+        if e["friend"] and engine.FRIEND_SIGN[code]:
+            friends[e["friend"]] = friends.get(e["friend"], 0) + engine.FRIEND_SIGN[code] * amount
+        if (e["event_date"].month, e["event_date"].year) == (month, year):
+            month_spend += engine.CASH_OUT[code] * amount
+            if code == engine.EventCode.EXPENSE:
+                categories[e["category"]] = categories.get(e["category"], 0) + amount
+
+    return engine.LedgerSummary(
+        round(budget), round(month_spend), round(liabilities), round(receivables),
+        {k: round(v) for k, v in friends.items()},
+        {k: round(v) for k, v in categories.items()},
+    )
+
+
+def test_conversion_matches_exact_arithmetic():
+    rng = random.Random(5)
+    table = rate_table(rng)
+
+    for _ in range(20):
+        events = random_ledger(rng, rng.randint(0, 300))
+        for e in events:
+            e["event_date"] = START + timedelta(days=40 + rng.randrange(300))
+            e["currency"] = rng.choice(["INR", "INR", "USD", "EUR", "JPY"])
+        batch = EventColumns.from_events(events)
+
+        for currency in ("INR", "USD", "JPY"):
+            expected = exact_summary(events, table, currency, 6, 2024)
+            assert engine.compute_summary(events, 0, 6, 2024, currency, table) == expected
+            assert engine.compute_summary(batch, 0, 6, 2024, currency, table) == expected
+            assert vector_engine.compute_summary(batch, 0, 6, 2024, currency, table) == expected
+
+        # Without rates each currency is totalled on its own.
+        by_currency = engine.compute_summary_by_currency(events, 0, 6, 2024)
+        for currency, s in by_currency.items():
+            alone = [e for e in events if e["currency"] == currency]
+            assert engine.compute_summary(alone, 0, 6, 2024, currency) == s
+            assert engine.compute_summary(events, 0, 6, 2024, currency) == s
+            assert vector_engine.compute_summary(batch, 0, 6, 2024, currency) == s
+
+
+def test_foreign_events_stay_out_of_home_aggregates():
+    conn = init_db(":memory:")
+    assert not fx.has_foreign(conn)
+
+    d = date(2024, 6, 1)
+    append_events(conn, [
+        {"type": "liability_created", "amount": 1000, "friend": "A", "event_date": d},
+        {"type": "liability_created", "amount": 50, "friend": "A", "event_date": d, "currency": "USD"},
+        {"type": "payback_paid", "amount": 20, "friend": "A", "event_date": d, "currency": "USD"},
+    ])
+    fx.set_rate(conn, "USD", date(2024, 1, 1), "80")
+    conn.commit()
+
+    assert fx.has_foreign(conn)
+    assert conn.execute("SELECT SUM(remaining) FROM open_items").fetchone()[0] == 1000
+    assert conn.execute("SELECT balance FROM balance_friends").fetchone()[0] == -1000
+
+    s = fx.summarize(conn)
+    assert s.liabilities == 1000 + 30 * 80
+    assert s.friend_balances == {"A": -(1000 + 30 * 80)}
+
+    # A currency with no rates at all cannot be converted.
+    append_events(conn, [{"type": "expense", "amount": 5, "event_date": d, "currency": "GBP"}])
+    try:
+        fx.summarize(conn)
+    except fx.MissingRate:
+        pass
+    else:
+        raise AssertionError("converted without a rate")
@@ -0,0 +1,54 @@
+# test_importer.py
+from db import init_db
+from importer import import_events
+from validation import ValidationError
+
+
+def _import(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    conn = init_db(":memory:")
+    return conn, lambda: import_events(conn, str(path))
+
+
+def test_amounts_are_never_rounded(tmp_path):
+    conn, run = _import(tmp_path, "ok.csv", "type,amount,date\nexpense, 1200 ,2025-01-02\n")
+    run()
+    assert conn.execute("SELECT amount, typeof(amount) FROM events").fetchall() == [(1200, "integer")]
+
+    for name, text in [
+        ("float.jsonl", '{"type": "expense", "amount": 12.7, "date": "2025-01-02"}\n'),
+        ("bool.jsonl", '{"type": "expense", "amount": true, "date": "2025-01-02"}\n'),
+        ("decimal.csv", "type,amount,date\nexpense,12.50,2025-01-02\n"),
+    ]:
+        conn, run = _import(tmp_path, name, text)
+        try:
+            run()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{name} imported")
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+
+
+def test_bad_rows_are_reported_by_file_row(tmp_path):
+    lines = [
+        '{"type": "expense", "amount": 100, "date": "2025-01-02"}',
+        '{"type": "expense", "amount": 1.5, "date": "2025-01-02"}',
+        "",
+        '{"amount": 5}',
+        '{"type": "expense", "amount": -5, "date": "2025-01-02"}',
+        '{"type": "expense", "amount": 5, "date": "someday"}',
+        "not json",
+    ]
+    conn, run = _import(tmp_path, "bad.jsonl", "\n".join(lines) + "\n")
+    try:
+        run()
+    except ValidationError as e:
+        # Data rows: the blank line is not counted.
+        assert e.rows == [1, 2, 3, 4, 5]
+        assert e.errors[1] == (2, "Missing field: type")
+        assert e.errors[2] == (3, "Amount must be positive minor units")
+    else:
+        raise AssertionError("bad rows imported")
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
@@ -0,0 +1,44 @@
+# test_instrument.py
+import pstats
+import subprocess
+import sys
+from pathlib import Path
+
+import instrument
+
+CLI = str(Path(__file__).with_name("cli.py"))
+
+
+def test_profile_nests_phases_and_counts():
+    assert instrument.phase("x") is instrument.phase("y")
+    assert instrument.counted("x", [1]) == [1]
+
+    with instrument.profiling() as profile:
+        with instrument.phase("outer"):
+            with instrument.phase("inner"):
+                instrument.count("rows", 3)
+            list(instrument.counted("rows", range(2)))
+    assert not instrument.enabled
+
+    assert profile.phases.keys() == {"outer", "outer/inner"}
+    assert profile.counters == {"rows": 5}
+    report = profile.report()
+    assert report[1].startswith("outer") and report[2].startswith("  inner")
+
+
+def test_cli_profile_output(tmp_path):
+    def cli(*args):
+        return subprocess.run([sys.executable, CLI, *args], cwd=tmp_path,
+                              capture_output=True, text=True, check=True)
+
+    cli("--no-daemon", "add", "--type", "expense", "--amount", "500", "--date", "2025-01-03")
+
+    run = cli("--profile", "summary", "--month", "1", "--year", "2025", "--rescan")
+    assert "Month spend     : ₹5.00" in run.stdout
+    phases = [line.split()[0] for line in run.stderr.splitlines() if line.strip()]
+    for name in ("phase", "summary.month_budget", "summary.totals", "engine.fold", "engine.events"):
+        assert name in phases, run.stderr
+
+    run = cli("--profile-out", "stats.out", "summary", "--month", "1", "--year", "2025")
+    assert "cProfile stats written to stats.out" in run.stderr
+    assert pstats.Stats(str(tmp_path / "stats.out")).total_calls > 0
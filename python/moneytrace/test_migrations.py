@@ -0,0 +1,99 @@
+# test_migrations.py
+import shutil
+import sqlite3
+from pathlib import Path
+
+import engine
+from balances import load_summary
+from db import connect, iter_events
+import migrations
+from migrations import LATEST
+from open_items import open_items
+
+# The events table as the first released schema created it.
+BASELINE_EVENTS = """
+CREATE TABLE events (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    category TEXT,
+    friend TEXT,
+    description TEXT,
+    event_date TEXT NOT NULL
+)
+"""
+
+
+def test_baseline_ledger_with_rows_migrates(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_EVENTS)
+    conn.executemany(
+        "INSERT INTO events (id, type, amount, category, friend, description, event_date) "
+        "VALUES (?, ?, ?, ?, ?, NULL, ?)",
+        [
+            ("1", engine.EXPENSE, 500, "Food", None, "2025-01-03"),
+            ("2", engine.RECEIVABLE_CREATED, 300, None, "Asha", "2025-01-04"),
+            ("3", engine.PAYBACK_RECEIVED, 100, None, "Asha", "2025-02-01"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    conn = connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == LATEST
+
+    expected = engine.compute_summary(iter_events(conn))
+    assert expected.receivables == 200
+    assert load_summary(conn) == expected
+    assert [i.remaining for i in open_items(conn)] == [200]
+
+    # The checked-in sample ledger predates every migration.
+    sample = str(tmp_path / "sample.db")
+    shutil.copy(Path(__file__).with_name("moneytrace.db"), sample)
+    conn = connect(sample)
+    assert load_summary(conn) == engine.compute_summary(iter_events(conn))
+
+
+def test_friend_backfill_resumes_after_an_interrupted_chunk(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_EVENTS)
+    friends = [None, "Asha", "Ravi", "", "Asha", "Meera"]
+    conn.executemany(
+        "INSERT INTO events (id, type, amount, category, friend, description, event_date) "
+        "VALUES (?, ?, 100, NULL, ?, NULL, '2025-01-03')",
+        [(str(i), engine.LIABILITY_CREATED, friends[i % len(friends)]) for i in range(23)],
+    )
+    conn.commit()
+    monkeypatch.setattr(migrations, "MIGRATION_CHUNK_SIZE", 4)
+
+    class Interrupted(Exception):
+        pass
+
+    def stop_after_two_chunks(message):
+        if message.startswith("  8/23 rows scanned"):
+            raise Interrupted
+
+    try:
+        migrations.migrate(conn, stop_after_two_chunks)
+    except Interrupted:
+        pass
+    else:
+        raise AssertionError("migration not interrupted")
+
+    # Finished chunks stay committed; v3 itself is not recorded.
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+    filled = [r for r, in conn.execute("SELECT rowid FROM events WHERE friend_id IS NOT NULL")]
+    assert len(filled) == 5 and max(filled) <= 8
+
+    messages = []
+    migrations.migrate(conn, messages.append)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == LATEST
+    assert "  23/23 rows scanned, 10 backfilled" in messages
+
+    rows = conn.execute("""
+    SELECT e.friend, f.name FROM events e LEFT JOIN friends f ON f.id = e.friend_id
+    """).fetchall()
+    assert all(name == (friend or None) for friend, name in rows)
+    assert conn.execute("SELECT COUNT(*) FROM friends").fetchone()[0] == 3
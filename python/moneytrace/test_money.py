@@ -0,0 +1,49 @@
+# test_money.py
+import pickle
+from array import array
+
+from currency import INR, USD, Currency
+from money import Money, MoneyBatch, MoneyTotals
+
+
+def test_interned_currencies_and_int_backed_totals():
+    assert Currency("USD", "$", 100, "United States Dollar") is USD
+    assert pickle.loads(pickle.dumps(USD)) is USD
+    try:
+        Currency("USD", "US$", 100, "United States Dollar")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("conflicting re-registration accepted")
+
+    assert Money(500) + Money(250) - Money(100) == Money(650, INR)
+    try:
+        Money(1) + Money(1, USD)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("currency mismatch accepted")
+
+    values = [Money(i, USD) for i in range(100)]
+    assert Money.sum(values) == Money(4950, USD)
+    assert Money.sum([]) == Money(0, INR)
+    try:
+        Money.sum([Money(1), Money(1, USD)])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("mixed currencies summed")
+
+    totals = MoneyTotals()
+    totals.update(values + [Money(7)])
+    totals.add(3)
+    totals.add_batch(MoneyBatch([1, 2, 3], USD))
+    assert totals[USD] == Money(4956, USD)
+    assert totals[INR] == Money(10)
+    assert len(totals) == 2
+
+    amounts = array("q", [5, -2, 9])
+    batch = MoneyBatch(amounts, USD)
+    assert batch.amounts is amounts
+    assert batch.total() == Money(12, USD)
+    assert list(batch) == [Money(5, USD), Money(-2, USD), Money(9, USD)]
@@ -1,6 +1,12 @@
 # test_month_rollover.py
 from datetime import date
-from engine import compute_available_budget
+from engine import (
+    MonthSnapshot,
+    compute_available_budget,
+    compute_budget_for_month,
+    events_for_budget_month,
+    roll_forward,
+)
 
 BASE_BUDGET = 1_000_000  # ₹10,000
 
@@ -22,16 +28,6 @@ events = [
     },
 ]
 
-def events_for_budget_month(events, month, year):
-    filtered = []
-    for e in events:
-        if e["type"] == "liability_created":
-            filtered.append(e)
-        elif e["event_date"].month == month and e["event_date"].year == year:
-            filtered.append(e)
-    return filtered
-
-
 # January
 jan_events = events_for_budget_month(events, 1, 2026)
 jan_budget = compute_available_budget(BASE_BUDGET, jan_events)
@@ -43,4 +39,19 @@ feb_budget = compute_available_budget(BASE_BUDGET, feb_events)
 assert jan_budget == 500_000   # 10000 - 4000 - 1000
 assert feb_budget == 700_000   # 10000 - 2000 - 1000
 
+# Snapshot path: previous month's snapshot + only this month's events
+def month_events(month, year):
+    return [
+        e for e in events
+        if e["event_date"].month == month and e["event_date"].year == year
+    ]
+
+
+dec_snapshot = MonthSnapshot()
+jan_snapshot = roll_forward(dec_snapshot, month_events(1, 2026))
+
+assert compute_budget_for_month(BASE_BUDGET, dec_snapshot, month_events(1, 2026)) == jan_budget
+assert compute_budget_for_month(BASE_BUDGET, jan_snapshot, month_events(2, 2026)) == feb_budget
+assert jan_snapshot.liabilities_created == 100_000
+
 print("✓ Month rollover logic works correctly")
@@ -0,0 +1,50 @@
+# test_open_items.py
+import random
+
+import engine
+import open_items
+from db import append_event, init_db
+from test_sql_engine import random_ledger
+
+
+def test_open_items_match_engine_and_replay():
+    rng = random.Random(99)
+
+    for _ in range(20):
+        conn = init_db(":memory:")
+        events = random_ledger(rng, rng.randint(0, 300))
+
+        for e in events:
+            # Link some paybacks to an item of the right kind and friend.
+            kind = open_items.SETTLES.get(e["type"])
+            if kind and rng.random() < 0.3:
+                row = conn.execute(
+                    "SELECT id FROM open_items WHERE kind = ? AND friend = ? ORDER BY random() LIMIT 1",
+                    (kind, e["friend"] or "")).fetchone()
+                if row:
+                    e = {**e, "settles": row[0]}
+            append_event(conn, e)
+        conn.commit()
+
+        s = engine.compute_summary(events)
+        for kind, expected in ((engine.LIABILITY_CREATED, s.liabilities),
+                               (engine.RECEIVABLE_CREATED, s.receivables)):
+            remaining = conn.execute(
+                "SELECT IFNULL(SUM(remaining), 0) FROM open_items WHERE kind = ?", (kind,)).fetchone()[0]
+            credit = conn.execute(
+                "SELECT IFNULL(SUM(amount), 0) FROM open_credits WHERE kind = ?", (kind,)).fetchone()[0]
+            assert remaining - credit == expected
+
+        net = {}
+        for sign, table, column in ((1, "open_items", "remaining"), (-1, "open_credits", "amount")):
+            for kind, friend, amount in conn.execute(
+                    f"SELECT kind, friend, SUM({column}) FROM {table} GROUP BY kind, friend"):
+                if friend:
+                    side = 1 if kind == engine.RECEIVABLE_CREATED else -1
+                    net[friend] = net.get(friend, 0) + sign * side * amount
+        assert {f: b for f, b in net.items() if b} == \
+            {f: b for f, b in s.friend_balances.items() if b}
+
+        assert open_items.verify(conn) == []
+        assert sum(i.remaining for i in open_items.open_items(conn)) == \
+            sum(r["open"] for r in open_items.aging(conn))
@@ -0,0 +1,94 @@
+# test_query_plan.py
+"""
+EXPLAIN QUERY PLAN regression checks.
+
+The plans are taken from the statements the code actually runs
+(captured with a trace callback), not from copies of their SQL.
+Date-bounded and friend_id lookups must SEARCH an index; any
+"SCAN events", even one over an index, means a schema or query
+change brought back full scans.
+"""
+from contextlib import contextmanager
+
+import migrations
+import sql_engine
+from db import init_db, iter_events
+
+
+@contextmanager
+def query_plans(conn):
+    """
+    Collects {sql: plan details} for every SELECT / UPDATE conn runs
+    in the block. EXPLAIN runs as each statement starts, so temp
+    tables it reads still exist.
+    """
+    plans = {}
+
+    def explain(sql):
+        if sql.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            plans[sql] = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+    conn.set_trace_callback(explain)
+    try:
+        yield plans
+    finally:
+        conn.set_trace_callback(None)
+
+
+def event_steps(plans):
+    steps = [d for details in plans.values() for d in details
+             if d.startswith(("SCAN events", "SEARCH events"))]
+    assert steps, f"no query read events: {plans}"
+    return steps
+
+
+def assert_searches_events(plans):
+    for step in event_steps(plans):
+        assert step.startswith("SEARCH events USING"), f"full scan: {step}"
+
+
+def test_month_spend_uses_date_index():
+    conn = init_db(":memory:")
+    with query_plans(conn) as plans:
+        sql_engine.compute_monthly_spend(conn, 1, 2026)
+    assert_searches_events(plans)
+
+
+def test_month_category_spend_uses_index():
+    conn = init_db(":memory:")
+    with query_plans(conn) as plans:
+        sql_engine.compute_category_spend(conn, 1, 2026)
+    assert_searches_events(plans)
+
+
+def test_date_bounded_streams_use_index():
+    conn = init_db(":memory:")
+    start, end = sql_engine.month_bounds(1, 2026)
+    for ordered in (False, True):
+        with query_plans(conn) as plans:
+            list(iter_events(conn, ordered=ordered, start=start, end=end))
+        assert_searches_events(plans)
+
+
+def test_friend_id_lookup_uses_index():
+    # Remapping duplicate friends is the lookup of events by friend_id.
+    conn = init_db(":memory:")
+    with query_plans(conn) as plans:
+        migrations._v2_unique_friends(conn, None)
+    assert_searches_events(plans)
+
+
+def test_friend_balances_read_only_the_index():
+    # A ledger-wide aggregate: every row is read, but from the index.
+    conn = init_db(":memory:")
+    with query_plans(conn) as plans:
+        sql_engine.compute_friend_balances(conn)
+    for step in event_steps(plans):
+        assert "COVERING INDEX" in step, step
+
+
+def test_schema_version_recorded():
+    from migrations import LATEST
+
+    conn = init_db(":memory:")
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == LATEST
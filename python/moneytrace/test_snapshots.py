@@ -0,0 +1,61 @@
+# test_snapshots.py
+from datetime import date
+
+import engine
+from db import append_event, append_events, connect
+from snapshots import budget_for_month, to_ym
+
+Y = date.today().year - 2
+
+
+def _event(etype, amount, d, friend=None):
+    return {"type": etype, "amount": amount, "event_date": d, "friend": friend, "category": "Food"}
+
+
+def _expected(events, month, year):
+    return engine.compute_available_budget(10_000, engine.events_for_budget_month(events, month, year))
+
+
+def _snapshot_months(conn):
+    return [ym for ym, in conn.execute("SELECT ym FROM month_snapshots ORDER BY ym")]
+
+
+def test_back_dated_insert_invalidates_later_snapshots(tmp_path):
+    conn = connect(str(tmp_path / "ledger.db"))
+    events = [
+        _event(engine.LIABILITY_CREATED, 900, date(Y, 1, 5), "Asha"),
+        _event(engine.EXPENSE, 100, date(Y, 2, 3)),
+        _event(engine.RECEIVABLE_CREATED, 400, date(Y, 4, 9), "Ravi"),
+        _event(engine.PAYBACK_PAID, 300, date(Y, 6, 15), "Asha"),
+        _event(engine.EXPENSE, 50, date(Y, 7, 5)),
+    ]
+    append_events(conn, events)
+    conn.commit()
+
+    assert budget_for_month(conn, 10_000, 7, Y) == _expected(events, 7, Y)
+    assert _snapshot_months(conn) == [to_ym(Y, m) for m in range(1, 7)]
+
+    late = _event(engine.LIABILITY_CREATED, 250, date(Y, 3, 20), "Ravi")
+    append_event(conn, late)
+    conn.commit()
+    events.append(late)
+    assert _snapshot_months(conn) == [to_ym(Y, 1), to_ym(Y, 2)]
+    for month in range(1, 8):
+        assert budget_for_month(conn, 10_000, month, Y) == _expected(events, month, Y)
+
+
+def test_snapshots_do_not_commit_the_callers_transaction(tmp_path):
+    conn = connect(str(tmp_path / "ledger.db"))
+    append_event(conn, _event(engine.LIABILITY_CREATED, 900, date(Y, 1, 5), "Asha"))
+    conn.commit()
+
+    # Snapshots written mid-transaction go with it.
+    append_event(conn, _event(engine.LIABILITY_CREATED, 100, date(Y, 2, 1), "Ravi"))
+    assert budget_for_month(conn, 10_000, 4, Y) == 9_000
+    conn.rollback()
+    assert _snapshot_months(conn) == []
+    assert budget_for_month(conn, 10_000, 4, Y) == 9_100
+
+    # Outside one they are committed on their own.
+    assert not conn.in_transaction
+    assert _snapshot_months(connect(str(tmp_path / "ledger.db"))) == [to_ym(Y, m) for m in range(1, 4)]
@@ -0,0 +1,59 @@
+# test_splits.py
+import random
+
+import db
+import engine
+from balances import load_summary
+from db import add_split, init_db
+
+
+def test_splits_sum_to_total_and_roll_back_whole(monkeypatch):
+    rng = random.Random(7)
+
+    for _ in range(500):
+        total = rng.randint(0, 100_000)
+        weights = [rng.randint(0, 5) for _ in range(rng.randint(1, 6))]
+        if not sum(weights):
+            weights[0] = 1
+        shares = engine.split_amount(total, weights)
+        assert sum(shares) == total
+        assert all(s >= 0 for s in shares)
+        assert all(s == 0 for s, w in zip(shares, weights) if w == 0)
+
+    # Self pays: receivables are everyone else's share.
+    s = engine.compute_summary(engine.plan_split(1000, ["A", "B"]))
+    assert s.receivables == 666
+    assert s.friend_balances == {"A": 333, "B": 333}
+
+    # A friend pays: one liability for self's share, which keeps the remainder.
+    events = engine.plan_split(1000, ["A", "B"], payer="A")
+    assert [(e["type"], e["friend"], e["amount"]) for e in events] == [
+        (engine.LIABILITY_CREATED, "A", 334)]
+
+    conn = init_db(":memory:")
+    add_split(conn, 900, ["A", "B"], category="Food")
+    try:
+        add_split(conn, 100, ["A"], exact=[10, 20])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("bad exact shares accepted")
+
+    # Fail inside append_events, after the rows are inserted.
+    before = load_summary(conn)
+
+    def fail(*args):
+        raise RuntimeError("open items failed")
+
+    monkeypatch.setattr(db, "apply_open_items", fail)
+    try:
+        add_split(conn, 300, ["A", "C"])
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("failure swallowed")
+
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM friends WHERE name = 'C'").fetchone()[0] == 0
+    assert conn.execute("SELECT SUM(remaining) FROM open_items").fetchone()[0] == 600
+    assert load_summary(conn) == before
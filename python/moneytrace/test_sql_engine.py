@@ -0,0 +1,86 @@
+# test_sql_engine.py
+import random
+from datetime import date
+
+import engine
+import sql_engine
+from db import init_db
+
+CURRENCIES = [engine.HOME_CURRENCY, engine.HOME_CURRENCY, "USD"]
+
+TYPES = [
+    engine.EXPENSE,
+    engine.LIABILITY_CREATED,
+    engine.RECEIVABLE_CREATED,
+    engine.PAYBACK_PAID,
+    engine.PAYBACK_RECEIVED,
+    engine.BUDGET_ADJUSTMENT,
+]
+
+
+def random_ledger(rng: random.Random, n: int) -> list[dict]:
+    return [
+        {
+            "type": rng.choice(TYPES),
+            "amount": rng.randint(0, 500_000),
+            "category": rng.choice([None, "Eating Out", "Travel", "Rent"]),
+            "friend": rng.choice([None, "", "Sugam", "Shrey", "Dheeraj"]),
+            "description": None,
+            "event_date": date(rng.choice([2025, 2026]), rng.randint(1, 12), rng.randint(1, 28)),
+            "currency": rng.choice(CURRENCIES),
+        }
+        for _ in range(n)
+    ]
+
+
+def load(events: list[dict]):
+    conn = init_db(":memory:")
+    conn.executemany("""
+    INSERT INTO events (id, type, amount, category, friend, description, event_date, currency)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (str(i), e["type"], e["amount"], e["category"], e["friend"],
+         e["description"], e["event_date"].isoformat(), e["currency"])
+        for i, e in enumerate(events)
+    ])
+    return conn
+
+
+def test_sql_backend_matches_pure_engine():
+    rng = random.Random(1234)
+
+    for _ in range(50):
+        events = random_ledger(rng, rng.randint(0, 300))
+        conn = load(events)
+        month, year = rng.randint(1, 12), rng.choice([2025, 2026])
+
+        assert sql_engine.compute_available_budget(conn, 1_000_000) == \
+            engine.compute_available_budget(1_000_000, events)
+        assert sql_engine.compute_monthly_spend(conn, month, year) == \
+            engine.compute_monthly_spend(events, month, year)
+        assert sql_engine.compute_outstanding_liabilities(conn) == \
+            engine.compute_outstanding_liabilities(events)
+        assert sql_engine.compute_outstanding_receivables(conn) == \
+            engine.compute_outstanding_receivables(events)
+        assert sql_engine.compute_friend_balances(conn) == \
+            engine.compute_friend_balances(events)
+        assert sql_engine.compute_category_spend(conn, month, year) == \
+            engine.compute_category_spend(events, month, year)
+        assert sql_engine.compute_category_spend(conn) == \
+            engine.compute_category_spend(events)
+        assert sql_engine.compute_summary(conn, 1_000_000, month, year) == \
+            engine.compute_summary(events, 1_000_000, month, year)
+        assert sql_engine.compute_summary(conn, 0, month, year, "USD") == \
+            engine.compute_summary(events, 0, month, year, "USD")
+
+        # Dicts and LedgerEvent records take different folds.
+        records = list(engine.as_records(events))
+        assert engine.compute_summary(records, 1_000_000, month, year) == \
+            engine.compute_summary(events, 1_000_000, month, year)
+        assert engine.compute_summary_by_currency(records, 0, month, year) == \
+            engine.compute_summary_by_currency(events, 0, month, year)
+
+
+if __name__ == "__main__":
+    test_sql_backend_matches_pure_engine()
+    print("✓ SQL backend matches the pure engine")
@@ -0,0 +1,56 @@
+# test_summary_cache.py
+from datetime import date
+
+import engine
+from balances import load_summary, rebuild
+from db import connect, insert_event
+from event_log import ledger_version
+from summary_cache import SummaryCache
+
+
+def _expense(amount, d, friend=None):
+    return {"type": engine.EXPENSE, "amount": amount, "event_date": d, "friend": friend, "category": "Food"}
+
+
+def test_cache_follows_every_write(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    conn = connect(path)
+    other = connect(path)
+    cache = SummaryCache(conn)
+
+    insert_event(conn, _expense(100, date(2025, 1, 5)))
+    insert_event(conn, _expense(200, date(2025, 2, 5)))
+    assert cache.summary(1_000, 1, 2025).month_spend == 100
+    assert cache.summary(1_000, 2, 2025).budget == 700
+
+    # A local insert drops the month it touches and patches the
+    # ledger-wide totals, so an unrelated month stays a hit.
+    e = {"type": engine.LIABILITY_CREATED, "amount": 50, "event_date": date(2025, 2, 9), "friend": "Asha"}
+    insert_event(conn, e)
+    cache.note_insert(e)
+    hits = cache.hits
+    s = cache.summary(1_000, 1, 2025)
+    assert (s.month_spend, s.budget, s.liabilities, s.friend_balances) == (100, 650, 50, {"Asha": -50})
+    assert s == load_summary(conn, 1_000, 1, 2025)
+    assert cache.hits == hits + 2
+    assert cache.summary(1_000, 2, 2025).month_spend == 200
+    assert cache.summary(1_000, 2, 2025) == load_summary(conn, 1_000, 2, 2025)
+
+    # Writes from another connection clear it, even when a local
+    # insert is noted after them.
+    insert_event(other, _expense(25, date(2025, 1, 6)))
+    e = _expense(10, date(2025, 2, 10))
+    insert_event(conn, e)
+    cache.note_insert(e)
+    assert cache.summary(1_000, 1, 2025).month_spend == 125
+    assert cache.summary(1_000, 1, 2025) == load_summary(conn, 1_000, 1, 2025)
+
+    # So does a rebuild (verify --fix), which leaves the events as they are.
+    other.execute("UPDATE balance_months SET spend = 0")
+    other.commit()
+    cache = SummaryCache(conn)
+    assert cache.summary(1_000, 1, 2025).month_spend == 0
+    version = ledger_version(conn)
+    rebuild(other)
+    assert ledger_version(conn) == version + 1
+    assert cache.summary(1_000, 1, 2025).month_spend == 125
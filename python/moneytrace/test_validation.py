@@ -0,0 +1,66 @@
+# test_validation.py
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import engine
+import vector_engine
+from columns import EventColumns
+from validation import ValidationError, validate_columns, validate_events
+
+D = date(2025, 1, 2)
+
+
+def test_every_bad_row_is_reported_on_each_path():
+    events = [
+        {"type": "expense", "amount": 100, "event_date": D},
+        {"type": "expense", "amount": -5, "event_date": D},
+        {"type": "nope", "amount": 5, "event_date": D},
+        {"type": "expense", "amount": 5.0, "event_date": D},
+        {"type": "expense", "amount": True, "event_date": D},
+        {"type": "expense", "amount": 5, "currency": "XXX", "event_date": D},
+    ]
+
+    for check in (
+        lambda: validate_events(events),
+        lambda: engine.validate_invariants(events),
+        lambda: engine.compute_summary(events, validate=True),
+    ):
+        try:
+            check()
+        except ValidationError as e:
+            assert e.rows == [1, 2, 3, 4, 5]
+            assert isinstance(e, AssertionError)
+        else:
+            raise AssertionError("bad rows accepted")
+
+    try:
+        validate_events(events[1:2], offset=50_000)
+    except ValidationError as e:
+        assert e.errors == [(50_000, "Amount must be positive minor units")]
+    else:
+        raise AssertionError("bad row accepted")
+
+    good = events[:1]
+    assert engine.compute_summary(good, validate=True) == engine.compute_summary(good)
+
+    batch = EventColumns.from_events(good)
+    batch.append(engine.LedgerEvent(0, -3, D.toordinal(), "Food", None, "INR"))
+    batch.append(engine.LedgerEvent(0, 3, D.toordinal(), "Food", None, "ZZZ"))
+    for check in (
+        lambda: validate_columns(batch),
+        lambda: vector_engine.compute_summary(batch, validate=True),
+    ):
+        try:
+            check()
+        except ValidationError as e:
+            assert e.errors == [(1, "Amount must be positive minor units"), (2, "Unknown currency: ZZZ")]
+        else:
+            raise AssertionError("bad rows accepted")
+
+
+def test_engine_validates_as_a_package_module():
+    # run.py imports moneytrace.engine and calls validate_invariants.
+    python_dir = Path(__file__).resolve().parent.parent
+    subprocess.run([sys.executable, "run.py"], cwd=python_dir, check=True, capture_output=True)
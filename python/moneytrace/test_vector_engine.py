@@ -0,0 +1,32 @@
+# test_vector_engine.py
+import random
+
+import engine
+import vector_engine
+from columns import EventColumns
+from test_sql_engine import random_ledger
+
+
+def _check_parity(rng):
+    for _ in range(50):
+        events = random_ledger(rng, rng.randint(0, 300))
+        batch = EventColumns.from_events(events)
+        month, year = rng.randint(1, 12), rng.choice([2025, 2026])
+
+        for currency in (None, "USD"):
+            assert vector_engine.compute_summary(batch, 1_000_000, month, year, currency) == \
+                engine.compute_summary(events, 1_000_000, month, year, currency)
+        assert vector_engine.compute_summary(batch) == engine.compute_summary(events)
+        assert vector_engine.compute_category_spend(batch, month, year) == \
+            engine.compute_category_spend(events, month, year)
+        assert vector_engine.compute_friend_balances(batch) == \
+            engine.compute_friend_balances(events)
+
+
+def test_vector_backend_matches_pure_engine():
+    _check_parity(random.Random(4321))
+
+
+def test_without_numpy_falls_back_to_pure_engine(monkeypatch):
+    monkeypatch.setattr(vector_engine, "np", None)
+    _check_parity(random.Random(4321))
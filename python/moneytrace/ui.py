@@ -1,16 +1,13 @@
 # ui.py
+import asyncio
+import threading
 import tkinter as tk
 from datetime import date
-from db import init_db
-from engine import (
-    compute_available_budget,
-    compute_monthly_spend,
-    compute_outstanding_liabilities,
-    compute_outstanding_receivables,
-)
+from async_store import AsyncEventStore
 
 DB_PATH = "moneytrace.db"
 BASE_BUDGET = 1_000_000  # ₹10,000 paise
+POLL_MS = 30
 
 
 def fmt(paise: int) -> str:
@@ -22,7 +19,11 @@ class App:
         self.root = root
         root.title("MoneyTrace — Test UI")
 
-        self.conn = init_db(DB_PATH)
+        # DB work runs on the store's threads, driven by an asyncio
+        # loop in the background; Tk only polls for finished results.
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.store = AsyncEventStore(DB_PATH)
 
         # -------- Add Event --------
         tk.Label(root, text="Add Event").grid(row=0, column=0, sticky="w")
@@ -61,45 +62,38 @@ class App:
         self.refresh()
 
     def add_event(self):
-        cur = self.conn.cursor()
-        cur.execute("""
-        INSERT INTO events (type, amount, category, friend, description, event_date)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            self.type_var.get(),
-            int(self.amount_var.get()),
-            self.category_var.get() or None,
-            self.friend_var.get() or None,
-            self.desc_var.get() or None,
-            date.today().isoformat(),
-        ))
-        self.conn.commit()
-        self.refresh()
+        event = {
+            "type": self.type_var.get(),
+            "amount": int(self.amount_var.get()),
+            "category": self.category_var.get() or None,
+            "friend": self.friend_var.get() or None,
+            "description": self.desc_var.get() or None,
+            "event_date": date.today(),
+        }
+        self.submit(self.store.add_event(event), lambda _: self.refresh())
 
     def refresh(self):
-        cur = self.conn.cursor()
-        cur.execute("SELECT type, amount, category, friend, description, event_date FROM events")
-        rows = cur.fetchall()
-
-        events = [
-            {
-                "type": r[0],
-                "amount": r[1],
-                "category": r[2],
-                "friend": r[3],
-                "description": r[4],
-                "event_date": date.fromisoformat(r[5]),
-            }
-            for r in rows
-        ]
-
         m = int(self.month_var.get())
         y = int(self.year_var.get())
 
-        budget = compute_available_budget(BASE_BUDGET, events)
-        spend = compute_monthly_spend(events, m, y)
-        owed = compute_outstanding_liabilities(events)
-        due = compute_outstanding_receivables(events)
+        self.submit(self.store.summary(BASE_BUDGET, m, y), self.show_summary)
+
+    def submit(self, coro, on_done):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def poll():
+            if not future.done():
+                self.root.after(POLL_MS, poll)
+            else:
+                on_done(future.result())
+
+        poll()
+
+    def show_summary(self, s):
+        budget = s.budget
+        spend = s.month_spend
+        owed = s.outstanding_liabilities
+        due = s.outstanding_receivables
 
         self.output.delete("1.0", tk.END)
         self.output.insert(tk.END, f"Month spend   : {fmt(spend)}\n")
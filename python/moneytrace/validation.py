@@ -0,0 +1,218 @@
+# validation.py
+"""
+Batched ledger validation.
+
+Every check runs over a whole batch and raises one ValidationError
+that lists each bad row by index, instead of stopping at the first.
+Unlike assert statements, the checks also run under python -O.
+
+Rules:
+    amount     an int (not bool), >= 0 minor units
+    type       one of engine.EVENT_CODES
+    currency   a known code (currency.CURRENCIES); missing means home
+
+Entry points:
+    validate_events(dicts)        one tight pass, e.g. before an import
+    validate_columns(batch)       EventColumns, vectorized with NumPy
+    checked_records(events)       as_records with the checks folded
+                                  into the conversion; this is what
+                                  engine.compute_summary(validate=True)
+                                  folds over, so validating costs no
+                                  extra pass
+"""
+
+from itertools import chain
+from typing import Iterable, Iterator
+
+# Reached from engine.py both as a sibling and as moneytrace.engine.
+try:
+    from .currency import CURRENCIES
+    from .engine import EVENT_CODES, HOME_CURRENCY, EventCode, LedgerEvent
+except ImportError:
+    from currency import CURRENCIES
+    from engine import EVENT_CODES, HOME_CURRENCY, EventCode, LedgerEvent
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Rows quoted in the exception message; .errors always has them all.
+MAX_REPORTED = 10
+
+_CODES = frozenset(int(c) for c in EventCode)
+
+
+class ValidationError(ValueError, AssertionError):
+    """
+    One or more events broke a ledger invariant.
+
+    errors is a list of (row index, message). Subclasses
+    AssertionError too, for callers of the old assert-based
+    engine.validate_invariants.
+    """
+
+    def __init__(self, errors: list[tuple[int, str]]):
+        self.errors = errors
+        shown = "; ".join(f"row {i}: {msg}" for i, msg in errors[:MAX_REPORTED])
+        more = len(errors) - MAX_REPORTED
+        if more > 0:
+            shown += f"; ... {more} more"
+        noun = "event" if len(errors) == 1 else "events"
+        super().__init__(f"{len(errors)} invalid {noun}: {shown}")
+
+    @property
+    def rows(self) -> list[int]:
+        return [i for i, _ in self.errors]
+
+
+def _problem(e: dict) -> str:
+    amount = e.get("amount")
+    if amount.__class__ is not int:
+        return "Amount must be int"
+    if amount < 0:
+        return "Amount must be positive minor units"
+    if e.get("type") not in EVENT_CODES:
+        return f"Unknown event type: {e.get('type')}"
+    return f"Unknown currency: {e.get('currency')}"
+
+
+def _record_problem(r: LedgerEvent) -> str:
+    if r.amount.__class__ is not int:
+        return "Amount must be int"
+    if r.amount < 0:
+        return "Amount must be positive minor units"
+    if r.code not in _CODES:
+        return f"Unknown event code: {r.code}"
+    return f"Unknown currency: {r.currency}"
+
+
+# ---------------------------------------------------------------------------
+# Dict Batches
+# ---------------------------------------------------------------------------
+
+def validate_events(events: Iterable[dict], offset: int = 0) -> None:
+    """
+    Checks engine dicts; row indices start at `offset` (e.g. the
+    batch's position in an import).
+    """
+    types = EVENT_CODES
+    currencies = CURRENCIES
+
+    # The common all-valid case costs one comprehension; messages are
+    # only built for the rows it flags.
+    events = events if isinstance(events, list) else list(events)
+    bad = [
+        i for i, e in enumerate(events)
+        if not (
+            (a := e.get("amount")).__class__ is int and a >= 0
+            and e.get("type") in types
+            and ((c := e.get("currency")) is None or c in currencies)
+        )
+    ]
+    if bad:
+        raise ValidationError([(offset + i, _problem(events[i])) for i in bad])
+
+
+# ---------------------------------------------------------------------------
+# Fused Conversion
+# ---------------------------------------------------------------------------
+
+def _checked_dicts(events, offset: int) -> Iterator[LedgerEvent]:
+    # Mirrors engine.to_record, with the checks on the values it
+    # already reads.
+    types = EVENT_CODES
+    currencies = CURRENCIES
+    home = HOME_CURRENCY
+    errors = []
+
+    for i, e in enumerate(events, offset):
+        amount = e.get("amount")
+        code = types.get(e.get("type"))
+        currency = e.get("currency") or home
+        if code is not None and amount.__class__ is int and amount >= 0 and currency in currencies:
+            d = e.get("event_date")
+            yield LedgerEvent(
+                code,
+                amount,
+                d.toordinal() if d else 0,
+                e.get("category", "uncategorized"),
+                e.get("friend"),
+                currency,
+            )
+        else:
+            errors.append((i, _problem(e)))
+
+    if errors:
+        raise ValidationError(errors)
+
+
+def _checked_ledger_events(records, offset: int) -> Iterator[LedgerEvent]:
+    codes = _CODES
+    currencies = CURRENCIES
+    errors = []
+
+    for i, r in enumerate(records, offset):
+        amount = r.amount
+        if amount.__class__ is int and amount >= 0 and r.code in codes and r.currency in currencies:
+            yield r
+        else:
+            errors.append((i, _record_problem(r)))
+
+    if errors:
+        raise ValidationError(errors)
+
+
+def checked_records(events: Iterable, offset: int = 0) -> Iterator[LedgerEvent]:
+    """
+    engine.as_records that validates while converting.
+
+    Yields the valid records; once the stream is exhausted, raises
+    ValidationError for the bad ones, so a consumer sees one pass
+    and one exception covering every row. Unlike as_records, unknown
+    event types are errors rather than skipped.
+    """
+    it = iter(events)
+    first = next(it, None)
+    if first is None:
+        return iter(())
+
+    stream = chain((first,), it)
+    if isinstance(first, LedgerEvent):
+        return _checked_ledger_events(stream, offset)
+    return _checked_dicts(stream, offset)
+
+
+# ---------------------------------------------------------------------------
+# Columnar Batches
+# ---------------------------------------------------------------------------
+
+def validate_columns(batch, offset: int = 0) -> None:
+    """
+    Checks a columns.EventColumns batch. Amounts are int64 by
+    construction, so this covers signs, codes and currencies, with
+    NumPy masks when available. Row indices are batch positions.
+    """
+    unknown = {i for i, c in enumerate(batch.currencies) if c not in CURRENCIES}
+
+    if np is not None:
+        amounts = np.frombuffer(batch.amounts, dtype=np.int64)
+        codes = np.frombuffer(batch.codes, dtype=np.int8)
+        mask = (amounts < 0) | (codes < 0) | (codes >= len(EventCode))
+        if unknown:
+            mask |= np.isin(np.frombuffer(batch.currency_ids, dtype=np.int16), list(unknown))
+        bad = np.flatnonzero(mask).tolist()
+    else:
+        bad = [
+            i for i, (a, code, cid) in enumerate(zip(batch.amounts, batch.codes, batch.currency_ids))
+            if a < 0 or code not in _CODES or cid in unknown
+        ]
+
+    if bad:
+        currencies = batch.currencies
+        raise ValidationError([
+            (offset + i, _record_problem(LedgerEvent(
+                batch.codes[i], batch.amounts[i], 0, None, None,
+                currencies[batch.currency_ids[i]])))
+            for i in bad
+        ])
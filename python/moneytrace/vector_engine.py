@@ -0,0 +1,248 @@
+# vector_engine.py
+"""
+Vectorized engine backend for large ledgers.
+
+Computes the same metrics as engine.py over a columns.EventColumns
+batch using NumPy masked sums and grouped adds. The impact matrix is
+taken from engine.py's sign tables, so semantics cannot drift.
+Currency conversion groups rows by rate period with one searchsorted
+per currency and scales each group's sum once.
+
+NumPy is optional: without it every function falls back to the
+pure-Python engine.
+"""
+
+from columns import NO_FRIEND, EventColumns
+import engine
+from engine import LedgerSummary
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+HAVE_NUMPY = np is not None
+
+
+def _sign(table) -> "np.ndarray":
+    return np.asarray(table, dtype=np.int64)
+
+
+def _group_sum(ids, values, size: int) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Per-id sums and hit counts.
+
+    np.add.at keeps exact int64 sums; bincount would go through
+    float64 weights and lose precision on large ledgers.
+    """
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, ids, values)
+    counts = np.bincount(ids, minlength=size)
+    return totals, counts
+
+
+# ---------------------------------------------------------------------------
+# Single-pass Summary
+# ---------------------------------------------------------------------------
+
+def compute_summary(
+        batch: EventColumns,
+        base_budget_minor: int = 0,
+        month: int | None = None,
+        year: int | None = None,
+        currency: str | None = None,
+        fx=None,
+        validate: bool = False,
+) -> LedgerSummary:
+    """
+    engine.compute_summary over a batch, same currency rules.
+
+    validate=True runs validation.validate_columns first; its masks
+    are cheap next to the grouped sums.
+    """
+    if validate:
+        from validation import validate_columns
+        validate_columns(batch)
+
+    if np is None or not len(batch):
+        return engine.compute_summary(batch, base_budget_minor, month, year, currency, fx)
+
+    currency = currency or engine.HOME_CURRENCY
+
+    codes = np.frombuffer(batch.codes, dtype=np.int8)
+    amounts = np.frombuffer(batch.amounts, dtype=np.int64)
+    days = np.frombuffer(batch.days, dtype=np.int32)
+    category_ids = np.frombuffer(batch.category_ids, dtype=np.int32)
+    friend_ids = np.frombuffer(batch.friend_ids, dtype=np.int32)
+    columns = (codes, amounts, days, category_ids, friend_ids)
+
+    if fx is not None:
+        return _converted(batch, columns, base_budget_minor, month, year, currency, fx)
+
+    if batch.currencies != [currency]:
+        # Only rows already in the requested currency count.
+        if currency not in batch.currencies:
+            return LedgerSummary(budget=base_budget_minor)
+        rows = np.frombuffer(batch.currency_ids, dtype=np.int16) == batch.currencies.index(currency)
+        columns = tuple(c[rows] for c in columns)
+
+    return _summary(batch, columns, base_budget_minor, month, year)
+
+
+def _summary(batch, columns, base_budget_minor, month, year) -> LedgerSummary:
+    codes, amounts, days, category_ids, friend_ids = columns
+
+    budget = base_budget_minor + int((_sign(engine.BUDGET_SIGN)[codes] * amounts).sum())
+    liabilities = int((_sign(engine.LIABILITY_SIGN)[codes] * amounts).sum())
+    receivables = int((_sign(engine.RECEIVABLE_SIGN)[codes] * amounts).sum())
+
+    # Per-friend balances
+    friend_sign = _sign(engine.FRIEND_SIGN)[codes]
+    mask = (friend_ids != NO_FRIEND) & (friend_sign != 0)
+    totals, counts = _group_sum(
+        friend_ids[mask], (friend_sign * amounts)[mask], len(batch.friends))
+    friend_balances = {
+        batch.friends[i]: int(totals[i]) for i in np.flatnonzero(counts)
+    }
+
+    # Month spend and category spend
+    expense = codes == engine.EventCode.EXPENSE
+    month_spend = 0
+    if month and year:
+        start, end = engine.month_days(month, year)
+        in_month = (days >= start) & (days < end)
+        month_spend = int(amounts[in_month & (_sign(engine.CASH_OUT)[codes] != 0)].sum())
+        expense &= in_month
+
+    totals, counts = _group_sum(
+        category_ids[expense], amounts[expense], len(batch.categories))
+    category_spend = {
+        batch.categories[i]: int(totals[i]) for i in np.flatnonzero(counts)
+    }
+
+    return LedgerSummary(
+        budget=budget,
+        month_spend=month_spend,
+        liabilities=liabilities,
+        receivables=receivables,
+        friend_balances=friend_balances,
+        category_spend=category_spend,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Currency Conversion
+# ---------------------------------------------------------------------------
+
+def _rate_groups(batch, days, currency: str, fx) -> tuple["np.ndarray", list[int]]:
+    """
+    Row -> rate group, one group per (currency, rate period) present,
+    and each group's fixed-point factor. Periods come from one
+    searchsorted per currency, so factors are looked up per group
+    rather than per row.
+    """
+    currency_ids = np.frombuffer(batch.currency_ids, dtype=np.int16)
+    groups = np.empty(len(days), dtype=np.int64)
+    factors: list[int] = []
+
+    for xid, code in enumerate(batch.currencies):
+        rows = np.flatnonzero(currency_ids == xid)
+        if not len(rows):
+            continue
+
+        bounds = fx.periods(code, currency)
+        period = np.searchsorted(np.asarray(bounds, dtype=np.int64), days[rows], side="right") - 1
+        used, inverse = np.unique(period, return_inverse=True)
+        groups[rows] = len(factors) + inverse
+
+        # Period -1 is before the first rate: the earliest such day
+        # raises in fx.factor, unless no conversion is needed.
+        first = int(days[rows].min())
+        factors += [fx.factor(code, currency, bounds[p] if p >= 0 else first) for p in used.tolist()]
+
+    return groups, factors
+
+
+def _converted(batch, columns, base_budget_minor, month, year, currency, fx) -> LedgerSummary:
+    """
+    Sums raw int64 amounts per rate group, then scales each group's
+    total by its factor in Python ints, so nothing overflows and the
+    result matches engine.compute_summary exactly.
+    """
+    codes, amounts, days, category_ids, friend_ids = columns
+    groups, factors = _rate_groups(batch, days, currency, fx)
+    n = len(factors)
+
+    def scaled(values) -> int:
+        totals = np.zeros(n, dtype=np.int64)
+        np.add.at(totals, groups, values)
+        return sum(t * f for t, f in zip(totals.tolist(), factors))
+
+    def scaled_by(ids, values, mask, names) -> dict:
+        # (group, id) pairs that occur, folded onto id.
+        keys = groups[mask] * len(names) + ids[mask]
+        used, inverse = np.unique(keys, return_inverse=True)
+        totals = np.zeros(len(used), dtype=np.int64)
+        np.add.at(totals, inverse, values[mask])
+
+        out: dict = {}
+        for key, total in zip(used.tolist(), totals.tolist()):
+            g, i = divmod(key, len(names))
+            out[names[i]] = out.get(names[i], 0) + total * factors[g]
+        return out
+
+    friend_sign = _sign(engine.FRIEND_SIGN)[codes]
+    expense = codes == engine.EventCode.EXPENSE
+    month_spend = 0
+    if month and year:
+        start, end = engine.month_days(month, year)
+        in_month = (days >= start) & (days < end)
+        month_spend = scaled(np.where(in_month, _sign(engine.CASH_OUT)[codes] * amounts, 0))
+        expense &= in_month
+
+    group = [
+        scaled(_sign(engine.BUDGET_SIGN)[codes] * amounts),
+        month_spend,
+        scaled(_sign(engine.LIABILITY_SIGN)[codes] * amounts),
+        scaled(_sign(engine.RECEIVABLE_SIGN)[codes] * amounts),
+        scaled_by(friend_ids, friend_sign * amounts,
+                  (friend_ids != NO_FRIEND) & (friend_sign != 0), batch.friends),
+        scaled_by(category_ids, amounts, expense, batch.categories),
+    ]
+    return engine._to_summary(group, base_budget_minor, fx.scale)
+
+
+# ---------------------------------------------------------------------------
+# Per-metric Entry Points (same signatures as engine.py)
+# ---------------------------------------------------------------------------
+
+def compute_available_budget(base_budget_minor: int, batch: EventColumns,
+                             currency: str | None = None, fx=None) -> int:
+    return compute_summary(batch, base_budget_minor, currency=currency, fx=fx).budget
+
+
+def compute_monthly_spend(batch: EventColumns, month: int, year: int,
+                          currency: str | None = None, fx=None) -> int:
+    return compute_summary(batch, month=month, year=year, currency=currency, fx=fx).month_spend
+
+
+def compute_outstanding_liabilities(batch: EventColumns, currency: str | None = None, fx=None) -> int:
+    return compute_summary(batch, currency=currency, fx=fx).outstanding_liabilities
+
+
+def compute_outstanding_receivables(batch: EventColumns, currency: str | None = None, fx=None) -> int:
+    return compute_summary(batch, currency=currency, fx=fx).outstanding_receivables
+
+
+def compute_friend_balances(batch: EventColumns, currency: str | None = None, fx=None) -> dict[str, int]:
+    return compute_summary(batch, currency=currency, fx=fx).friend_balances
+
+
+def compute_category_spend(
+    batch: EventColumns,
+    month: int | None = None,
+    year: int | None = None,
+    currency: str | None = None,
+    fx=None,
+) -> dict[str, int]:
+    return compute_summary(batch, month=month, year=year, currency=currency, fx=fx).category_spend
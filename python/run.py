@@ -4,12 +4,7 @@ print("This is an example run script.")
 # run_example.py
 from datetime import date
 from moneytrace.engine import (
-    compute_available_budget,
-    compute_monthly_spend,
-    compute_outstanding_liabilities,
-    compute_outstanding_receivables,
-    compute_friend_balances,
-    compute_category_spend,
+    compute_summary,
     validate_invariants,
 )
 
@@ -111,12 +106,13 @@ validate_invariants(events)
 # -------------------------------
 # Run engine
 # -------------------------------
-available_budget = compute_available_budget(BASE_BUDGET, events)
-monthly_spend = compute_monthly_spend(events, month=1, year=2026)
-liabilities = compute_outstanding_liabilities(events)
-receivables = compute_outstanding_receivables(events)
-friend_balances = compute_friend_balances(events)
-category_spend = compute_category_spend(events, month=1, year=2026)
+summary = compute_summary(events, BASE_BUDGET, month=1, year=2026)
+available_budget = summary.budget
+monthly_spend = summary.month_spend
+liabilities = summary.outstanding_liabilities
+receivables = summary.outstanding_receivables
+friend_balances = summary.friend_balances
+category_spend = summary.category_spend
 
 # -------------------------------
 # Pretty print (for sanity)